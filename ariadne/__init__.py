@@ -0,0 +1,76 @@
+import importlib
+
+"""
+A collection of maze-generating algorithms.
+
+The names in __all__ are the public API, importable straight from the package:
+
+    from ariadne import Maze, RecursiveBacktracker
+
+Nothing is imported with the package itself. Every name, and every submodule,
+is only loaded the first time it is looked up, so that short-lived processes
+only pay for what they use: generating a maze does not load the solvers, the
+renderers or the asyncio service. `python -m ariadne.benchmark --import-time`
+checks how long the common imports take.
+"""
+
+# Public name to the submodule defining it.
+_API = {
+    "MazeGenerator": "generators",
+    "RecursiveBacktracker": "generators",
+    "EllersAlgorithm": "generators",
+    "KruskalsAlgorithm": "generators",
+    "BinaryTree": "generators",
+    "Sidewinder": "generators",
+    "AldousBroder": "generators",
+    "WilsonsAlgorithm": "generators",
+    "GrowingTree": "generators",
+    "Braided": "generators",
+    "GENERATORS": "generators",
+    "Maze": "mazes",
+    "MazeCellStates": "mazes",
+    "CantTearWallException": "errors",
+    "InvalidSizeException": "errors",
+    "InvalidMazeFileException": "errors",
+    "InvalidMazeException": "errors",
+    "BreadthFirstSearch": "solvers",
+    "AStar": "solvers",
+    "DeadEndFilling": "solvers",
+    "dump": "serialization",
+    "load": "serialization",
+    "loads": "serialization",
+    "write_ascii": "rendering",
+    "write_pbm": "rendering",
+    "write_png": "rendering",
+    "validate": "validation",
+    "is_perfect": "validation",
+    "generate_many": "batch",
+    "measure": "metrics",
+    "braid": "braiding",
+    "MazeService": "service",
+}
+
+_SUBMODULES = frozenset([
+    "batch", "benchmark", "braiding", "cli", "disjointsets", "edits", "errors", "generators",
+    "masks", "mazes", "metrics", "pathindex", "profiling", "rendering", "rng", "serialization",
+    "service", "solvers", "tiles", "validation",
+])
+
+__all__ = sorted(_API)
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+
+    module_name = _API.get(name)
+
+    if module_name is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    value = getattr(importlib.import_module("." + module_name, __name__), name)
+    # Later lookups find it without going through here.
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
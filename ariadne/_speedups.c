@@ -0,0 +1,1142 @@
+/*
+ * Compiled engines for ariadne. Build with `python -m ariadne.build_speedups`.
+ *
+ * Every function here mirrors a pure-Python engine in ariadne.mazes,
+ * ariadne.generators, ariadne.metrics, ariadne.braiding or ariadne.solvers and
+ * must give
+ * exactly the same results: the random decisions are drawn in Python and
+ * passed in as bytes, so both engines consume the same randomness. Cells are
+ * the `Maze.cells` buffer, one byte per cell, row-major, with the NESW bits of
+ * MazeCellStates.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define OPEN_WEST 0x1
+#define OPEN_SOUTH 0x2
+#define OPEN_EAST 0x4
+#define OPEN_NORTH 0x8
+
+/* itertools.permutations(MazeCellStates.CARDINAL), in the same order. */
+static const unsigned char DIRECTION_ORDERS[24][4] = {
+    {8, 4, 2, 1}, {8, 4, 1, 2}, {8, 2, 4, 1}, {8, 2, 1, 4}, {8, 1, 4, 2}, {8, 1, 2, 4},
+    {4, 8, 2, 1}, {4, 8, 1, 2}, {4, 2, 8, 1}, {4, 2, 1, 8}, {4, 1, 8, 2}, {4, 1, 2, 8},
+    {2, 8, 4, 1}, {2, 8, 1, 4}, {2, 4, 8, 1}, {2, 4, 1, 8}, {2, 1, 8, 4}, {2, 1, 4, 8},
+    {1, 8, 4, 2}, {1, 8, 2, 4}, {1, 4, 8, 2}, {1, 4, 2, 8}, {1, 2, 8, 4}, {1, 2, 4, 8},
+};
+
+static unsigned char
+inverse(unsigned char direction)
+{
+    switch (direction) {
+    case OPEN_NORTH: return OPEN_SOUTH;
+    case OPEN_EAST: return OPEN_WEST;
+    case OPEN_SOUTH: return OPEN_NORTH;
+    default: return OPEN_EAST;
+    }
+}
+
+static Py_ssize_t
+offset(unsigned char direction, Py_ssize_t width)
+{
+    switch (direction) {
+    case OPEN_NORTH: return -width;
+    case OPEN_EAST: return 1;
+    case OPEN_SOUTH: return width;
+    default: return -1;
+    }
+}
+
+/* The walls of a cell that lie on the border, as in Maze.border_walls. */
+static unsigned char
+border_walls(Py_ssize_t cell, Py_ssize_t width, Py_ssize_t cell_count)
+{
+    unsigned char walls = 0;
+    Py_ssize_t col = cell % width;
+
+    if (cell < width)
+        walls |= OPEN_NORTH;
+    if (cell >= cell_count - width)
+        walls |= OPEN_SOUTH;
+    if (col == 0)
+        walls |= OPEN_WEST;
+    if (col == width - 1)
+        walls |= OPEN_EAST;
+
+    return walls;
+}
+
+static unsigned int
+word_at(const unsigned char *bytes, Py_ssize_t index)
+{
+    return bytes[2 * index] | (bytes[2 * index + 1] << 8);
+}
+
+static uint32_t
+dword_at(const unsigned char *bytes, Py_ssize_t index)
+{
+    return (uint32_t)bytes[4 * index] | ((uint32_t)bytes[4 * index + 1] << 8)
+        | ((uint32_t)bytes[4 * index + 2] << 16) | ((uint32_t)bytes[4 * index + 3] << 24);
+}
+
+/* Union-find lookup with path halving. */
+static Py_ssize_t
+find(Py_ssize_t *parents, Py_ssize_t item)
+{
+    while (parents[item] != item) {
+        parents[item] = parents[parents[item]];
+        item = parents[item];
+    }
+    return item;
+}
+
+
+PyDoc_STRVAR(carve_doc,
+"carve(cells, width, indices, cell_states)\n\
+\n\
+The loop of Maze.carve: indices is an array('i') and cell_states a bytes-like\n\
+object of the same length. Openings are not checked against the border.");
+
+static PyObject *
+carve(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, indices, states;
+    PyObject *indices_object;
+    Py_ssize_t width, i, count;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "w*nOy*", &cells, &width, &indices_object, &states))
+        return NULL;
+
+    if (PyObject_GetBuffer(indices_object, &indices, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0)
+        goto release_cells;
+
+    if (indices.itemsize != sizeof(int) || strcmp(indices.format, "i") != 0) {
+        PyErr_SetString(PyExc_TypeError, "indices must be an array('i')");
+        goto release_all;
+    }
+
+    count = indices.len / indices.itemsize;
+
+    if (count != states.len) {
+        PyErr_Format(PyExc_ValueError, "Got %zd indices but %zd cell states", count, states.len);
+        goto release_all;
+    }
+
+    {
+        unsigned char *cell_bytes = cells.buf;
+        const int *index_values = indices.buf;
+        const unsigned char *state_bytes = states.buf;
+
+        for (i = 0; i < count; i++) {
+            Py_ssize_t index = index_values[i];
+            unsigned char state = state_bytes[i] & 0xf;
+            unsigned char direction;
+
+            if (index < 0 || index >= cells.len) {
+                PyErr_SetString(PyExc_IndexError, "cell index out of range");
+                goto release_all;
+            }
+
+            cell_bytes[index] |= state_bytes[i];
+
+            for (direction = OPEN_NORTH; direction; direction >>= 1) {
+                Py_ssize_t neighbor;
+
+                if (!(state & direction))
+                    continue;
+
+                neighbor = index + offset(direction, width);
+
+                if (neighbor < 0 || neighbor >= cells.len) {
+                    PyErr_SetString(PyExc_IndexError, "cell index out of range");
+                    goto release_all;
+                }
+
+                cell_bytes[neighbor] |= inverse(direction);
+            }
+        }
+    }
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+release_all:
+    PyBuffer_Release(&indices);
+release_cells:
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&states);
+    return result;
+}
+
+
+PyDoc_STRVAR(backtrack_doc,
+"backtrack(cells, width, height, start, draws, walls=None)\n\
+\n\
+The walk of RecursiveBacktracker.generate, carving straight into cells.\n\
+draws holds one little-endian 16-bit word per cell picking its direction order.\n\
+walls, if given, is Maze.border_walls, for mazes with a mask; the walls on the\n\
+border of the grid are never opened either way.");
+
+static PyObject *
+backtrack(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, draws, walls = {0};
+    Py_ssize_t width, height, start, cell_count;
+    unsigned char *orders = NULL, *tried = NULL;
+    Py_ssize_t *stack = NULL;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "w*nnny*|z*", &cells, &width, &height, &start, &draws, &walls))
+        return NULL;
+
+    cell_count = width * height;
+
+    if (width < 1 || height < 1 || cells.len != cell_count || draws.len != 2 * cell_count
+        || start < 0 || start >= cell_count || (walls.buf != NULL && walls.len != cell_count)) {
+        PyErr_SetString(PyExc_ValueError, "cells and draws do not match the size of the maze");
+        goto done;
+    }
+
+    orders = PyMem_Calloc(cell_count, 1);
+    tried = PyMem_Calloc(cell_count, 1);
+    stack = PyMem_Malloc(cell_count * sizeof(Py_ssize_t));
+
+    if (orders == NULL || tried == NULL || stack == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        unsigned char *cell_bytes = cells.buf;
+        const unsigned char *draw_bytes = draws.buf;
+        const unsigned char *wall_bytes = walls.buf;
+        Py_ssize_t depth = 0;
+
+        /* Orderings are numbered from 1 so that 0 can mean "not visited yet". */
+        orders[start] = 1 + ((word_at(draw_bytes, start) * 24) >> 16);
+        stack[depth++] = start;
+
+        while (depth) {
+            Py_ssize_t current = stack[depth - 1];
+            unsigned char attempt = tried[current];
+            unsigned char direction;
+            Py_ssize_t neighbor;
+
+            if (attempt == 4) {
+                depth--;
+                continue;
+            }
+
+            tried[current] = attempt + 1;
+            direction = DIRECTION_ORDERS[orders[current] - 1][attempt];
+
+            if (direction & ((wall_bytes != NULL ? wall_bytes[current] : 0)
+                             | border_walls(current, width, cell_count)))
+                continue;
+
+            neighbor = current + offset(direction, width);
+
+            if (orders[neighbor])
+                continue;
+
+            cell_bytes[current] |= direction;
+            cell_bytes[neighbor] |= inverse(direction);
+            orders[neighbor] = 1 + ((word_at(draw_bytes, neighbor) * 24) >> 16);
+            stack[depth++] = neighbor;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    PyMem_Free(orders);
+    PyMem_Free(tried);
+    PyMem_Free(stack);
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&draws);
+    if (walls.obj != NULL)
+        PyBuffer_Release(&walls);
+    return result;
+}
+
+
+PyDoc_STRVAR(kruskal_doc,
+"kruskal(cells, width, height, walls, draws)\n\
+\n\
+The shuffle and union-find pass of KruskalsAlgorithm.generate, carving straight\n\
+into cells. walls is an array('i') of the walls, numbered as described there,\n\
+which is shuffled in place as ariadne.rng.shuffle would with draws.");
+
+static PyObject *
+kruskal(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, walls, draws;
+    PyObject *walls_object;
+    Py_ssize_t width, height, cell_count, wall_count, i;
+    Py_ssize_t *parents = NULL;
+    unsigned char *ranks = NULL;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "w*nnOy*", &cells, &width, &height, &walls_object, &draws))
+        return NULL;
+
+    if (PyObject_GetBuffer(walls_object, &walls,
+                           PyBUF_FORMAT | PyBUF_C_CONTIGUOUS | PyBUF_WRITABLE) < 0) {
+        PyBuffer_Release(&cells);
+        PyBuffer_Release(&draws);
+        return NULL;
+    }
+
+    cell_count = width * height;
+
+    if (walls.itemsize != sizeof(int) || strcmp(walls.format, "i") != 0) {
+        PyErr_SetString(PyExc_TypeError, "walls must be an array('i')");
+        goto done;
+    }
+
+    if (width < 1 || height < 1 || cells.len != cell_count) {
+        PyErr_SetString(PyExc_ValueError, "cells do not match the size of the maze");
+        goto done;
+    }
+
+    wall_count = walls.len / walls.itemsize;
+
+    if (draws.len != 4 * wall_count) {
+        PyErr_SetString(PyExc_ValueError, "draws do not match the walls");
+        goto done;
+    }
+
+    for (i = 0; i < wall_count; i++) {
+        Py_ssize_t wall = ((const int *)walls.buf)[i];
+        Py_ssize_t cell = wall >> 1;
+
+        if (wall < 0 || cell >= cell_count
+            || (wall & 1 ? cell >= cell_count - width : cell % width == width - 1)) {
+            PyErr_SetString(PyExc_ValueError, "wall out of range");
+            goto done;
+        }
+    }
+
+    parents = PyMem_Malloc(cell_count * sizeof(Py_ssize_t));
+    /* Union by rank, as in ariadne.disjointsets; a rank never passes 63. */
+    ranks = PyMem_Calloc(cell_count, 1);
+
+    if (parents == NULL || ranks == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        unsigned char *cell_bytes = cells.buf;
+        int *wall_values = walls.buf;
+        const unsigned char *draw_bytes = draws.buf;
+        Py_ssize_t remaining = cell_count - 1;
+
+        for (i = wall_count - 1; i > 0; i--) {
+            Py_ssize_t j = (Py_ssize_t)(((uint64_t)dword_at(draw_bytes, i) * (uint64_t)(i + 1)) >> 32);
+            int wall = wall_values[i];
+
+            wall_values[i] = wall_values[j];
+            wall_values[j] = wall;
+        }
+
+        for (i = 0; i < cell_count; i++)
+            parents[i] = i;
+
+        for (i = 0; i < wall_count && remaining; i++) {
+            Py_ssize_t cell = wall_values[i] >> 1;
+            int is_south = wall_values[i] & 1;
+            Py_ssize_t neighbor = cell + (is_south ? width : 1);
+            Py_ssize_t first = find(parents, cell);
+            Py_ssize_t second = find(parents, neighbor);
+
+            if (first == second)
+                continue;
+
+            if (ranks[first] < ranks[second]) {
+                parents[first] = second;
+            } else {
+                parents[second] = first;
+                ranks[first] += ranks[first] == ranks[second];
+            }
+
+            cell_bytes[cell] |= is_south ? OPEN_SOUTH : OPEN_EAST;
+            cell_bytes[neighbor] |= is_south ? OPEN_NORTH : OPEN_WEST;
+            remaining--;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    Py_INCREF(Py_None);
+    result = Py_None;
+
+done:
+    PyMem_Free(parents);
+    PyMem_Free(ranks);
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&walls);
+    PyBuffer_Release(&draws);
+    return result;
+}
+
+
+PyDoc_STRVAR(ellers_row_doc,
+"ellers_row(labels, noise, is_last_row)\n\
+\n\
+One row of EllersAlgorithm.generate_rows, as ariadne.generators.ellers_row.");
+
+static PyObject *
+ellers_row(PyObject *module, PyObject *args)
+{
+    Py_buffer labels, noise;
+    PyObject *labels_object;
+    int is_last_row;
+    Py_ssize_t width, col;
+    Py_ssize_t *parents = NULL, *renamed = NULL, *sizes = NULL, *seen = NULL;
+    unsigned char *dropped = NULL;
+    PyObject *row = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "Oy*p", &labels_object, &noise, &is_last_row))
+        return NULL;
+
+    if (PyObject_GetBuffer(labels_object, &labels,
+          PyBUF_FORMAT | PyBUF_C_CONTIGUOUS | PyBUF_WRITABLE) < 0) {
+        PyBuffer_Release(&noise);
+        return NULL;
+    }
+
+    if (labels.itemsize != sizeof(int) || strcmp(labels.format, "i") != 0) {
+        PyErr_SetString(PyExc_TypeError, "labels must be an array('i')");
+        goto done;
+    }
+
+    width = labels.len / labels.itemsize;
+
+    if (noise.len != 4 * width) {
+        PyErr_SetString(PyExc_ValueError, "noise must hold 4 bytes per column");
+        goto done;
+    }
+
+    row = PyBytes_FromStringAndSize(NULL, width);
+    parents = PyMem_Malloc(width * sizeof(Py_ssize_t) + 1);
+    renamed = PyMem_Malloc(width * sizeof(Py_ssize_t) + 1);
+    sizes = PyMem_Calloc(width + 1, sizeof(Py_ssize_t));
+    seen = PyMem_Calloc(width + 1, sizeof(Py_ssize_t));
+    dropped = PyMem_Calloc(width + 1, 1);
+
+    if (row == NULL || parents == NULL || renamed == NULL || sizes == NULL || seen == NULL
+        || dropped == NULL) {
+        Py_CLEAR(row);
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    {
+        int *label_values = labels.buf;
+        const unsigned char *noise_bytes = noise.buf;
+        unsigned char *cells = (unsigned char *)PyBytes_AS_STRING(row);
+
+        for (col = 0; col < width; col++) {
+            parents[col] = col;
+            renamed[col] = -1;
+            cells[col] = 0;
+        }
+
+        /* Sets carried over from above are renamed after their first column. */
+        for (col = 0; col < width; col++) {
+            int label = label_values[col];
+
+            if (label < 0)
+                continue;
+
+            if (label >= width) {
+                Py_CLEAR(row);
+                PyErr_SetString(PyExc_ValueError, "label out of range");
+                goto done;
+            }
+
+            cells[col] = OPEN_NORTH;
+
+            if (renamed[label] < 0)
+                renamed[label] = col;
+            else
+                parents[col] = renamed[label];
+        }
+
+        for (col = 0; col + 1 < width; col++) {
+            Py_ssize_t west = find(parents, col);
+            Py_ssize_t east = find(parents, col + 1);
+
+            if (west == east || !(is_last_row || (noise_bytes[col] & 1)))
+                continue;
+
+            cells[col] |= OPEN_EAST;
+            cells[col + 1] |= OPEN_WEST;
+
+            if (east < west)
+                parents[west] = east;
+            else
+                parents[east] = west;
+        }
+
+        if (!is_last_row) {
+            for (col = 0; col < width; col++) {
+                Py_ssize_t root = find(parents, col);
+
+                parents[col] = root;
+                sizes[root]++;
+
+                if (noise_bytes[width + col] & 1)
+                    dropped[root] = 1;
+            }
+
+            for (col = 0; col < width; col++) {
+                Py_ssize_t root = parents[col];
+                Py_ssize_t pick = (word_at(noise_bytes + 2 * width, root) * sizes[root]) >> 16;
+
+                if ((noise_bytes[width + col] & 1) || (!dropped[root] && seen[root] == pick)) {
+                    cells[col] |= OPEN_SOUTH;
+                    label_values[col] = (int)root;
+                } else {
+                    label_values[col] = -1;
+                }
+
+                seen[root]++;
+            }
+        }
+    }
+
+done:
+    PyMem_Free(parents);
+    PyMem_Free(renamed);
+    PyMem_Free(sizes);
+    PyMem_Free(seen);
+    PyMem_Free(dropped);
+    PyBuffer_Release(&labels);
+    PyBuffer_Release(&noise);
+    return row;
+}
+
+
+PyDoc_STRVAR(walk_tree_doc,
+"walk_tree(cells, degrees, width, root, start, end)\n\
+\n\
+The walk of ariadne.metrics.measure, as ariadne.metrics.walk_tree.");
+
+static PyObject *
+walk_tree(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, degrees;
+    Py_ssize_t width, root, start, end, cell_count;
+    Py_ssize_t diameter = 0, solution_length = -1, dead_end_corridors = 0, dead_end_length = 0;
+    Py_ssize_t walked = 0, i;
+    int past_border = 0;
+    Py_ssize_t *parents = NULL, *depths = NULL, *order = NULL, *heights = NULL, *below = NULL;
+    Py_ssize_t *corridor_counts = NULL;
+    unsigned char *dead_below = NULL;
+    PyObject *corridor_lengths = NULL, *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "y*y*nnnn", &cells, &degrees, &width, &root, &start, &end))
+        return NULL;
+
+    cell_count = cells.len;
+
+    if (width < 1 || cell_count % width || degrees.len != cell_count || root < 0
+        || root >= cell_count || start < 0 || start >= cell_count || end < 0
+        || end >= cell_count) {
+        PyErr_SetString(PyExc_ValueError, "cells and degrees do not match the width and cell indices");
+        goto done;
+    }
+
+    parents = PyMem_Malloc(cell_count * sizeof(Py_ssize_t));
+    depths = PyMem_Malloc(cell_count * sizeof(Py_ssize_t));
+    order = PyMem_Malloc(cell_count * sizeof(Py_ssize_t));
+    heights = PyMem_Calloc(cell_count, sizeof(Py_ssize_t));
+    below = PyMem_Calloc(cell_count, sizeof(Py_ssize_t));
+    corridor_counts = PyMem_Calloc(cell_count + 1, sizeof(Py_ssize_t));
+    dead_below = PyMem_Malloc(cell_count);
+
+    if (parents == NULL || depths == NULL || order == NULL || heights == NULL || below == NULL
+        || corridor_counts == NULL || dead_below == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        const unsigned char *cell_bytes = cells.buf;
+        const unsigned char *degree_bytes = degrees.buf;
+
+        for (i = 0; i < cell_count; i++) {
+            parents[i] = -1;
+            dead_below[i] = degree_bytes[i] == 1;
+        }
+
+        parents[root] = root;
+        depths[root] = 0;
+        order[walked++] = root;
+
+        for (i = 0; i < walked && !past_border; i++) {
+            Py_ssize_t current = order[i];
+            unsigned char state = cell_bytes[current] & 0xf;
+            unsigned char direction;
+
+            if (state & border_walls(current, width, cell_count)) {
+                past_border = 1;
+                break;
+            }
+
+            for (direction = OPEN_NORTH; direction; direction >>= 1) {
+                Py_ssize_t neighbor;
+
+                if (!(state & direction))
+                    continue;
+
+                neighbor = current + offset(direction, width);
+
+                if (parents[neighbor] == -1) {
+                    parents[neighbor] = current;
+                    depths[neighbor] = depths[current] + 1;
+                    order[walked++] = neighbor;
+                }
+            }
+        }
+
+        /* Children come before their parents from the end of the walk on. */
+        for (i = walked - 1; i > 0 && !past_border; i--) {
+            Py_ssize_t cell = order[i];
+            Py_ssize_t parent = parents[cell];
+            Py_ssize_t height = heights[cell] + 1;
+            Py_ssize_t length = below[cell] + 1;
+
+            if (heights[parent] + height > diameter)
+                diameter = heights[parent] + height;
+            if (height > heights[parent])
+                heights[parent] = height;
+
+            if (degree_bytes[parent] == 2 && parent != root) {
+                below[parent] = length;
+                dead_below[parent] = dead_below[cell];
+                continue;
+            }
+
+            corridor_counts[length]++;
+
+            if (dead_below[cell] || degree_bytes[parent] == 1) {
+                dead_end_corridors++;
+                dead_end_length += length;
+            }
+        }
+
+        if (!past_border && parents[start] != -1 && parents[end] != -1) {
+            Py_ssize_t a = start, b = end;
+
+            solution_length = 0;
+
+            while (depths[a] > depths[b]) {
+                a = parents[a];
+                solution_length++;
+            }
+            while (depths[b] > depths[a]) {
+                b = parents[b];
+                solution_length++;
+            }
+            while (a != b) {
+                a = parents[a];
+                b = parents[b];
+                solution_length += 2;
+            }
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    if (past_border) {
+        PyErr_SetString(PyExc_ValueError, "opening past the border of the maze");
+        goto done;
+    }
+
+    corridor_lengths = PyDict_New();
+
+    if (corridor_lengths == NULL)
+        goto done;
+
+    for (i = 1; i <= cell_count; i++) {
+        PyObject *length, *count;
+        int failed;
+
+        if (!corridor_counts[i])
+            continue;
+
+        length = PyLong_FromSsize_t(i);
+        count = PyLong_FromSsize_t(corridor_counts[i]);
+        failed = length == NULL || count == NULL || PyDict_SetItem(corridor_lengths, length, count) < 0;
+        Py_XDECREF(length);
+        Py_XDECREF(count);
+
+        if (failed)
+            goto done;
+    }
+
+    if (solution_length < 0)
+        result = Py_BuildValue("nOOnn", diameter, Py_None, corridor_lengths, dead_end_corridors,
+          dead_end_length);
+    else
+        result = Py_BuildValue("nnOnn", diameter, solution_length, corridor_lengths,
+          dead_end_corridors, dead_end_length);
+
+done:
+    Py_XDECREF(corridor_lengths);
+    PyMem_Free(parents);
+    PyMem_Free(depths);
+    PyMem_Free(order);
+    PyMem_Free(heights);
+    PyMem_Free(below);
+    PyMem_Free(corridor_counts);
+    PyMem_Free(dead_below);
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&degrees);
+    return result;
+}
+
+
+PyDoc_STRVAR(braid_ends_doc,
+"braid_ends(cells, width, walls, ends, draws, limit, carved)\n\
+\n\
+The loop of ariadne.braiding.braid, as ariadne.braiding.braid_ends. ends is\n\
+an array('i'), draws holds two little-endian 16-bit words per dead end and\n\
+carved is a bytearray with a byte per dead end.");
+
+static int
+is_dead_end(unsigned char state)
+{
+    state &= 0xf;
+    return state && !(state & (state - 1));
+}
+
+static PyObject *
+braid_ends(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, walls, ends, draws, carved;
+    PyObject *ends_object;
+    Py_ssize_t width, limit, count, cell_count, i;
+    Py_ssize_t removed = 0;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "w*ny*Oy*nw*", &cells, &width, &walls, &ends_object, &draws,
+                          &limit, &carved))
+        return NULL;
+
+    if (PyObject_GetBuffer(ends_object, &ends, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0)
+        goto release_args;
+
+    if (ends.itemsize != sizeof(int) || strcmp(ends.format, "i") != 0) {
+        PyErr_SetString(PyExc_TypeError, "ends must be an array('i')");
+        goto release_all;
+    }
+
+    count = ends.len / ends.itemsize;
+    cell_count = cells.len;
+
+    if (width < 1 || cell_count % width || walls.len != cell_count || draws.len != 4 * count
+        || carved.len != count) {
+        PyErr_SetString(PyExc_ValueError, "cells, walls, ends, draws and carved do not match");
+        goto release_all;
+    }
+
+    for (i = 0; i < count; i++) {
+        int cell = ((const int *)ends.buf)[i];
+
+        if (cell < 0 || cell >= cell_count) {
+            PyErr_SetString(PyExc_IndexError, "cell index out of range");
+            goto release_all;
+        }
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        unsigned char *cell_bytes = cells.buf;
+        const unsigned char *wall_bytes = walls.buf;
+        const int *end_values = ends.buf;
+        const unsigned char *draw_bytes = draws.buf;
+        unsigned char *carved_bytes = carved.buf;
+
+        for (i = 0; i < count; i++) {
+            Py_ssize_t cell = end_values[i];
+            unsigned char closed, direction;
+            unsigned char options[4], dead_options[4];
+            int option_count = 0, dead_count = 0;
+            Py_ssize_t neighbor;
+
+            if (word_at(draw_bytes, 2 * i) >= limit || !is_dead_end(cell_bytes[cell]))
+                continue;
+
+            closed = ~(cell_bytes[cell] | wall_bytes[cell] | border_walls(cell, width, cell_count))
+                & 0xf;
+
+            for (direction = OPEN_NORTH; direction; direction >>= 1) {
+                if (!(closed & direction))
+                    continue;
+
+                options[option_count++] = direction;
+
+                if (is_dead_end(cell_bytes[cell + offset(direction, width)]))
+                    dead_options[dead_count++] = direction;
+            }
+
+            if (dead_count) {
+                direction = dead_options[(word_at(draw_bytes, 2 * i + 1) * dead_count) >> 16];
+            } else if (option_count) {
+                direction = options[(word_at(draw_bytes, 2 * i + 1) * option_count) >> 16];
+            } else {
+                continue;
+            }
+
+            neighbor = cell + offset(direction, width);
+            removed += 1 + is_dead_end(cell_bytes[neighbor]);
+            cell_bytes[cell] |= direction;
+            cell_bytes[neighbor] |= inverse(direction);
+            carved_bytes[i] = direction;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    result = PyLong_FromSsize_t(removed);
+
+release_all:
+    PyBuffer_Release(&ends);
+release_args:
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&walls);
+    PyBuffer_Release(&draws);
+    PyBuffer_Release(&carved);
+    return result;
+}
+
+
+/*
+ * Shared by the solver engines: checks the arguments, which are as in
+ * bfs_path, and returns the number of cells, or -1 with an exception set.
+ */
+static Py_ssize_t
+check_path_args(Py_buffer *cells, Py_ssize_t width, Py_ssize_t start, Py_ssize_t end,
+                Py_buffer *path)
+{
+    Py_ssize_t cell_count = cells->len;
+
+    if (path->itemsize != sizeof(int) || strcmp(path->format, "i") != 0) {
+        PyErr_SetString(PyExc_TypeError, "path must be an array('i')");
+        return -1;
+    }
+
+    if (width < 1 || cell_count % width || path->len != cell_count * (Py_ssize_t)sizeof(int)
+        || start < 0 || start >= cell_count || end < 0 || end >= cell_count) {
+        PyErr_SetString(PyExc_ValueError, "cells and path do not match the width and cell indices");
+        return -1;
+    }
+
+    return cell_count;
+}
+
+/* Writes the path from start to end, following parents back, to path. */
+static Py_ssize_t
+trace_path(const int *parents, Py_ssize_t start, Py_ssize_t end, int *path)
+{
+    Py_ssize_t length = 0, i;
+
+    for (i = end; i != start; i = parents[i])
+        path[length++] = (int)i;
+
+    path[length++] = (int)start;
+
+    for (i = 0; i < length / 2; i++) {
+        int cell = path[i];
+
+        path[i] = path[length - 1 - i];
+        path[length - 1 - i] = cell;
+    }
+
+    return length;
+}
+
+
+/*
+ * The breadth-first search of bfs_path, run without the GIL. Cells whose
+ * parent is not -1 are taken as reached already and never entered. The queue
+ * is kept in path, which the path itself overwrites. Returns the length of
+ * the path, or -1 if end can't be reached, and sets *past_border if an
+ * opening leads off the grid.
+ */
+static Py_ssize_t
+search(const unsigned char *cell_bytes, Py_ssize_t width, Py_ssize_t cell_count,
+       Py_ssize_t start, Py_ssize_t end, int *parents, int *path, int *past_border)
+{
+    Py_ssize_t head = 0, tail = 0;
+
+    parents[start] = (int)start;
+    path[tail++] = (int)start;
+
+    while (head < tail) {
+        Py_ssize_t current = path[head++];
+        unsigned char state = cell_bytes[current] & 0xf;
+        unsigned char direction;
+
+        if (current == end)
+            return trace_path(parents, start, end, path);
+
+        if (state & border_walls(current, width, cell_count)) {
+            *past_border = 1;
+            return -1;
+        }
+
+        for (direction = OPEN_NORTH; direction; direction >>= 1) {
+            Py_ssize_t neighbor;
+
+            if (!(state & direction))
+                continue;
+
+            neighbor = current + offset(direction, width);
+
+            if (parents[neighbor] == -1) {
+                parents[neighbor] = (int)current;
+                path[tail++] = (int)neighbor;
+            }
+        }
+    }
+
+    return -1;
+}
+
+PyDoc_STRVAR(bfs_path_doc,
+"bfs_path(cells, width, start, end, path)\n\
+\n\
+The search of ariadne.solvers.BreadthFirstSearch, as ariadne.solvers.bfs_path,\n\
+except that the path is written to path, an array('i') with an item per cell,\n\
+and its length returned, or -1 if end can't be reached. The rest of path is\n\
+used as scratch space.");
+
+static PyObject *
+bfs_path(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, path;
+    PyObject *path_object;
+    Py_ssize_t width, start, end, cell_count, length = -1;
+    int past_border = 0;
+    int *parents = NULL;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "y*nnnO", &cells, &width, &start, &end, &path_object))
+        return NULL;
+
+    if (PyObject_GetBuffer(path_object, &path,
+                           PyBUF_FORMAT | PyBUF_C_CONTIGUOUS | PyBUF_WRITABLE) < 0) {
+        PyBuffer_Release(&cells);
+        return NULL;
+    }
+
+    cell_count = check_path_args(&cells, width, start, end, &path);
+
+    if (cell_count < 0)
+        goto done;
+
+    parents = PyMem_Malloc(cell_count * sizeof(int));
+
+    if (parents == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        Py_ssize_t i;
+
+        for (i = 0; i < cell_count; i++)
+            parents[i] = -1;
+
+        length = search(cells.buf, width, cell_count, start, end, parents, path.buf,
+                        &past_border);
+    }
+    Py_END_ALLOW_THREADS
+
+    if (past_border) {
+        PyErr_SetString(PyExc_ValueError, "opening past the border of the maze");
+        goto done;
+    }
+
+    result = PyLong_FromSsize_t(length);
+
+done:
+    PyMem_Free(parents);
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&path);
+    return result;
+}
+
+
+PyDoc_STRVAR(dead_end_path_doc,
+"dead_end_path(cells, width, start, end, path)\n\
+\n\
+The filling of ariadne.solvers.DeadEndFilling, as\n\
+ariadne.solvers.dead_end_path, returning the path as bfs_path does and using\n\
+the rest of path as scratch space too.");
+
+static PyObject *
+dead_end_path(PyObject *module, PyObject *args)
+{
+    Py_buffer cells, path;
+    PyObject *path_object;
+    Py_ssize_t width, start, end, cell_count, length = -1;
+    int past_border = 0;
+    unsigned char *degrees = NULL, *filled = NULL;
+    int *dead_ends = NULL;
+    PyObject *result = NULL;
+
+    (void)module;
+
+    if (!PyArg_ParseTuple(args, "y*nnnO", &cells, &width, &start, &end, &path_object))
+        return NULL;
+
+    if (PyObject_GetBuffer(path_object, &path,
+                           PyBUF_FORMAT | PyBUF_C_CONTIGUOUS | PyBUF_WRITABLE) < 0) {
+        PyBuffer_Release(&cells);
+        return NULL;
+    }
+
+    cell_count = check_path_args(&cells, width, start, end, &path);
+
+    if (cell_count < 0)
+        goto done;
+
+    degrees = PyMem_Malloc(cell_count);
+    filled = PyMem_Calloc(cell_count, 1);
+    dead_ends = PyMem_Malloc(cell_count * sizeof(int));
+
+    if (degrees == NULL || filled == NULL || dead_ends == NULL) {
+        PyErr_NoMemory();
+        goto done;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        const unsigned char *cell_bytes = cells.buf;
+        Py_ssize_t count = 0, i;
+
+        for (i = 0; i < cell_count; i++) {
+            unsigned char state = cell_bytes[i] & 0xf;
+
+            if (state & border_walls(i, width, cell_count)) {
+                past_border = 1;
+                break;
+            }
+
+            degrees[i] = (state >> 3) + ((state >> 2) & 1) + ((state >> 1) & 1) + (state & 1);
+
+            if (degrees[i] <= 1 && i != start && i != end)
+                dead_ends[count++] = (int)i;
+        }
+
+        for (i = 0; i < count && !past_border; i++) {
+            Py_ssize_t dead_end = dead_ends[i];
+            unsigned char state = cell_bytes[dead_end] & 0xf;
+            unsigned char direction;
+
+            filled[dead_end] = 1;
+
+            for (direction = OPEN_NORTH; direction; direction >>= 1) {
+                Py_ssize_t neighbor;
+
+                if (!(state & direction))
+                    continue;
+
+                neighbor = dead_end + offset(direction, width);
+
+                if (filled[neighbor] || neighbor == start || neighbor == end)
+                    continue;
+
+                if (--degrees[neighbor] == 1)
+                    dead_ends[count++] = (int)neighbor;
+            }
+        }
+
+        /*
+         * Search what is left, which in a maze with loops still holds them.
+         * The dead ends are all filled by now, so their array holds the
+         * parents, with the filled cells marked as reached.
+         */
+        if (!past_border) {
+            for (i = 0; i < cell_count; i++)
+                dead_ends[i] = filled[i] ? (int)i : -1;
+
+            length = search(cell_bytes, width, cell_count, start, end, dead_ends, path.buf,
+                            &past_border);
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    if (past_border) {
+        PyErr_SetString(PyExc_ValueError, "opening past the border of the maze");
+        goto done;
+    }
+
+    result = PyLong_FromSsize_t(length);
+
+done:
+    PyMem_Free(degrees);
+    PyMem_Free(filled);
+    PyMem_Free(dead_ends);
+    PyBuffer_Release(&cells);
+    PyBuffer_Release(&path);
+    return result;
+}
+
+
+static PyMethodDef speedups_methods[] = {
+    {"carve", carve, METH_VARARGS, carve_doc},
+    {"backtrack", backtrack, METH_VARARGS, backtrack_doc},
+    {"ellers_row", ellers_row, METH_VARARGS, ellers_row_doc},
+    {"kruskal", kruskal, METH_VARARGS, kruskal_doc},
+    {"walk_tree", walk_tree, METH_VARARGS, walk_tree_doc},
+    {"braid_ends", braid_ends, METH_VARARGS, braid_ends_doc},
+    {"bfs_path", bfs_path, METH_VARARGS, bfs_path_doc},
+    {"dead_end_path", dead_end_path, METH_VARARGS, dead_end_path_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "ariadne._speedups",
+    "Compiled engines for ariadne; see ariadne/_speedups.c.",
+    -1,
+    speedups_methods,
+    NULL,
+    NULL,
+    NULL,
+    NULL
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
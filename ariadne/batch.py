@@ -0,0 +1,122 @@
+import collections
+import itertools
+import os
+
+from .mazes import Maze
+
+"""
+Generate lots of mazes at once, spread over several processes.
+
+Every maze is generated from its own seed so that the result does not depend on
+which worker happened to pick it up. Workers send back the raw cell bytes of
+each maze instead of a pickled Maze.
+"""
+
+def generate_packed(generator, width, height, seed, mask=None):
+    """
+    Generates one maze, masked with mask if given, and returns its cells as
+    `bytes`, laid out as in `Maze.cells`.
+    """
+    return bytes(generator.generate(width, height, seed, mask).cells)
+
+def _generate_chunk(generator, tasks, mask=None):
+    return [generate_packed(generator, width, height, seed, mask) for width, height, seed in tasks]
+
+def _normalize_sizes(sizes, seeds):
+    sizes = list(sizes)
+
+    if len(sizes) == 2 and all(isinstance(side, int) for side in sizes):
+        return itertools.repeat(tuple(sizes), len(seeds))
+
+    if len(sizes) != len(seeds):
+        raise ValueError("Got %s sizes but %s seeds" % (len(sizes), len(seeds)))
+
+    return sizes
+
+def process_pool(workers, task_count, chunksize=None):
+    """
+    Returns a tuple of (executor, worker_count, chunksize) for spreading
+    task_count tasks over workers processes, workers and chunksize being as in
+    `generate_many`. executor is a new ProcessPoolExecutor, to be used as a
+    context manager.
+    """
+    worker_count = workers or os.cpu_count() or 1
+
+    if chunksize is None:
+        chunksize = max(1, min(64, task_count // (worker_count * 4)))
+
+    # Imported here rather than at the top: concurrent.futures pulls in
+    # multiprocessing and logging, which processes that never get here should
+    # not pay for at startup.
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=worker_count), worker_count, chunksize
+
+def imap_generate_packed(generator, sizes, seeds, workers=None, chunksize=None, mask=None):
+    """
+    Like `generate_many` but lazily yields `(width, height, cells)` tuples in
+    the order of `seeds`, where cells is a `bytes` as returned by
+    `generate_packed`.
+
+    Only a bounded number of chunks is in flight at any time so that the mazes
+    can be consumed (e.g. written to disk) as fast as they are produced without
+    piling up in memory.
+    """
+    seeds = list(seeds)
+    tasks = [(width, height, seed) for (width, height), seed in zip(_normalize_sizes(sizes, seeds), seeds)]
+
+    if workers is not None and workers <= 1:
+        for width, height, seed in tasks:
+            yield width, height, generate_packed(generator, width, height, seed, mask)
+        return
+
+    executor, worker_count, chunksize = process_pool(workers, len(tasks), chunksize)
+
+    with executor:
+        chunks = [tasks[start:start + chunksize] for start in range(0, len(tasks), chunksize)]
+        chunks = iter(chunks)
+        in_flight = collections.deque()
+
+        for chunk in itertools.islice(chunks, worker_count * 2):
+            in_flight.append((chunk, executor.submit(_generate_chunk, generator, chunk, mask)))
+
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            results = future.result()
+
+            for next_chunk in itertools.islice(chunks, 1):
+                in_flight.append((next_chunk, executor.submit(_generate_chunk, generator, next_chunk,
+                  mask)))
+
+            for (width, height, _), cells in zip(chunk, results):
+                yield width, height, cells
+
+def generate_many(generator, sizes, seeds, workers=None, chunksize=None, mask=None):
+    """
+    Generates one maze per seed with the given MazeGenerator instance and
+    returns them as a list of Mazes, in the order of `seeds`.
+
+    sizes - either a single (width, height) pair used for every maze or a
+      sequence of such pairs, one per seed.
+    seeds - the seed of each maze, see MazeGenerator.generate. Generating with
+      the same seeds gives the same mazes no matter how many workers are used.
+    workers - the number of worker processes; defaults to the number of CPUs.
+      With 0 or 1 worker everything runs in the current process.
+    chunksize - how many mazes a worker generates per round trip.
+    mask - a mask for every maze, see `Maze.mask`; the sizes must match it.
+    """
+    seeds = list(seeds)
+    mazes = []
+
+    for seed, (width, height, cells) in zip(seeds,
+      imap_generate_packed(generator, sizes, seeds, workers, chunksize, mask)):
+        maze = Maze.from_buffer(width, height, bytearray(cells))
+        maze.mask = mask
+        maze.algorithm = generator.algorithm
+
+        if isinstance(seed, int):
+            maze.seed = seed
+
+        mazes.append(maze)
+
+    return mazes
@@ -0,0 +1,239 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from .mazes import SPEEDUPS_AVAILABLE
+from .generators import GENERATORS
+
+"""
+Benchmarks for the maze generators.
+
+Run `python -m ariadne.benchmark --help` for usage. Every generator is run over
+a sweep of sizes with a fixed seed, first a few times untraced for timing and
+then once under tracemalloc for memory. Results are printed as a table and can
+be saved as JSON and compared against an earlier run to catch regressions.
+
+`--import-time` instead times how long a fresh interpreter takes to import
+what a worker generating mazes needs, and fails if that goes over a budget.
+"""
+
+# From 10^2 to 10^6 cells.
+DEFAULT_SIZES = [(10, 10), (32, 32), (100, 100), (316, 316), (1000, 1000)]
+
+# The largest number of cells the default sizes go up to for generators too
+# slow to run on all of them.
+DEFAULT_CELL_LIMITS = {
+    "AldousBroder": 100 * 100,
+}
+
+DEFAULT_SEED = 20140101
+
+# What a short-lived worker imports to generate a maze, and the most seconds it
+# may take in a fresh interpreter.
+IMPORT_STATEMENT = "from ariadne import Maze, RecursiveBacktracker"
+IMPORT_BUDGET = 0.1
+
+# Run in a fresh interpreter by measure_import.
+IMPORT_SCRIPT = """
+import sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start, len(set(sys.modules) - before))
+"""
+
+def measure(generator, width, height, seed=DEFAULT_SEED, repeat=3):
+    """
+    Benchmarks generator on one size. Returns a dict with the best wall time
+    in seconds over repeat runs, the cells generated per second, the peak
+    traced memory in bytes, the number of memory blocks still allocated by the
+    generation when it returned and the number of garbage collections it
+    triggered.
+    """
+    cell_count = width * height
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generator.generate(width, height, seed)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    tracemalloc.start()
+
+    try:
+        baseline = tracemalloc.take_snapshot()
+        maze = generator.generate(width, height, seed)
+        _, peak = tracemalloc.get_traced_memory()
+        retained = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    finally:
+        tracemalloc.stop()
+
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    best = min(timings)
+    del maze
+
+    return {
+        "generator": generator.__class__.__name__,
+        "width": width,
+        "height": height,
+        "cells": cell_count,
+        "seconds": best,
+        "cells_per_second": cell_count / best if best else None,
+        "peak_bytes": peak,
+        "retained_blocks": sum(stat.count_diff for stat in retained),
+        "gc_collections": collections,
+    }
+
+def measure_import(statement=IMPORT_STATEMENT, repeat=5):
+    """
+    Times statement in repeat fresh interpreters. Returns a dict with the best
+    wall time in seconds and the number of modules the statement loaded.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    timings = []
+
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT % statement], env=env,
+          stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+        seconds, modules = output.split()
+        timings.append(float(seconds))
+
+    return {
+        "statement": statement,
+        "seconds": min(timings),
+        "modules": int(modules),
+    }
+
+def default_sizes(generator_name):
+    limit = DEFAULT_CELL_LIMITS.get(generator_name)
+    return [(width, height) for width, height in DEFAULT_SIZES
+      if limit is None or width * height <= limit]
+
+def run(generator_names=None, sizes=None, seed=DEFAULT_SEED, repeat=3, report=None):
+    """
+    Benchmarks every named generator (all of GENERATORS by default) on every
+    size, DEFAULT_SIZES by default, within DEFAULT_CELL_LIMITS. report, if
+    given, is called with each result as soon as it is available. Returns the
+    whole run as a JSON-friendly dict.
+    """
+    results = []
+
+    for name in generator_names or sorted(GENERATORS):
+        generator = GENERATORS[name]()
+
+        for width, height in sizes or default_sizes(name):
+            result = measure(generator, width, height, seed, repeat)
+            results.append(result)
+
+            if report is not None:
+                report(result)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "speedups": SPEEDUPS_AVAILABLE,
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two runs as returned by `run`. Returns a list of
+    (generator, width, height, metric, old, new) tuples for every measurement
+    that got worse by more than threshold (a fraction) in wall time or peak
+    memory. Sizes only present in one of the runs are ignored.
+    """
+    def key(result):
+        return result["generator"], result["width"], result["height"]
+
+    old_results = dict((key(result), result) for result in baseline["results"])
+    regressions = []
+
+    for result in current["results"]:
+        old = old_results.get(key(result))
+
+        if old is None:
+            continue
+
+        for metric in ("seconds", "peak_bytes"):
+            if result[metric] > old[metric] * (1 + threshold):
+                regressions.append(key(result) + (metric, old[metric], result[metric]))
+
+    return regressions
+
+def format_result(result):
+    return "%-22s %6dx%-6d %10.4fs %12.0f cells/s %10.1f KiB peak %9d blocks" % (
+      result["generator"], result["width"], result["height"], result["seconds"],
+      result["cells_per_second"] or 0, result["peak_bytes"] / 1024.0, result["retained_blocks"])
+
+def parse_size(size):
+    width, _, height = size.lower().partition("x")
+    return int(width), int(height or width)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ariadne.benchmark",
+      description="Benchmark the maze generators.")
+    parser.add_argument("generators", nargs="*",
+      help="generators to run, out of %s (default: all)" % ", ".join(sorted(GENERATORS)))
+    parser.add_argument("--sizes", type=lambda sizes: [parse_size(size) for size in sizes.split(",")],
+      help="comma-separated WIDTHxHEIGHT sizes (default: %s)" % ",".join(
+        "%dx%d" % size for size in DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+      help="relative slowdown or memory growth that counts as a regression")
+    parser.add_argument("--import-time", action="store_true",
+      help="only time %r in a fresh interpreter" % IMPORT_STATEMENT)
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+      help="seconds the import may take before --import-time fails (default: %s)" % IMPORT_BUDGET)
+    args = parser.parse_args(argv)
+
+    if args.import_time:
+        result = measure_import(repeat=args.repeat)
+        print("%s: %.4fs, %d modules" % (result["statement"], result["seconds"], result["modules"]))
+
+        if result["seconds"] > args.import_budget:
+            print("OVER BUDGET %.4fs > %.4fs" % (result["seconds"], args.import_budget))
+            return 1
+
+        return 0
+
+    for name in args.generators:
+        if name not in GENERATORS:
+            parser.error("unknown generator %r" % name)
+
+    current = run(args.generators, args.sizes, args.seed, args.repeat,
+      report=lambda result: print(format_result(result)))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(current, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(json.load(baseline_file), current, args.threshold)
+
+        for generator, width, height, metric, old, new in regressions:
+            print("REGRESSION %s %dx%d %s: %s -> %s" % (generator, width, height, metric, old, new))
+
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
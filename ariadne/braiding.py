@@ -0,0 +1,107 @@
+import itertools
+
+from array import array
+
+from .mazes import MazeCellStates, get_offsets
+from .metrics import DEAD_ENDS
+from .rng import draw_words, get_random, words
+
+"""
+Braiding: adding loops to a perfect maze by removing some of its dead ends.
+
+Dead ends are found in bulk: every cell state is mapped to 1 if it has a single
+opening with a translation table and the indices of the 1s are picked out at C
+speed. All the random numbers are drawn at once too, two 16-bit words per dead
+end: the first decides whether it is removed, the second which of its walls is
+opened. Only the dead ends are then looked at one by one. A dead end is removed
+by opening one of its walls, into a neighbor that is a dead end too if it has
+one, so that one passage removes two dead ends.
+
+The walls around masked cells are border walls, so braiding never opens into
+them.
+"""
+
+def _closed_walls(width):
+    # Maps the walls of a cell that could be opened to the (direction, index
+    # offset) of each of them.
+    offsets = get_offsets(width)
+    return tuple(
+        tuple((direction, offsets[direction]) for direction in MazeCellStates.CARDINAL
+          if walls & direction)
+        for walls in range(16)
+    )
+
+def dead_ends(maze):
+    """
+    Returns the flat indices of the dead ends of maze, the cells with exactly
+    one opening, in order as an array("i").
+    """
+    plane = bytes(maze.cells).translate(DEAD_ENDS)
+    return array("i", itertools.compress(range(len(plane)), plane))
+
+def braid_ends(cells, width, walls, ends, draws, limit, carved):
+    """
+    The loop of `braid`, on a copy of the cells of the maze. walls is
+    Maze.border_walls and ends the dead ends. draws holds two little-endian
+    16-bit words per dead end: a dead end is removed if its first word is below
+    limit, through the wall its second word picks. The wall opened from
+    ends[i] goes to carved[i], which is left 0 if none is. Returns how many
+    dead ends are gone.
+
+    The compiled engine has the same function, which has to give the same
+    results.
+    """
+    closed_walls = _closed_walls(width)
+    inverses = MazeCellStates.INVERSES
+    draws = words(draws)
+    removed = 0
+
+    for index, cell in enumerate(ends):
+        if draws[2 * index] >= limit or not DEAD_ENDS[cells[cell]]:
+            continue
+
+        options = closed_walls[~(cells[cell] | walls[cell]) & 0xf]
+        options = [wall for wall in options if DEAD_ENDS[cells[cell + wall[1]]]] or options
+
+        if not options:
+            continue
+
+        direction, offset = options[draws[2 * index + 1] * len(options) >> 16]
+        neighbor = cell + offset
+        removed += 1 + DEAD_ENDS[cells[neighbor]]
+        cells[cell] |= direction
+        cells[neighbor] |= inverses[direction]
+        carved[index] = direction
+
+    return removed
+
+def braid(maze, fraction=1.0, seed=None):
+    """
+    Removes dead ends from maze, picking each with probability fraction (so
+    that 1.0 removes all it can and 0.0 none), and returns how many dead ends
+    are gone. That can be more than were picked, since opening a dead end into
+    another removes both. A dead end all of whose walls are border walls is
+    left alone.
+
+    seed is as in MazeGenerator.generate. With the same seed, the dead ends
+    removed with a lower fraction are among those removed with a higher one.
+    """
+    if not 0.0 <= fraction <= 1.0:
+        raise ValueError("fraction must be between 0 and 1, got %r" % (fraction,))
+
+    ends = dead_ends(maze)
+
+    if not ends:
+        return 0
+
+    draws = draw_words(get_random(seed), 2 * len(ends))
+    # Braided on a copy, which tells which cells are still dead ends, then
+    # carved into the maze all at once.
+    cells = bytearray(maze.cells)
+    carved = bytearray(len(ends))
+    engine = braid_ends if maze.speedups is None else maze.speedups.braid_ends
+    removed = engine(cells, maze.width, maze.border_walls, ends, draws,
+      int(fraction * 0x10000), carved)
+
+    maze.carve(array("i", itertools.compress(ends, carved)), carved.translate(None, b"\0"))
+    return removed
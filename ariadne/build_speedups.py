@@ -0,0 +1,32 @@
+import os
+
+"""
+Builds the optional compiled engines in ariadne/_speedups.c in place:
+
+    python -m ariadne.build_speedups
+
+ariadne works the same without them, only slower; whether they are in use is
+told by ariadne.mazes.SPEEDUPS_AVAILABLE. Needs setuptools and a C compiler.
+"""
+
+def build():
+    from setuptools import Distribution, Extension
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    extension = Extension("ariadne._speedups", [os.path.join(package_dir, "_speedups.c")],
+      extra_compile_args=["-O3"] if os.name == "posix" else [])
+    distribution = Distribution({"name": "ariadne", "ext_modules": [extension]})
+    command = distribution.get_command_obj("build_ext")
+    command.inplace = True
+    command.build_temp = os.path.join(os.path.dirname(package_dir), "build")
+    # In-place builds land relative to the working directory.
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(package_dir))
+
+    try:
+        distribution.run_command("build_ext")
+    finally:
+        os.chdir(cwd)
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,192 @@
+import argparse
+import os
+import random
+import sys
+
+from .batch import imap_generate_packed
+from .generators import GENERATORS, Braided, GrowingTree
+from .masks import from_pbm
+from .mazes import Maze
+from .rendering import write_ascii, write_pbm, write_png
+from .serialization import dump
+
+"""
+Generates mazes in bulk from the command line.
+
+Run `python -m ariadne --help` for usage. Mazes are generated by a pool of
+worker processes and written out one at a time as they come back, in the order
+of their seeds, so that any number of them can be generated without holding
+more than a few in memory. Every maze is generated from its own seed, and a
+maze of random size draws its size from its seed too, so any maze can be made
+again on its own from its seed.
+"""
+
+# Format name to (file extension, writer taking a Maze and a binary file).
+FORMATS = {
+    "ascii": ("txt", write_ascii),
+    "binary": ("maze", dump),
+    "pbm": ("pbm", write_pbm),
+    "png": ("png", write_png),
+}
+
+def parse_range(text):
+    """
+    Parses "N" or "MIN-MAX" into an inclusive (MIN, MAX) pair. Either number
+    may be negative: a "-" starting a number is its sign, not the separator.
+    """
+    separator = text.find("-", 1)
+
+    if separator == -1:
+        low = high = int(text)
+    else:
+        low, high = int(text[:separator]), int(text[separator + 1:])
+
+    if low > high:
+        raise ValueError("empty range %s" % text)
+
+    return low, high
+
+def parse_size(text):
+    """
+    Parses WIDTHxHEIGHT, where either side may be a range MIN-MAX, into a pair
+    of inclusive ranges. A single side is used for both.
+    """
+    width, _, height = text.lower().partition("x")
+    return parse_range(width), parse_range(height or width)
+
+def parse_seeds(text):
+    """
+    Parses a comma-separated list of seeds and inclusive ranges of seeds
+    START-END into a list of seeds.
+    """
+    seeds = []
+
+    for part in text.split(","):
+        low, high = parse_range(part)
+        seeds.extend(range(low, high + 1))
+
+    return seeds
+
+def join_seed_values(argv):
+    """
+    Returns argv with every "--seed" followed by a value starting with a
+    negative number, such as "-3--1" or "-3,5", joined into "--seed=VALUE".
+    argparse would otherwise take any such value but a plain negative number
+    for an option.
+    """
+    joined = []
+    values = iter(argv)
+
+    for arg in values:
+        if arg == "--seed":
+            value = next(values, None)
+
+            if value is not None and value[:1] == "-" and value[1:2].isdigit():
+                joined.append("--seed=" + value)
+                continue
+
+            joined.append(arg)
+
+            if value is not None:
+                joined.append(value)
+        else:
+            joined.append(arg)
+
+    return joined
+
+def maze_size(size, seed):
+    """
+    Returns the (width, height) of the maze generated from seed for a size as
+    given by `parse_size`.
+    """
+    (min_width, max_width), (min_height, max_height) = size
+
+    if min_width == max_width and min_height == max_height:
+        return min_width, min_height
+
+    rng = random.Random(seed)
+    return rng.randint(min_width, max_width), rng.randint(min_height, max_height)
+
+def file_name(maze, extension):
+    return "%s_%dx%d_%d.%s" % (maze.algorithm, maze.width, maze.height, maze.seed, extension)
+
+def main(argv=None, stdout=None):
+    parser = argparse.ArgumentParser(prog="python -m ariadne",
+      description="Generate mazes in bulk.")
+    parser.add_argument("generator", choices=sorted(GENERATORS), metavar="GENERATOR",
+      help="one of %s" % ", ".join(sorted(GENERATORS)))
+    parser.add_argument("--size", type=parse_size, default=parse_size("20x20"),
+      help="WIDTHxHEIGHT, either of which may be a range MIN-MAX to draw from (default: 20x20)")
+    parser.add_argument("--seed", type=parse_seeds,
+      help="seeds to generate from, as a comma-separated list of seeds and ranges START-END, "
+      "any of which may be negative, as in -3--1,5 (default: a random one)")
+    parser.add_argument("--count", type=int,
+      help="generate this many mazes from consecutive seeds starting at --seed")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ascii")
+    parser.add_argument("--output", metavar="DIRECTORY",
+      help="write every maze to its own file in this directory instead of to stdout")
+    parser.add_argument("--workers", type=int,
+      help="number of worker processes (default: one per CPU; 1 to run in-process)")
+    parser.add_argument("--selector", choices=sorted(GrowingTree.SELECTORS), default="newest",
+      help="which active cell GrowingTree grows next")
+    parser.add_argument("--braid", type=float, metavar="FRACTION",
+      help="remove this fraction of the dead ends, between 0 and 1, to make loops")
+    parser.add_argument("--mask", metavar="FILE",
+      help="a PBM image whose black pixels are the cells of every maze; sets the size")
+    args = parser.parse_args(join_seed_values(sys.argv[1:] if argv is None else argv))
+
+    if stdout is None:
+        stdout = sys.stdout.buffer
+
+    seeds = args.seed or [random.getrandbits(63)]
+
+    if args.count is not None:
+        if len(seeds) != 1:
+            parser.error("--count needs a single --seed to start from")
+        seeds = list(range(seeds[0], seeds[0] + args.count))
+
+    extension, write = FORMATS[args.format]
+
+    if args.format == "png" and args.output is None and len(seeds) > 1:
+        parser.error("several PNG images need --output")
+
+    generator_class = GENERATORS[args.generator]
+    generator = generator_class(args.selector) if generator_class is GrowingTree else generator_class()
+
+    if args.braid is not None:
+        if not 0.0 <= args.braid <= 1.0:
+            parser.error("--braid must be between 0 and 1")
+        generator = Braided(generator, args.braid)
+
+    mask = None
+
+    if args.mask is not None:
+        with open(args.mask, "rb") as fileobj:
+            width, height, mask = from_pbm(fileobj.read())
+        sizes = (width, height)
+    else:
+        sizes = [maze_size(args.size, seed) for seed in seeds]
+
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+
+    mazes = imap_generate_packed(generator, sizes, seeds, args.workers, mask=mask)
+
+    for index, (seed, (width, height, cells)) in enumerate(zip(seeds, mazes)):
+        maze = Maze.from_buffer(width, height, cells)
+        maze.mask = mask
+        maze.algorithm = generator.algorithm
+        maze.seed = seed
+
+        if args.output is None:
+            # ASCII mazes are told apart by a blank line; the other formats
+            # carry their own sizes.
+            if index and args.format == "ascii":
+                stdout.write(b"\n")
+            write(maze, stdout)
+        else:
+            with open(os.path.join(args.output, file_name(maze, extension)), "wb") as fileobj:
+                write(maze, fileobj)
+
+    stdout.flush()
+    return 0
@@ -0,0 +1,65 @@
+from array import array
+
+class DisjointSets(object):
+    """
+    A union-find over the integers [0, size).
+
+    The forest lives in flat arrays: `parents` holds the parent of every element
+    (roots are their own parent) and `ranks` an upper bound on the height of
+    every root's tree. `find` compresses the path it walks and `union` hangs the
+    shorter tree under the taller one, so any sequence of operations runs in
+    effectively constant amortized time per operation.
+    """
+
+    def __init__(self, size):
+        self.parents = array("i", range(size))
+        # Ranks never exceed log2(size) so a byte is plenty.
+        self.ranks = bytearray(size)
+        self.count = size
+
+    def __len__(self):
+        return len(self.parents)
+
+    def find(self, element):
+        """
+        Returns the representative of the set containing element.
+        """
+        parents = self.parents
+        root = element
+
+        while parents[root] != root:
+            root = parents[root]
+
+        while parents[element] != root:
+            parents[element], element = root, parents[element]
+
+        return root
+
+    def union(self, a, b):
+        """
+        Merges the sets containing a and b. Returns True if they were disjoint
+        before the call and False if they already were in the same set.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+
+        if root_a == root_b:
+            return False
+
+        ranks = self.ranks
+        rank_a = ranks[root_a]
+        rank_b = ranks[root_b]
+
+        if rank_a < rank_b:
+            self.parents[root_a] = root_b
+        elif rank_a > rank_b:
+            self.parents[root_b] = root_a
+        else:
+            self.parents[root_b] = root_a
+            ranks[root_a] = rank_a + 1
+
+        self.count -= 1
+        return True
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
@@ -0,0 +1,260 @@
+import struct
+
+from array import array
+
+from .errors import InvalidMazeFileException, InvalidSizeException
+from .serialization import pack_nibbles, unpack_nibbles
+
+"""
+Change tracking for mazes edited after they were generated.
+
+An EditJournal remembers what every cell edited through the Maze methods was
+before its first edit, so that it can tell which cells really changed. A
+MazePatch holds the changed cells of a maze as runs of consecutive flat
+indices and can be applied to another copy of the maze. Its binary form is a
+little-endian header:
+
+    magic        4 bytes, always b"ARDP"
+    version      uint8
+    reserved     uint8 and uint16, always 0
+    width        uint32
+    height       uint32
+    run count    uint32
+
+followed, for every run, by its start index and its length as uint32 and by its
+cells packed two per byte as in ariadne.serialization.
+"""
+
+MAGIC = b"ARDP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBBHIII")
+RUN = struct.Struct("<II")
+
+# Changed cells fewer than this many cells apart go in the same run: the
+# unchanged cells in between cost less than the header of another run.
+MERGE_GAP = 2 * RUN.size
+
+# Cells are compared this many at a time when diffing whole mazes.
+BLOCK_SIZE = 64
+
+
+class MazePatch(object):
+
+    def __init__(self, width, height, runs):
+        """
+        runs is a list of (start, cells) pairs, cells being `bytes` of the new
+        states of the cells from flat index start on.
+        """
+        self.width = width
+        self.height = height
+        self.runs = runs
+
+    @classmethod
+    def from_indices(cls, maze, indices):
+        """
+        Returns the patch that sets the cells at the given sorted flat indices
+        to their current state in maze.
+        """
+        cells = maze.cells
+        runs = []
+        start = end = None
+
+        for index in indices:
+            if start is not None and index - end < MERGE_GAP:
+                end = index + 1
+                continue
+
+            if start is not None:
+                runs.append((start, bytes(cells[start:end])))
+
+            start = index
+            end = index + 1
+
+        if start is not None:
+            runs.append((start, bytes(cells[start:end])))
+
+        return cls(maze.width, maze.height, runs)
+
+    def __len__(self):
+        """
+        The number of cells in the patch.
+        """
+        return sum(len(cells) for _, cells in self.runs)
+
+    def __eq__(self, other):
+        return (self.width, self.height, self.runs) == (other.width, other.height, other.runs)
+
+    def changed_indices(self):
+        """
+        Returns the flat indices of the cells in the patch as an array("i").
+        """
+        indices = array("i")
+
+        for start, cells in self.runs:
+            indices.extend(range(start, start + len(cells)))
+
+        return indices
+
+    def regions(self):
+        """
+        Yields the patch as (row, col, cells) pieces that do not cross the end
+        of a row, for clients that redraw the maze row by row.
+        """
+        width = self.width
+
+        for start, cells in self.runs:
+            offset = 0
+
+            while offset < len(cells):
+                row, col = divmod(start + offset, width)
+                length = min(width - col, len(cells) - offset)
+                yield row, col, cells[offset:offset + length]
+                offset += length
+
+    def apply(self, maze):
+        """
+        Writes the cells of the patch into maze, which has to be of the same
+        size. Edits are recorded in the journal of maze, if it has one.
+        """
+        if (maze.width, maze.height) != (self.width, self.height):
+            raise InvalidSizeException(maze.width, maze.height)
+
+        cells = maze.cells
+        journal = maze.journal
+
+        for start, run_cells in self.runs:
+            end = start + len(run_cells)
+
+            if start < 0 or end > len(cells):
+                raise ValueError("Run of %s cells at %s is out of the maze" % (len(run_cells), start))
+
+            if journal is not None:
+                for index in range(start, end):
+                    journal.record(index)
+
+            cells[start:end] = run_cells
+
+    def dumps(self):
+        parts = [HEADER.pack(MAGIC, VERSION, 0, 0, self.width, self.height, len(self.runs))]
+
+        for start, cells in self.runs:
+            parts.append(RUN.pack(start, len(cells)))
+            parts.append(pack_nibbles(cells))
+
+        return b"".join(parts)
+
+    @classmethod
+    def loads(cls, buf):
+        if len(buf) < HEADER.size:
+            raise InvalidMazeFileException("truncated header")
+
+        magic, version, _, _, width, height, run_count = HEADER.unpack_from(buf)
+
+        if magic != MAGIC:
+            raise InvalidMazeFileException("bad magic %r" % magic)
+
+        if version != VERSION:
+            raise InvalidMazeFileException("unsupported version %s" % version)
+
+        runs = []
+        offset = HEADER.size
+
+        for _ in range(run_count):
+            if len(buf) < offset + RUN.size:
+                raise InvalidMazeFileException("truncated run")
+
+            start, length = RUN.unpack_from(buf, offset)
+            offset += RUN.size
+            packed_length = (length + 1) // 2
+
+            if start + length > width * height:
+                raise InvalidMazeFileException("run of %s cells at %s is out of the maze" %
+                  (length, start))
+
+            runs.append((start, bytes(unpack_nibbles(buf[offset:offset + packed_length], length))))
+            offset += packed_length
+
+        if offset != len(buf):
+            raise InvalidMazeFileException("%s trailing bytes" % (len(buf) - offset))
+
+        return cls(width, height, runs)
+
+
+def diff(old, new):
+    """
+    Returns the MazePatch that turns the maze old into the maze new.
+    """
+    if (old.width, old.height) != (new.width, new.height):
+        raise InvalidSizeException(new.width, new.height)
+
+    old_cells = old.cells
+    new_cells = new.cells
+    cell_count = len(new_cells)
+    changed = array("i")
+
+    # Compare whole blocks, which is done in C, and only look at single cells
+    # in the blocks that differ.
+    for block in range(0, cell_count, BLOCK_SIZE):
+        end = min(block + BLOCK_SIZE, cell_count)
+
+        if old_cells[block:end] != new_cells[block:end]:
+            changed.extend(index for index in range(block, end)
+              if old_cells[index] != new_cells[index])
+
+    return MazePatch.from_indices(new, changed)
+
+
+class EditJournal(object):
+    """
+    Records the cells of a maze as they are edited. Usually made through
+    `Maze.start_journal`.
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+        # The state of every recorded cell before its first edit.
+        self.originals = {}
+
+    def record(self, index):
+        """
+        Called with the flat index of every cell about to be edited.
+        """
+        if index not in self.originals:
+            self.originals[index] = self.maze.cells[index]
+
+    def __len__(self):
+        return len(self.originals)
+
+    def changed_indices(self):
+        """
+        Returns the sorted flat indices of the cells that are not what they
+        were when first recorded, as an array("i").
+        """
+        cells = self.maze.cells
+        return array("i", sorted(index for index, state in self.originals.items()
+          if cells[index] != state))
+
+    def patch(self):
+        """
+        Returns the MazePatch bringing a copy of the maze from before the
+        edits up to date.
+        """
+        return MazePatch.from_indices(self.maze, self.changed_indices())
+
+    def undo(self):
+        """
+        Puts every recorded cell back the way it was and clears the journal.
+        """
+        cells = self.maze.cells
+
+        for index, state in self.originals.items():
+            cells[index] = state
+
+        self.clear()
+
+    def clear(self):
+        """
+        Forgets the edits recorded so far, e.g. once they have been sent.
+        """
+        self.originals.clear()
@@ -18,3 +18,19 @@ class InvalidSizeException(Exception):
 
     def __str__(self):
         return "Invalid size: width=%s, height=%s" % (self.width, self.height)
+
+class InvalidMazeFileException(Exception):
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __str__(self):
+        return "Invalid maze file: %s" % self.reason
+
+class InvalidMazeException(Exception):
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __str__(self):
+        return "Invalid maze: %s" % self.reason
@@ -1,184 +1,853 @@
+import functools
+import itertools
 import math
-import random
 
-from .mazes import Maze, MazeCellStates
-from .errors import CantTearWallException
+from array import array
+
+from .braiding import braid
+from .disjointsets import DisjointSets
+from .errors import InvalidSizeException
+from .masks import connect_regions, mask_regions
+from .mazes import MASKED_FLAGS, Maze, MazeCellStates, get_offsets, _speedups
+from .profiling import phase, profiled, tree_depth
+from .rng import (BYTE_LIMITS, BulkRandom, draw_bytes, draw_digits, draw_dwords, draw_words,
+  get_random, shuffle, words)
 
 """
 Don't think of Python generators. This is None of those!
 """
 
+# Maps the border walls of a cell to the directions it may be opened in.
+INNER_DIRECTIONS = bytes(~state & 0xf for state in range(256))
+
+@functools.lru_cache(maxsize=64)
+def get_steps(width):
+    """
+    Like ariadne.mazes.get_moves but maps every cell state to the tuple of
+    (direction, index offset) of each of its openings.
+    """
+    offsets = get_offsets(width)
+    return tuple(
+        tuple((direction, offsets[direction]) for direction in MazeCellStates.CARDINAL
+          if state & direction)
+        for state in range(16)
+    )
+
+@functools.lru_cache(maxsize=64)
+def get_step_picks(width):
+    """
+    Maps every cell state to a tuple of 256 entries, one per value of a random
+    byte, each being one of the steps `get_steps` gives for that state, all of
+    them equally likely. Entries for bytes that would skew the odds are None,
+    and such bytes have to be redrawn (see ariadne.rng.BYTE_LIMITS).
+    """
+    return tuple(
+        tuple(steps[byte % len(steps)] if byte < BYTE_LIMITS[len(steps)] else None
+          for byte in range(256))
+        for steps in get_steps(width)
+    )
+
+"""
+Helpers for the row generators. A row is `bytes` of cell states; rows of random
+choices are drawn as strings of the ASCII digits 0 and 1 and turned into cell
+states with translation tables, so that no Python code runs per cell.
+"""
+
+def _digit_table(one, zero=MazeCellStates.NO_OPEN):
+    table = bytearray(256)
+    table[ord("1")] = one
+    table[ord("0")] = zero
+    return bytes(table)
+
+NORTH_TO_SOUTH = bytes(MazeCellStates.OPEN_SOUTH if state & MazeCellStates.OPEN_NORTH else 0
+  for state in range(256))
+
+def _merge(*rows):
+    """
+    ORs together rows of the same length.
+    """
+    merged = 0
+    for row in rows:
+        merged |= int.from_bytes(row, "big")
+    return merged.to_bytes(len(rows[0]), "big")
+
+def _open_south(rows):
+    """
+    Takes rows that only open north, east and west and yields them with the
+    southern openings matching the northern openings of the row below. Each
+    row is thus yielded once the next one is known.
+    """
+    above = None
+
+    for row in rows:
+        if above is not None:
+            yield _merge(above, row.translate(NORTH_TO_SOUTH))
+        above = row
+
+    if above is not None:
+        yield above
+
+
 class MazeGenerator(object):
+
+    # The compiled engines of ariadne._speedups, if built. Generators that have
+    # a compiled engine use it unless this is set to None.
+    speedups = _speedups
+    # The ariadne.profiling.Profiler to record generations into, or None. While
+    # a profiled generation runs, its Profile is `profile`.
+    profiler = None
+    profile = None
+
+    @property
+    def algorithm(self):
+        """
+        The name the mazes this makes are tagged with as `Maze.algorithm`.
+        """
+        return self.__class__.__name__
     
-    def generate(self, width, height):
+    def generate(self, width, height, seed=None, mask=None):
         """
         Returns a Maze with the walls carved with the given dimensions.
+
+        seed - all random decisions are drawn from random.Random(seed), or from
+          seed itself if it is already a random.Random. If None, the module-level
+          random is used.
+        mask - if given, only the cells it marks are carved, as described in
+          `Maze.mask`. Every region of the mask becomes a perfect maze of its
+          own.
+
+        Subclasses decorate this with ariadne.profiling.profiled.
         """
         raise NotImplementedError("Can't generate a Maze :C")
 
+    def new_maze(self, width, height, seed=None, mask=None):
+        """
+        Returns the uncarved Maze a generation starts from, tagged with the
+        name of this generator and the seed, if it is an integer.
+        """
+        maze = Maze(width, height, mask=mask)
+        maze.algorithm = self.algorithm
+
+        if isinstance(seed, int):
+            maze.seed = seed
+
+        return maze
+
+    @staticmethod
+    def pick_starts(maze, rng):
+        """
+        Returns a (cell, region size) pair for every region of the mask of
+        maze (see ariadne.masks.mask_regions): a random cell in the region,
+        as a flat index, and the number of cells in it. Without a mask, the
+        whole maze is the only region.
+
+        Generators that walk the maze start a walk from each of these cells.
+        Since the walls around masked cells are border walls, a walk never
+        leaves its region.
+        """
+        if maze.mask is None:
+            return [(rng.randrange(len(maze.cells)), len(maze.cells))]
+
+        return [(region[rng.randrange(len(region))], len(region)) for region in mask_regions(maze)]
+
+    @staticmethod
+    def get_random(seed):
+        """
+        Returns the source of random decisions for the given seed, as described
+        in `generate`.
+
+        Generators draw their decisions from it in bulk through ariadne.rng,
+        so that a seed always gives the same maze, whichever engine runs.
+        """
+        return get_random(seed)
+
 
 class RecursiveBacktracker(MazeGenerator):
+    """
+    Iterative depth-first carver.
+
+    Every cell draws one of the 24 orderings of MazeCellStates.CARDINAL when it
+    is first visited and tries its directions in that order, resuming where it
+    left off whenever the walk backtracks into it. Thus each cell is looked at
+    a bounded number of times and the whole generation is linear in the number
+    of cells.
+
+    Cells are addressed by their flat index into `Maze.cells`. The passages
+    are collected as they are found and carved into the maze in one go at the
+    end through `Maze.carve`.
+    """
+
+    DIRECTION_ORDERS = tuple(itertools.permutations(MazeCellStates.CARDINAL))
     
-    def generate(self, width, height):
-
-        def carve_randomly(maze, row, col, visited):
-            """
-            Carves a random wall in the specified cell of the maze. The cell to
-            which the resulting opening leads is guaranteed to be unvisited.
-            
-            Return the direction of the opening to which the carve was made. It
-            is further guaranteed that the opening made is an element of
-            MazeCellStates.CARDINAL.
-            """
-            try:
-                random_carve = random.choice(MazeCellStates.CARDINAL)
-                if list(maze.move_to_opening(row, col, random_carve))[0] not in visited:
-                    maze.tear_down_wall(row, col, random_carve)
-                    return random_carve
-
-                return None
-            except CantTearWallException:
-                return None
-
-        def are_neighbors_visited(maze, row, col, visited):
-            """
-            Return True if and only if all the neighbors of the indicated cell
-            has been visited.
-            """
-            neighbors = maze.get_adjacent(row, col)
-            
-            for n in neighbors:
-                if n not in visited:
-                    return False
-
-            return True
-
-        maze = Maze(width, height)
-        row = random.choice(range(height))
-        col = random.choice(range(width))
-        stack = [(row, col)]
-        visited = set()
-        
-        while stack:
-            # backtracking clause
-            while len(stack) and are_neighbors_visited(maze, row, col, visited):
-                row, col = stack.pop()
-
-            if not len(stack):
-                break
-                
-            visited.add((row, col))
-            carve = carve_randomly(maze, row, col, visited)
-
-            while not carve and len(visited) != (width * height):
-                carve = carve_randomly(maze, row, col, visited)
-
-            if carve:
-                # Before moving in to the opening, check if all neighbors have
-                # been visited. If no, append back to stack.
-                old_row, old_col = row, col
-                if not are_neighbors_visited(maze, row, col, visited):
-                    stack.append((row, col))
-                row, col = list(maze.move_to_opening(row, col, carve))[0]
-                stack.append((row, col))
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cell_count = width * height
+
+        if cell_count < 2:
+            return maze
+
+        profile = self.profile
+
+        with phase(profile, "draw"):
+            rng = self.get_random(seed)
+            starts = [start for start, size in self.pick_starts(maze, rng) if size > 1]
+            # One word per cell, scaled down to the ordering the cell draws.
+            draws = draw_words(rng, cell_count)
+
+        if self.speedups is not None:
+            walls = None if mask is None else maze.border_walls
+
+            with phase(profile, "walk"):
+                for start in starts:
+                    self.speedups.backtrack(maze.cells, width, height, start, draws, walls)
+        else:
+            cell_words = words(draws)
+            carved_cells = array("i")
+            carved_states = bytearray()
+
+            with phase(profile, "walk"):
+                for start in starts:
+                    self.__backtrack(maze, start, cell_words, carved_cells, carved_states)
+
+            with phase(profile, "carve"):
+                maze.carve(carved_cells, carved_states)
+
+        if profile is not None:
+            profile.count("random_bytes", len(draws))
+            # The stack holds the path from start to the current cell.
+            profile.defer(lambda maze: profile.peak("max_stack",
+              max([tree_depth(maze, start) + 1 for start in starts], default=0)))
 
         return maze
 
+    def __backtrack(self, maze, current, words, carved_cells, carved_states):
+        # Walks from current, appending the passages found to carved_cells and
+        # carved_states.
+        offsets = get_offsets(maze.width)
+        # Orderings are numbered from 1 so that 0 can mean "not visited yet".
+        moves = [None] + [
+            tuple((direction, offsets[direction]) for direction in order)
+            for order in self.DIRECTION_ORDERS
+        ]
+        order_count = len(self.DIRECTION_ORDERS)
+        border_walls = maze.border_walls
+        cell_count = len(maze.cells)
+        # Per cell: which ordering of moves it drew and how many of them have
+        # been tried so far.
+        orders = bytearray(cell_count)
+        tried = bytearray(cell_count)
 
-class EllersAlgorithm(MazeGenerator):
+        orders[current] = 1 + (words[current] * order_count >> 16)
+        stack = [current]
+        push = stack.append
+        pop = stack.pop
+
+        while stack:
+            current = stack[-1]
+            attempt = tried[current]
+
+            if attempt == 4:
+                pop()
+                continue
+
+            tried[current] = attempt + 1
+            direction, offset = moves[orders[current]][attempt]
+
+            if direction & border_walls[current]:
+                continue
+
+            neighbor = current + offset
+
+            if orders[neighbor]:
+                continue
+
+            carved_cells.append(current)
+            carved_states.append(direction)
+            orders[neighbor] = 1 + (words[neighbor] * order_count >> 16)
+            push(neighbor)
+
+
+class RowGenerator(MazeGenerator):
+    """
+    Base class for generators that build a maze one row at a time, from north
+    to south, through `generate_rows`. Such generators can stream mazes of any
+    height, or of no height at all.
+
+    Rows know nothing of masks. A masked maze is generated whole and then cut
+    to its mask with ariadne.masks.connect_regions, which joins back up
+    whatever the mask cut apart.
+    """
+
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cells = maze.cells
+        rng = self.get_random(seed)
+        start = 0
+
+        with phase(self.profile, "rows"):
+            for row in self.generate_rows(width, height, rng):
+                cells[start:start + width] = row
+                start += width
+
+        if mask is not None:
+            with phase(self.profile, "mask"):
+                connect_regions(maze, rng)
+
+        if self.profile is not None:
+            self.profile.count("rows", height)
 
-    def generate(self, width, height):
-        def make_sets_and_merge(maze, cur_row_index, set_count = None):
-            if set_count is not None:
-                # This is the first case set_count must not be None
-                start = 0
-                for limit in range(set_count, width, set_count):
-                    for cur_cell in range(start, set_count):
-                        if random.choice((True, False)):
-                            maze.tear_down_wall(cur_row_index, cur_cell, MazeCellStates.OPEN_EAST)
-                    start += set_count + 1
-            else:
-                prev_regions = get_regions(cur_row_index - 1)
-                cur_regions = label_regions(prev_regions, cur_row_index)
-                # Do the merge
-                for ir, region in enumerate(cur_regions[1:], 1):
-                    if region != cur_regions[ir - 1] and (random.choice((True, False)) or cur_row_index == (height - 1)):
-                        cur_regions[ir - 1] = region
-                        maze.tear_down_wall(cur_row_index, ir, MazeCellStates.OPEN_WEST)
-
-        def label_regions(prev_regions, row_index):
-            """
-            Given the regions of the previous row, determine the current set
-            memberships of each cell in the given row_index.
-
-            This assumes that the walls between the previous row and the current
-            row have been broken down. For distinction, those whose set derives
-            from a cell in the previous row will have a negative label while
-            those whose set is "organic" to the row will have a positive label.
-
-            The absolute value of labels range from [1, width].
-            """
-            labels = [0 for _ in range(width)]
-            cur_label = 1
-
-            for ci, cell in enumerate(maze.maze[row_index]):
-                if (cell & MazeCellStates.OPEN_NORTH) == MazeCellStates.OPEN_NORTH:
-                    labels[ci] = -prev_regions[ci]
-                else:
-                    labels[ci] = cur_label
-                    cur_label += 1
-
-            return labels
-
-        def get_regions(row_index):
-            """
-            Labels the continuous regions in a row in the maze. Returns a list
-            of size width. The list has numbers for labels on what cell belongs
-            to which region. The numbers range from [1, width].
-            """
-            regions = [1 for _ in range(width)]
-
-            for cell_index in range(1, width):
-                if (maze.maze[row_index][cell_index] & MazeCellStates.OPEN_WEST) == MazeCellStates.OPEN_WEST:
-                    regions[cell_index] = regions[cell_index - 1]
-                else:
-                    regions[cell_index] = regions[cell_index - 1] + 1
-            
-            return regions
-
-        maze = Maze(width, height)
-        set_count = None
-        # Base case: single row, where the first row is also the last row.
-        if width != 2:
-            # Ensure sets won't be singletons
-            set_count = random.choice(range(1, width - 1))
-
-        for i in range(height):
-            if i == 0:
-                make_sets_and_merge(maze, i, set_count)
-            else:
-                make_sets_and_merge(maze, i)
-
-            # With the sets made, merge vertically, at least once per set.
-            is_curset_merged = False
-            if i != (height - 1):
-                for j in range(width):
-                    is_new_set_next = (maze.maze[i][j] & MazeCellStates.OPEN_EAST) != MazeCellStates.OPEN_EAST
-
-                    if is_new_set_next and not is_curset_merged:
-                        maze.tear_down_wall(i, j, MazeCellStates.OPEN_SOUTH)
-                    elif random.choice((True, False)):
-                        maze.tear_down_wall(i, j, MazeCellStates.OPEN_SOUTH)
-                        is_curset_merged = True
-
-                    if is_new_set_next:
-                        is_curset_merged = False
-        
         return maze
 
+    def generate_rows(self, width, height=None, seed=None):
+        """
+        Yields the rows of a maze from north to south, each row as `bytes` of
+        width cell states (one nibble per byte, as in MazeCellStates). A row is
+        only yielded once it is final.
+
+        If height is None, rows are generated forever; the maze built so far is
+        always a perfect maze save for the openings to the south of the last
+        row yielded.
+
+        seed is as in `generate`.
+        """
+        raise NotImplementedError("Can't generate rows :C")
+
+
+class EllersAlgorithm(RowGenerator):
+    """
+    Eller's algorithm, which builds the maze one row at a time and only ever
+    remembers which set each cell of the current row belongs to. Memory use is
+    therefore linear in the width of the maze and does not depend on its
+    height.
+    """
+
+    def generate_rows(self, width, height=None, seed=None):
+        if width < 0 or (height is not None and height < 0):
+            raise InvalidSizeException(width, height)
+
+        rng = self.get_random(seed)
+        make_row = ellers_row if self.speedups is None else self.speedups.ellers_row
+        labels = array("i", [-1]) * width
+        row_index = 0
+
+        while height is None or row_index < height:
+            noise = draw_bytes(rng, 4 * width)
+            yield make_row(labels, noise, height is not None and row_index == height - 1)
+            row_index += 1
+
+
+def ellers_row(labels, noise, is_last_row):
+    """
+    Makes one row of EllersAlgorithm, returned as `bytes`.
+
+    labels is an array("i") holding for every column the set its cell belongs
+    to, or -1 if the cell is not connected to the row above. It is updated in
+    place for the next row. Cells in the same set are already connected
+    through the rows above.
+
+    noise is 4 bytes of random decisions per column: the lowest bit of the
+    first width bytes decides whether to join a cell to its eastern neighbor,
+    the lowest bit of the next width bytes whether to open it south, and the
+    last 2 * width bytes are little-endian 16-bit words picking the cell that
+    opens south for sets where no cell did.
+
+    The compiled engine has the same function, which has to give the same
+    results.
+    """
+    width = len(labels)
+    row = bytearray(width)
+    # current[col] is the set of the cell at col in this row; cells that do
+    # not open north start sets of their own, numbered past the columns.
+    current = [0] * width
+    members = {}
+
+    for col in range(width):
+        label = labels[col]
+
+        if label < 0:
+            label = width + col
+        else:
+            row[col] = MazeCellStates.OPEN_NORTH
+
+        current[col] = label
+        members.setdefault(label, []).append(col)
+
+    # Join adjacent cells of different sets. On the last row every such pair
+    # has to be joined so that everything ends up connected.
+    for col in range(width - 1):
+        west_label = current[col]
+        east_label = current[col + 1]
+
+        if west_label == east_label or not (is_last_row or noise[col] & 1):
+            continue
+
+        row[col] |= MazeCellStates.OPEN_EAST
+        row[col + 1] |= MazeCellStates.OPEN_WEST
+
+        if len(members[west_label]) < len(members[east_label]):
+            west_label, east_label = east_label, west_label
+
+        merged = members.pop(east_label)
+        for member in merged:
+            current[member] = west_label
+        members[west_label].extend(merged)
+
+    if not is_last_row:
+        # Every set carries on to the next row through at least one opening
+        # to the south, and is named after its leftmost column there; the
+        # rest of the row starts afresh.
+        picks = words(noise[2 * width:])
+        labels[:] = array("i", [-1]) * width
+
+        for cols in members.values():
+            root = min(cols)
+            dropped = [col for col in cols if noise[width + col] & 1]
+
+            if not dropped:
+                cols.sort()
+                dropped = [cols[picks[root] * len(cols) >> 16]]
+
+            for col in dropped:
+                row[col] |= MazeCellStates.OPEN_SOUTH
+                labels[col] = root
+
+    return bytes(row)
+
 
 class KruskalsAlgorithm(MazeGenerator):
+    """
+    Randomized Kruskal's algorithm.
+
+    Every inner wall is an edge between two cells. The walls are shuffled once,
+    from random numbers drawn all at once (see ariadne.rng.shuffle), and torn
+    down in that order whenever the cells they separate are not yet connected,
+    which is tracked with a DisjointSets over the flat cell indices.
+
+    Walls are numbered after the cell to their north or west: 2 * cell is the
+    eastern wall of cell and 2 * cell + 1 is its southern wall.
+    """
     
-    def generate(self, width, height):
-        maze = Maze(width, height)
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cell_count = width * height
+
+        if cell_count < 2:
+            return maze
+
+        profile = self.profile
+
+        with phase(profile, "draw"):
+            walls = array("i")
+
+            for row_start in range(0, cell_count, width):
+                walls.extend(range(row_start << 1, (row_start + width - 1) << 1, 2))
+
+            walls.extend(range(1, (cell_count - width) << 1, 2))
+
+            if mask is not None:
+                border_walls = maze.border_walls
+                walls = array("i", (wall for wall in walls if not border_walls[wall >> 1] &
+                  (MazeCellStates.OPEN_SOUTH if wall & 1 else MazeCellStates.OPEN_EAST)))
+
+            # A 32-bit word per wall for shuffling them.
+            draws = draw_dwords(self.get_random(seed), len(walls))
+
+        if profile is not None:
+            profile.count("walls", len(walls))
+            profile.count("random_bytes", len(draws))
+
+        if self.speedups is not None:
+            # The compiled engine shuffles the walls too.
+            with phase(profile, "union"):
+                self.speedups.kruskal(maze.cells, width, height, walls, draws)
+            return maze
+
+        with phase(profile, "shuffle"):
+            shuffle(walls, draws)
+
+        with phase(profile, "union"):
+            sets = DisjointSets(cell_count)
+            union = sets.union
+            # With a mask split into several regions this never runs out, and
+            # every wall is looked at.
+            remaining = cell_count - 1 if mask is None else maze.mask.count(1) - 1
+            carved_cells = array("i")
+            carved_states = bytearray()
+
+            for wall in walls:
+                cell = wall >> 1
+
+                if union(cell, cell + width if wall & 1 else cell + 1):
+                    carved_cells.append(cell)
+                    carved_states.append(MazeCellStates.OPEN_SOUTH if wall & 1 else MazeCellStates.OPEN_EAST)
+                    remaining -= 1
+
+                    if not remaining:
+                        break
+
+        with phase(profile, "carve"):
+            maze.carve(carved_cells, carved_states)
+
+        return maze
+
+
+class BinaryTree(RowGenerator):
+    """
+    The Binary Tree algorithm: every cell but the north-western one opens
+    either to its north or to its west, at random, as long as that does not go
+    past the border. Each row is drawn with a single call for random bits, so
+    this is the cheapest generator there is, although the mazes it makes are
+    heavily biased: the top row and the left column are straight corridors.
+    """
+
+    OWN_OPENINGS = _digit_table(MazeCellStates.OPEN_NORTH, MazeCellStates.OPEN_WEST)
+    EAST_OPENINGS = _digit_table(MazeCellStates.NO_OPEN, MazeCellStates.OPEN_EAST)
+
+    def generate_rows(self, width, height=None, seed=None):
+        if width < 0 or (height is not None and height < 0):
+            raise InvalidSizeException(width, height)
+
+        return _open_south(self.__rows(width, height, self.get_random(seed)))
+
+    def __rows(self, width, height, rng):
+        # A 1 opens north and a 0 opens west. Cells on the first row can only
+        # open west and cells on the first column only north, save for the
+        # very first cell (the "x") which opens nothing.
+        digits = (b"x" + b"0" * (width - 1))[:width]
+        row_index = 0
+
+        while height is None or row_index < height:
+            yield _merge(digits.translate(self.OWN_OPENINGS),
+              digits[1:].translate(self.EAST_OPENINGS) + b"\0"[:width])
+            digits = (b"1" + draw_digits(rng, width - 1))[:width]
+            row_index += 1
+
+
+class Sidewinder(RowGenerator):
+    """
+    The Sidewinder algorithm. Each row is cut at random into runs of cells
+    joined east to west, and every run opens north from one of its cells
+    picked at random. The first row is a single run that does not open north.
+    Like BinaryTree it only needs one row at a time, but it only leaves the
+    top row as a straight corridor.
+    """
+
+    EAST_OPENINGS = _digit_table(MazeCellStates.OPEN_EAST)
+    WEST_OPENINGS = _digit_table(MazeCellStates.OPEN_WEST)
+
+    def generate_rows(self, width, height=None, seed=None):
+        if width < 0 or (height is not None and height < 0):
+            raise InvalidSizeException(width, height)
+
+        return _open_south(self.__rows(width, height, self.get_random(seed)))
+
+    def __rows(self, width, height, rng):
+        below = BulkRandom(rng).below
+        row_index = 0
+
+        while height is None or row_index < height:
+            # A 1 carries the run on to the east and a 0 ends it; the last
+            # cell always ends its run.
+            if row_index:
+                digits = (draw_digits(rng, width - 1) + b"0")[:width]
+            else:
+                digits = (b"1" * (width - 1) + b"0")[:width]
+
+            north = bytearray(width)
+
+            if row_index:
+                start = 0
+
+                while start < width:
+                    end = digits.index(b"0", start)
+                    north[start + below(end + 1 - start)] = MazeCellStates.OPEN_NORTH
+                    start = end + 1
+
+            yield _merge(north, digits.translate(self.EAST_OPENINGS),
+              (b"0" + digits[:-1])[:width].translate(self.WEST_OPENINGS))
+            row_index += 1
+
+
+class AldousBroder(MazeGenerator):
+    """
+    The Aldous-Broder algorithm: a random walk over the grid that opens the
+    way into every cell it enters for the first time. It makes uniform
+    spanning trees, that is, every perfect maze is equally likely, but the walk
+    has to cover the whole grid and takes around n * log(n) ** 2 steps for n
+    cells. WilsonsAlgorithm makes the same mazes much faster.
+    """
+
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cell_count = width * height
+
+        if cell_count < 2:
+            return maze
+
+        picks = get_step_picks(width)
+        inner_directions = maze.border_walls.translate(INNER_DIRECTIONS)
+        rng = self.get_random(seed)
+        bulk = BulkRandom(rng)
+        next_byte = bulk.next_byte
+        visited = bytearray(cell_count)
+        carved_cells = array("i")
+        carved_states = bytearray()
+
+        with phase(self.profile, "walk"):
+            for current, remaining in self.pick_starts(maze, rng):
+                visited[current] = 1
+                remaining -= 1
+
+                while remaining:
+                    cell_picks = picks[inner_directions[current]]
+                    step = cell_picks[next_byte()]
+
+                    while step is None:
+                        step = cell_picks[next_byte()]
+
+                    direction, offset = step
+                    neighbor = current + offset
+
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        carved_cells.append(current)
+                        carved_states.append(direction)
+                        remaining -= 1
+
+                    current = neighbor
+
+        with phase(self.profile, "carve"):
+            maze.carve(carved_cells, carved_states)
+
+        if self.profile is not None:
+            self.profile.count("random_bytes", bulk.drawn)
+
+        return maze
+
+
+class WilsonsAlgorithm(MazeGenerator):
+    """
+    Wilson's algorithm, which makes uniform spanning trees like AldousBroder
+    but through loop-erased random walks. Starting from one cell in the maze,
+    every cell not yet in it starts a random walk that goes on until it hits
+    the maze. Each cell remembers the direction the walk last left it by, so
+    loops are erased as a matter of course, and the walk is then retraced from
+    its start along those directions and carved in.
+    """
+
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cell_count = width * height
+
+        if cell_count < 2:
+            return maze
+
+        picks = get_step_picks(width)
+        offsets = get_offsets(width)
+        inner_directions = maze.border_walls.translate(INNER_DIRECTIONS)
+        rng = self.get_random(seed)
+        bulk = BulkRandom(rng)
+        next_byte = bulk.next_byte
+        # Masked cells count as already in, so that no walk starts there.
+        in_maze = bytearray(cell_count) if mask is None else bytearray(maze.mask.translate(MASKED_FLAGS))
+        exits = bytearray(cell_count)
+        carved_cells = array("i")
+        carved_states = bytearray()
+
+        for cell, _ in self.pick_starts(maze, rng):
+            in_maze[cell] = 1
+
+        start = 0
+        walks = 0
+
+        with phase(self.profile, "walk"):
+            while True:
+                start = in_maze.find(0, start)
+
+                if start == -1:
+                    break
+
+                current = start
+                walks += 1
+
+                while not in_maze[current]:
+                    cell_picks = picks[inner_directions[current]]
+                    step = cell_picks[next_byte()]
+
+                    while step is None:
+                        step = cell_picks[next_byte()]
+
+                    direction, offset = step
+                    exits[current] = direction
+                    current += offset
+
+                current = start
+
+                while not in_maze[current]:
+                    in_maze[current] = 1
+                    direction = exits[current]
+                    carved_cells.append(current)
+                    carved_states.append(direction)
+                    current += offsets[direction]
+
+        with phase(self.profile, "carve"):
+            maze.carve(carved_cells, carved_states)
+
+        if self.profile is not None:
+            self.profile.count("walks", walks)
+            self.profile.count("random_bytes", bulk.drawn)
+
         return maze
+
+
+def select_newest(count, rng):
+    return count - 1
+
+def select_oldest(count, rng):
+    return 0
+
+def select_middle(count, rng):
+    return count // 2
+
+def select_random(count, rng):
+    return rng.randrange(count)
+
+
+class GrowingTree(MazeGenerator):
+    """
+    The Growing Tree algorithm. A list of active cells starts with one random
+    cell; at every step the selector picks one of them, which then opens into
+    a random unvisited neighbor that becomes active in turn. Cells with no
+    unvisited neighbors left are dropped from the list.
+
+    The selector decides what the maze looks like: always picking the newest
+    cell makes it a recursive backtracker, and picking at random makes it a
+    randomized Prim's algorithm. It is either one of the names in SELECTORS or
+    a function taking the number of active cells and the random.Random in use
+    and returning the index of the cell to pick, oldest first.
+    """
+
+    SELECTORS = {
+        "newest": select_newest,
+        "oldest": select_oldest,
+        "middle": select_middle,
+        "random": select_random,
+    }
+
+    def __init__(self, selector="newest"):
+        self.selector = self.SELECTORS.get(selector, selector)
+
+        if not callable(self.selector):
+            raise ValueError("Unknown selector %r" % (selector,))
+
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        maze = self.new_maze(width, height, seed, mask)
+        cell_count = width * height
+
+        if cell_count < 2:
+            return maze
+
+        steps = get_steps(width)
+        inner_directions = maze.border_walls.translate(INNER_DIRECTIONS)
+        rng = self.get_random(seed)
+        bulk = BulkRandom(rng)
+        next_byte = bulk.next_byte
+        select = self.selector
+        visited = bytearray(cell_count)
+        carved_cells = array("i")
+        carved_states = bytearray()
+
+        with phase(self.profile, "walk"):
+            for current, _ in self.pick_starts(maze, rng):
+                visited[current] = 1
+                active = [current]
+
+                while active:
+                    index = select(len(active), rng)
+                    current = active[index]
+                    unvisited = [step for step in steps[inner_directions[current]]
+                      if not visited[current + step[1]]]
+
+                    if not unvisited:
+                        del active[index]
+                        continue
+
+                    count = len(unvisited)
+                    byte = next_byte()
+
+                    while byte >= BYTE_LIMITS[count]:
+                        byte = next_byte()
+
+                    direction, offset = unvisited[byte % count]
+                    neighbor = current + offset
+                    visited[neighbor] = 1
+                    carved_cells.append(current)
+                    carved_states.append(direction)
+                    active.append(neighbor)
+
+        with phase(self.profile, "carve"):
+            maze.carve(carved_cells, carved_states)
+
+        if self.profile is not None:
+            self.profile.count("random_bytes", bulk.drawn)
+
+        return maze
+
+
+class Braided(MazeGenerator):
+    """
+    Makes mazes with loops: generates a perfect maze with generator, then
+    removes dead ends from it with ariadne.braiding.braid, each with
+    probability fraction. The maze keeps the name of the generator that made
+    it as its algorithm.
+    """
+
+    def __init__(self, generator, fraction=1.0):
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError("fraction must be between 0 and 1, got %r" % (fraction,))
+
+        self.generator = generator
+        self.fraction = fraction
+
+    @property
+    def algorithm(self):
+        return self.generator.algorithm
+
+    @profiled
+    def generate(self, width, height, seed=None, mask=None):
+        rng = self.get_random(seed)
+
+        with phase(self.profile, "generate"):
+            maze = self.generator.generate(width, height, rng, mask)
+
+        with phase(self.profile, "braid"):
+            removed = braid(maze, self.fraction, rng)
+
+        if isinstance(seed, int):
+            maze.seed = seed
+
+        if self.profile is not None:
+            self.profile.count("dead_ends_removed", removed)
+
+        return maze
+
+
+"""
+Every generator by name, e.g. for picking one from the command line.
+"""
+GENERATORS = {
+    "RecursiveBacktracker": RecursiveBacktracker,
+    "EllersAlgorithm": EllersAlgorithm,
+    "KruskalsAlgorithm": KruskalsAlgorithm,
+    "BinaryTree": BinaryTree,
+    "Sidewinder": Sidewinder,
+    "AldousBroder": AldousBroder,
+    "WilsonsAlgorithm": WilsonsAlgorithm,
+    "GrowingTree": GrowingTree,
+}
@@ -0,0 +1,222 @@
+import math
+
+from array import array
+
+from .disjointsets import DisjointSets
+from .errors import InvalidMazeFileException
+from .mazes import MASKED_FLAGS, MazeCellStates, get_moves
+from .rng import draw_dwords, shuffle
+
+"""
+Masks for mazes that are not rectangles (see `Maze.mask`).
+
+A mask is `bytes` with a byte per cell, row-major like `Maze.cells`, that is 1
+for cells that are part of the maze and 0 for cells masked out. The functions
+making masks return a (width, height, mask) tuple.
+
+The cells of a mask need not all be connected: the letters of a word each make
+a region of their own. Generators then make a perfect maze in every region.
+"""
+
+# Maps the ASCII digits 0 and 1 to the bytes 0 and 1.
+DIGIT_PIXELS = bytes(range(48)) + b"\0\1" + bytes(range(50, 256))
+
+def from_lines(lines, masked=" ."):
+    """
+    Makes a mask from lines of text, one cell per character. The characters
+    in masked are masked out; shorter lines are padded with masked cells.
+    """
+    lines = list(lines)
+    width = max((len(line) for line in lines), default=0)
+    mask = bytearray()
+
+    for line in lines:
+        mask.extend(0 if char in masked else 1 for char in line.ljust(width, masked[0]))
+
+    return width, len(lines), bytes(mask)
+
+def ellipse(width, height):
+    """
+    Masks out everything outside the ellipse that fits in width by height
+    cells; a circle if they are the same.
+    """
+    mask = bytearray(width * height)
+    center_x = width / 2
+    center_y = height / 2
+
+    for row in range(height):
+        # How far the ellipse reaches to either side of the center at the
+        # middle of this row.
+        y = (row + 0.5 - center_y) / center_y
+        reach = center_x * math.sqrt(max(0.0, 1 - y * y))
+        start = max(0, int(math.ceil(center_x - reach - 0.5)))
+        end = min(width, int(math.floor(center_x + reach - 0.5)) + 1)
+
+        if start < end:
+            mask[row * width + start:row * width + end] = b"\1" * (end - start)
+
+    return width, height, bytes(mask)
+
+def from_pbm(buf):
+    """
+    Makes a mask from a portable bitmap (P1 or P4), one cell per pixel. Black
+    pixels are the cells of the maze and white ones are masked out, so that a
+    shape or a text drawn in black becomes the maze.
+    """
+    buf = bytes(buf)
+    fields = []
+    offset = 0
+
+    # The magic, the width and the height, separated by whitespace and
+    # comments, which run to the end of the line.
+    while len(fields) < 3:
+        while offset < len(buf) and buf[offset:offset + 1].isspace():
+            offset += 1
+
+        if buf[offset:offset + 1] == b"#":
+            offset = buf.find(b"\n", offset)
+            if offset == -1:
+                break
+            continue
+
+        end = offset
+
+        while end < len(buf) and not buf[end:end + 1].isspace() and buf[end:end + 1] != b"#":
+            end += 1
+
+        if end == offset:
+            break
+
+        fields.append(buf[offset:end])
+        offset = end
+
+    if len(fields) < 3 or fields[0] not in (b"P1", b"P4"):
+        raise InvalidMazeFileException("not a PBM image")
+
+    try:
+        width = int(fields[1])
+        height = int(fields[2])
+    except ValueError:
+        raise InvalidMazeFileException("bad PBM size")
+
+    if fields[0] == b"P1":
+        pixels = bytes(char for char in buf[offset:] if char in b"01").translate(DIGIT_PIXELS)
+    else:
+        row_bytes = (width + 7) // 8
+        data = buf[offset + 1:offset + 1 + row_bytes * height]
+
+        if len(data) != row_bytes * height:
+            raise InvalidMazeFileException("truncated PBM image")
+
+        digits = bytearray()
+
+        for row in range(height):
+            bits = int.from_bytes(data[row * row_bytes:(row + 1) * row_bytes], "big")
+            digits.extend(format(bits, "0%db" % (8 * row_bytes)).encode("ascii")[:width])
+
+        pixels = bytes(digits).translate(DIGIT_PIXELS)
+
+    if len(pixels) < width * height:
+        raise InvalidMazeFileException("truncated PBM image")
+
+    return width, height, bytes(pixels[:width * height])
+
+def mask_regions(maze):
+    """
+    Returns the regions the cells of maze fall into, walls notwithstanding,
+    as a list of array("i") of flat cell indices, each region starting from
+    its lowest cell. Masked cells are in no region; without a mask, the whole
+    maze is one.
+    """
+    cell_count = len(maze.cells)
+    walls = maze.border_walls
+    moves = get_moves(maze.width)
+    seen = bytearray(cell_count) if maze.mask is None else bytearray(maze.mask.translate(MASKED_FLAGS))
+    regions = []
+    start = seen.find(0)
+
+    while start != -1:
+        seen[start] = 1
+        region = array("i", [start])
+
+        for current in region:
+            for offset in moves[~walls[current] & 0xf]:
+                neighbor = current + offset
+
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    region.append(neighbor)
+
+        regions.append(region)
+        start = seen.find(0, start + 1)
+
+    return regions
+
+def connect_regions(maze, rng):
+    """
+    Makes a maze carved with no regard for its mask into a perfect maze in
+    every region of the mask: closes every opening into masked cells, then
+    joins the pieces this leaves within each region through walls picked at
+    random with rng, as KruskalsAlgorithm would.
+
+    Assumes the maze was perfect before its mask was applied.
+    """
+    cells = maze.cells
+    cell_count = len(cells)
+    width = maze.width
+    walls = maze.border_walls
+
+    if not cell_count:
+        return
+
+    cells[:] = (int.from_bytes(cells, "big") & ~int.from_bytes(walls, "big")).to_bytes(
+      cell_count, "big")
+
+    moves = get_moves(width)
+    labels = array("i", [-1]) * cell_count
+    label_count = 0
+
+    for start in range(cell_count):
+        if labels[start] != -1:
+            continue
+
+        labels[start] = label_count
+        piece = [start]
+
+        for current in piece:
+            for offset in moves[cells[current]]:
+                neighbor = current + offset
+
+                if labels[neighbor] == -1:
+                    labels[neighbor] = label_count
+                    piece.append(neighbor)
+
+        label_count += 1
+
+    # Walls are numbered as in KruskalsAlgorithm.
+    candidates = []
+
+    for cell in range(cell_count):
+        label = labels[cell]
+        blocked = walls[cell]
+
+        if not blocked & MazeCellStates.OPEN_EAST and labels[cell + 1] != label:
+            candidates.append(cell << 1)
+
+        if not blocked & MazeCellStates.OPEN_SOUTH and labels[cell + width] != label:
+            candidates.append(cell << 1 | 1)
+
+    shuffle(candidates, draw_dwords(rng, len(candidates)))
+    sets = DisjointSets(label_count)
+    carved_cells = array("i")
+    carved_states = bytearray()
+
+    for wall in candidates:
+        cell = wall >> 1
+        neighbor = cell + width if wall & 1 else cell + 1
+
+        if sets.union(labels[cell], labels[neighbor]):
+            carved_cells.append(cell)
+            carved_states.append(MazeCellStates.OPEN_SOUTH if wall & 1 else MazeCellStates.OPEN_EAST)
+
+    maze.carve(carved_cells, carved_states)
@@ -1,5 +1,19 @@
+import functools
+import operator
+
+from array import array
+
 from .errors import CantTearWallException, InvalidSizeException
 
+try:
+    from . import _speedups
+except ImportError:
+    _speedups = None
+
+# Whether the compiled engines of ariadne/_speedups.c were built and are used
+# in place of the pure-Python ones. See ariadne.build_speedups.
+SPEEDUPS_AVAILABLE = _speedups is not None
+
 class MazeCellStates(object):
     """
     We use a nibble to represent the state of the cell. Each bit in a nibble
@@ -58,30 +72,314 @@ class MazeCellStates(object):
     CARDINAL = [OPEN_NORTH, OPEN_EAST, OPEN_SOUTH, OPEN_WEST]
 
 
+"""
+Navigation tables.
+
+Cells are also addressed by their flat index `row * width + col` into
+`Maze.cells`. Moving in a direction is then adding a fixed offset to the index,
+and everything that depends on which walls are open can be looked up by the
+cell state. The tables below only depend on the width of the maze and are
+shared by every maze of that width.
+"""
+
+@functools.lru_cache(maxsize=64)
+def get_offsets(width):
+    """
+    Returns a dict mapping each direction in MazeCellStates.CARDINAL to the
+    offset that moves a flat index one cell in that direction.
+    """
+    return {
+        MazeCellStates.OPEN_NORTH: -width,
+        MazeCellStates.OPEN_EAST: 1,
+        MazeCellStates.OPEN_SOUTH: width,
+        MazeCellStates.OPEN_WEST: -1
+    }
+
+@functools.lru_cache(maxsize=64)
+def get_moves(width):
+    """
+    Returns a tuple mapping every cell state to the tuple of index offsets
+    leading out of its openings.
+    """
+    offsets = get_offsets(width)
+    return tuple(
+        tuple(offsets[direction] for direction in MazeCellStates.CARDINAL if state & direction)
+        for state in range(16)
+    )
+
+@functools.lru_cache(maxsize=64)
+def get_openings(width):
+    """
+    Like `get_moves` but maps every cell state to the tuple of
+    (index offset, inverse state) of each of its openings, the inverse state
+    being what opens the neighbor back.
+    """
+    offsets = get_offsets(width)
+    return tuple(
+        tuple((offsets[direction], MazeCellStates.INVERSES[direction])
+          for direction in MazeCellStates.CARDINAL if state & direction)
+        for state in range(16)
+    )
+
+
+# Maps mask bytes to 1 for usable cells and 0 for masked cells, and the other
+# way round.
+MASK_FLAGS = b"\0" + b"\1" * 255
+MASKED_FLAGS = b"\1" + b"\0" * 255
+
+def _flag_plane(flags, state):
+    return int.from_bytes(flags.translate(bytes((0, state)) + bytes(254)), "big")
+
+
 class Maze(object):
+    """
+    A rectangular grid of cells, each cell being a nibble as described in
+    MazeCellStates.
+
+    The cells are stored row-major in one contiguous buffer (`cells`), one byte
+    per cell. `maze` exposes the same buffer as a list of per-row views so that
+    `maze[row][col]` reads and writes straight through to `cells`.
+
+    `algorithm` and `seed` record, when known, how the maze came to be. They are
+    filled in by the generators and kept by `save` and `load`.
+
+    `journal`, if set (see `start_journal`), is told about every cell the
+    editing methods below are about to change. Writes straight to `cells` or
+    `maze` bypass it.
+
+    `mask`, if set, tells which cells are part of the maze at all, so that
+    mazes need not be rectangles: it holds a byte per cell, indexed like
+    `cells`, that is 1 for cells of the maze and 0 for cells masked out. The
+    walls around masked cells count as border walls (see `border_walls`), so
+    nothing opens into them. The mask is not saved by `save`.
+    """
+
+    algorithm = None
+    seed = None
+    journal = None
+    # The compiled engine for `carve`, or None for the pure-Python one.
+    speedups = _speedups
+    __border_walls = None
+    __mask = None
     
-    def __init__(self, width, height, initial_state=MazeCellStates.NO_OPEN):
+    def __init__(self, width, height, initial_state=MazeCellStates.NO_OPEN, mask=None):
         if width < 0 or height < 0:
             raise InvalidSizeException(width, height)
-        self.maze = [[initial_state for _ in range(width)] for __ in range(height)]
+        self.width = width
+        self.height = height
+        self.cells = bytearray((initial_state,)) * (width * height)
+        self.maze = self.__row_views()
+        self.mask = mask
+
+    @classmethod
+    def from_buffer(cls, width, height, buf):
+        """
+        Create a Maze over an existing buffer of width * height cell bytes,
+        laid out row-major. The buffer is used as is and is not copied; a
+        read-only buffer (e.g. `bytes`) yields a read-only Maze.
+        """
+        if width < 0 or height < 0 or len(buf) != width * height:
+            raise InvalidSizeException(width, height)
+        maze = cls.__new__(cls)
+        maze.width = width
+        maze.height = height
+        maze.cells = buf
+        maze.maze = maze.__row_views()
+        return maze
+
+    def __row_views(self):
+        view = memoryview(self.cells)
+        width = self.width
+        return [view[row * width:(row + 1) * width] for row in range(self.height)]
+
+    def save(self, path, packed=True):
+        """
+        Saves this maze to the file at path in the binary format described in
+        ariadne.serialization. Packed files take half a byte per cell; unpacked
+        ones take a byte per cell but can be memory-mapped by `load`.
+        """
+        from .serialization import dump
+
+        with open(path, "wb") as fileobj:
+            dump(self, fileobj, packed)
+
+    @staticmethod
+    def load(path, use_mmap=False):
+        """
+        Loads a maze saved with `save`. See ariadne.serialization.load.
+        """
+        from .serialization import load
+
+        return load(path, use_mmap)
+
+    def start_journal(self):
+        """
+        Starts recording the edits made to this maze. Returns the
+        ariadne.edits.EditJournal they are recorded in, which also becomes
+        `journal` until `stop_journal` is called.
+        """
+        from .edits import EditJournal
+
+        self.journal = EditJournal(self)
+        return self.journal
+
+    def stop_journal(self):
+        """
+        Stops recording edits and returns the journal they were recorded in,
+        if any.
+        """
+        journal = self.journal
+        self.journal = None
+        return journal
+
+    def __record(self, indices, cell_states):
+        record = self.journal.record
+        moves = get_moves(self.width)
+
+        for index, cell_state in zip(indices, cell_states):
+            record(index)
+
+            for offset in moves[cell_state & 0xf]:
+                record(index + offset)
+
+    def __reduce__(self):
+        state = {"mask": self.__mask, "algorithm": self.algorithm, "seed": self.seed}
+        return (Maze.from_buffer, (self.width, self.height, bytearray(self.cells)), state)
+
+    def __setstate__(self, state):
+        self.mask = state.get("mask")
+        self.algorithm = state.get("algorithm")
+        self.seed = state.get("seed")
+
+    @property
+    def mask(self):
+        """
+        The mask described above, or None. Can be set to any bytes-like object
+        with a byte per cell, nonzero for the cells of the maze. Openings the
+        maze already has are left alone.
+        """
+        return self.__mask
+
+    @mask.setter
+    def mask(self, mask):
+        if mask is not None:
+            if len(mask) != len(self.cells):
+                raise InvalidSizeException(self.width, self.height)
+            mask = bytes(mask).translate(MASK_FLAGS)
+
+        self.__mask = mask
+        self.__border_walls = None
     
-    def __set_cell_state(self, row, col, cell_state):
-        will_open_north = (cell_state & MazeCellStates.OPEN_NORTH) == MazeCellStates.OPEN_NORTH
-        will_open_east = (cell_state & MazeCellStates.OPEN_EAST) == MazeCellStates.OPEN_EAST
-        will_open_south = (cell_state & MazeCellStates.OPEN_SOUTH) == MazeCellStates.OPEN_SOUTH
-        will_open_west = (cell_state & MazeCellStates.OPEN_WEST) == MazeCellStates.OPEN_WEST
-        cant_tear = CantTearWallException(row, col, cell_state)
-
-        if row == 0 and will_open_north:
-            raise cant_tear
-        elif col == 0 and will_open_west:
-            raise cant_tear
-        elif row == len(self.maze) - 1 and will_open_south:
-            raise cant_tear
-        elif col == len(self.maze[row]) - 1 and will_open_east:
-            raise cant_tear
-        
-        self.maze[row][col] = self.maze[row][col] | cell_state
+    @property
+    def border_walls(self):
+        """
+        For every cell, the walls of it that lie on the border of the maze and
+        thus can't be torn down, as `bytes` of cell states indexed like
+        `cells`. With a mask, every wall of a masked cell and every wall
+        between a cell and a masked cell is a border wall too. Built on first
+        use.
+        """
+        if self.__border_walls is None:
+            width = self.width
+            cell_count = width * self.height
+            walls = bytearray(cell_count)
+
+            if not cell_count:
+                self.__border_walls = bytes(walls)
+                return self.__border_walls
+
+            for start in range(0, cell_count, width):
+                walls[start] |= MazeCellStates.OPEN_WEST
+                walls[start + width - 1] |= MazeCellStates.OPEN_EAST
+
+            for col in range(width):
+                walls[col] |= MazeCellStates.OPEN_NORTH
+                walls[cell_count - width + col] |= MazeCellStates.OPEN_SOUTH
+
+            if self.__mask is not None:
+                # Shift the masked cells over by one cell in every direction
+                # and OR the walls facing them in as big integers.
+                masked = self.__mask.translate(MASKED_FLAGS)
+                merged = int.from_bytes(walls, "big")
+                merged |= _flag_plane(masked, 0xf)
+                merged |= _flag_plane(bytes(width) + masked[:-width], MazeCellStates.OPEN_NORTH)
+                merged |= _flag_plane(masked[width:] + bytes(width), MazeCellStates.OPEN_SOUTH)
+                merged |= _flag_plane(masked[1:] + b"\0", MazeCellStates.OPEN_EAST)
+                merged |= _flag_plane(b"\0" + masked[:-1], MazeCellStates.OPEN_WEST)
+                walls = merged.to_bytes(cell_count, "big")
+
+            self.__border_walls = bytes(walls)
+
+        return self.__border_walls
+
+    def __find_border_violation(self, indices, cell_states):
+        border_walls = self.border_walls
+
+        for index, cell_state in zip(indices, cell_states):
+            if cell_state & border_walls[index]:
+                row, col = divmod(index, self.width)
+                return CantTearWallException(row, col, cell_state)
+
+    def carve(self, indices, cell_states):
+        """
+        Bulk version of `tear_down_wall`. indices and cell_states are parallel
+        sequences (e.g. an `array` and a `bytearray`): the cell at flat index
+        indices[i] (that is, row * width + col) is opened as in
+        cell_states[i], along with the matching walls of its neighbors.
+
+        All openings are checked against the border in one go before anything
+        is changed, so either every opening is made or, if any of them would
+        open the border, CantTearWallException is raised and the maze is left
+        untouched.
+        """
+        cell_count = len(indices)
+
+        if cell_count != len(cell_states):
+            raise ValueError("Got %s indices but %s cell states" % (cell_count, len(cell_states)))
+
+        if not cell_count:
+            return
+
+        # Gather the border walls of every cell being carved in one C-level
+        # call, then AND them with the requested openings as two big integers.
+        if cell_count == 1:
+            border_walls = bytes((self.border_walls[indices[0]],))
+        else:
+            border_walls = bytes(operator.itemgetter(*indices)(self.border_walls))
+
+        if int.from_bytes(border_walls, "big") & int.from_bytes(bytes(cell_states), "big"):
+            raise self.__find_border_violation(indices, cell_states)
+
+        if self.journal is not None:
+            self.__record(indices, cell_states)
+
+        if self.speedups is not None and isinstance(indices, array) and indices.typecode == "i" \
+          and isinstance(cell_states, (bytes, bytearray)):
+            self.speedups.carve(self.cells, self.width, indices, cell_states)
+            return
+
+        cells = self.cells
+        openings = get_openings(self.width)
+
+        for index, cell_state in zip(indices, cell_states):
+            cells[index] |= cell_state
+
+            for offset, inverse in openings[cell_state]:
+                cells[index + offset] |= inverse
+
+    def tear_down_walls(self, edges):
+        """
+        Like `carve` but takes an iterable of (row, col, cell_state) triples.
+        """
+        width = self.width
+        indices = array("i")
+        cell_states = bytearray()
+
+        for row, col, cell_state in edges:
+            indices.append(row * width + col)
+            cell_states.append(cell_state)
+
+        self.carve(indices, cell_states)
 
     def move_to_opening(self, row, col, state):
         """
@@ -94,33 +392,13 @@ class Maze(object):
 
         This does not do anything to the state of the Maze.
         """
-        results = set()
-
-        if (state & MazeCellStates.OPEN_NORTH) == MazeCellStates.OPEN_NORTH:
-            if row == 0:
-                raise CantTearWallException(row, col, state)
-            else:
-                results.add((row - 1, col))
-
-        if (state & MazeCellStates.OPEN_EAST) == MazeCellStates.OPEN_EAST:
-            if col == (len(self.maze[row]) - 1):
-                raise CantTearWallException(row, col, state)
-            else:
-                results.add((row, col + 1))
-
-        if (state & MazeCellStates.OPEN_SOUTH) == MazeCellStates.OPEN_SOUTH:
-            if row == (len(self.maze) - 1):
-                raise CantTearWallException(row, col, state)
-            else:
-                results.add((row + 1, col))
-
-        if (state & MazeCellStates.OPEN_WEST) == MazeCellStates.OPEN_WEST:
-            if col == 0:
-                raise CantTearWallException(row, col, state)
-            else:
-                results.add((row, col - 1))
-        
-        return results
+        index = row * self.width + col
+
+        if state & self.border_walls[index]:
+            raise CantTearWallException(row, col, state)
+
+        width = self.width
+        return set(divmod(index + offset, width) for offset in get_moves(width)[state])
 
     def tear_down_wall(self, row, col, cell_state):
         """
@@ -132,95 +410,108 @@ class Maze(object):
         same cell, the effect is as if you made one call to OPEN_SOUTH_WEST. It
         also affects adjacent cells to ensure that the openings are bidirectional.
 
-        Note that this cannot be used to undo removed walls.
+        Note that this cannot be used to undo removed walls; see `build_wall`.
 
         row - integer index
         col - integer index
         cell state - preferrably as enumerated in MazeCellStates
         """
-        
-        self.__set_cell_state(row, col, cell_state)
-        will_open_north = (cell_state & MazeCellStates.OPEN_NORTH) == MazeCellStates.OPEN_NORTH
-        will_open_east = (cell_state & MazeCellStates.OPEN_EAST) == MazeCellStates.OPEN_EAST
-        will_open_south = (cell_state & MazeCellStates.OPEN_SOUTH) == MazeCellStates.OPEN_SOUTH
-        will_open_west = (cell_state & MazeCellStates.OPEN_WEST) == MazeCellStates.OPEN_WEST
+        index = row * self.width + col
 
-        if will_open_north:
-            self.__set_cell_state(row - 1, col, MazeCellStates.OPEN_SOUTH)
+        if cell_state & self.border_walls[index]:
+            raise CantTearWallException(row, col, cell_state)
 
-        if will_open_east:
-            self.__set_cell_state(row, col + 1, MazeCellStates.OPEN_WEST)
+        if self.journal is not None:
+            self.__record((index,), (cell_state,))
 
-        if will_open_south:
-            self.__set_cell_state(row + 1, col, MazeCellStates.OPEN_NORTH)
+        cells = self.cells
+        cells[index] |= cell_state
 
-        if will_open_west:
-            self.__set_cell_state(row, col - 1, MazeCellStates.OPEN_EAST)
+        for offset, inverse in get_openings(self.width)[cell_state]:
+            cells[index + offset] |= inverse
+
+    def build_wall(self, row, col, cell_state):
+        """
+        The opposite of `tear_down_wall`: closes the openings of the given cell
+        that are in cell_state, along with the matching openings of its
+        neighbors. Walls on the border of the maze are always up, so asking
+        for them does nothing.
+        """
+        self.close((row * self.width + col,), (cell_state,))
+
+    def close(self, indices, cell_states):
+        """
+        Bulk version of `build_wall`, taking parallel sequences of flat indices
+        and cell states like `carve`.
+        """
+        if len(indices) != len(cell_states):
+            raise ValueError("Got %s indices but %s cell states" % (len(indices), len(cell_states)))
+
+        border_walls = self.border_walls
+        cell_states = [cell_state & ~border_walls[index] & 0xf
+          for index, cell_state in zip(indices, cell_states)]
+
+        if self.journal is not None:
+            self.__record(indices, cell_states)
+
+        cells = self.cells
+        openings = get_openings(self.width)
+
+        for index, cell_state in zip(indices, cell_states):
+            cells[index] &= ~cell_state
+
+            for offset, inverse in openings[cell_state]:
+                cells[index + offset] &= ~inverse
 
     def get_adjacent(self, row, col):
-        adjacent_cells = set()
-        rows = []
-        cols = []
+        width = self.width
+        index = row * width + col
+        return set(divmod(index + offset, width) for offset in self.adjacent_offsets(index))
+
+    def index(self, row, col):
+        """
+        Returns the flat index of the cell at (row, col).
+        """
+        return row * self.width + col
 
-        if row != 0:
-            rows.append(row - 1)
-        
-        if row != (len(self.maze) - 1):
-            rows.append(row + 1)
+    def coordinates(self, index):
+        """
+        Returns the (row, col) of the cell at the given flat index.
+        """
+        return divmod(index, self.width)
 
-        if col != 0:
-            cols.append(col - 1)
+    def adjacent_offsets(self, index):
+        """
+        Returns the offsets from the flat index of a cell to each of the cells
+        adjacent to it, walls notwithstanding. The tuple returned is shared and
+        built once per width, so iterating over it allocates nothing:
 
-        if col != (len(self.maze[row]) - 1):
-            cols.append(col + 1)
+            for offset in maze.adjacent_offsets(index):
+                neighbor = index + offset
+        """
+        return get_moves(self.width)[~self.border_walls[index] & 0xf]
 
-        # cross-products
-        for r in rows:
-            adjacent_cells.add((r, col))
-         
-        for c in cols:
-            adjacent_cells.add((row, c))
+    def open_offsets(self, index):
+        """
+        Like `adjacent_offsets` but only for the neighbors the cell has an
+        opening to.
+        """
+        return get_moves(self.width)[self.cells[index]]
 
-        return adjacent_cells
+    def open_neighbors(self, index):
+        """
+        Returns the flat indices of the cells the cell at index has an opening
+        to.
+        """
+        return [index + offset for offset in get_moves(self.width)[self.cells[index]]]
 
     def __str__(self):
-        base = [" _" for _ in range(len(self.maze[0]))]
-        build_string = ["".join(base)]
-        
-        for row in self.maze:
-            row_str = []
-            for cell in row:
-                open_east = (cell & MazeCellStates.OPEN_EAST) == MazeCellStates.OPEN_EAST
-                open_south = (cell & MazeCellStates.OPEN_SOUTH) == MazeCellStates.OPEN_SOUTH
-                open_west = (cell & MazeCellStates.OPEN_WEST) == MazeCellStates.OPEN_WEST
-                
-                cell_str = []
-
-                if open_west:
-                    cell_str.append(" ")
-                else:
-                    cell_str.append("|")
-
-                if open_south:
-                    cell_str.append(" ")
-                else:
-                    cell_str.append("_")
-
-                row_str.append("".join(cell_str))
-
-            row_str.append("|")
-            build_string.append("".join(row_str))
-        
-        return "\n".join(build_string)
+        from .rendering import ascii_lines
+
+        return "\n".join(line.decode("ascii") for line in ascii_lines(self))
 
     def __eq__(self, another_maze):
-        if len(self.maze) != len(another_maze.maze) or \
-          len(self.maze[0]) != len(another_maze.maze[0]):
+        if self.width != another_maze.width or self.height != another_maze.height:
             return False
 
-        for r_me, r_other in zip(self.maze, another_maze.maze):
-            for c_me, c_other in zip(r_me, r_other):
-                if c_me != c_other:
-                    return False
-
-        return True
+        return self.cells == another_maze.cells
@@ -0,0 +1,197 @@
+import collections
+
+from array import array
+
+from .batch import process_pool
+from .mazes import MazeCellStates, get_moves
+
+"""
+Statistics of generated mazes, for telling easy mazes from hard ones.
+
+Everything that only depends on single cells is counted in bulk: the state of
+every cell is mapped to its number of openings (its degree) with a translation
+table and the degrees are counted with bytes.count. Everything that depends on
+how cells connect comes out of one breadth-first walk of the maze and one pass
+back over the cells in the opposite order.
+
+Cells are classified by degree: dead ends have one opening, corridor cells two
+(either straight through or turning) and junctions three or four. Cells with
+no openings at all, such as cells masked out of the maze, are left out. A
+corridor is a chain of corridor cells between two cells that are not, and its
+length is its number of passages.
+
+The walk is rooted at a dead end and only covers the part of the maze that
+cell is in. Corridor lengths and the diameter assume a perfect maze; for mazes
+with loops they are those of the tree the walk follows.
+"""
+
+DEGREES = bytes(bin(state & 0xf).count("1") for state in range(256))
+STRAIGHTS = bytes(1 if state & 0xf in (MazeCellStates.OPEN_NORTH_SOUTH, MazeCellStates.OPEN_EAST_WEST)
+  else 0 for state in range(256))
+DEAD_ENDS = bytes(1 if degree == 1 else 0 for degree in DEGREES)
+
+"""
+The metrics of a maze.
+
+cells - the number of cells with at least one opening
+dead_ends, junctions - the number of cells with one opening and with three or
+  more openings
+straights, turns - the number of corridor cells going straight through and
+  turning
+corridor_lengths - a Counter of the lengths of the corridors
+river_factor - the average length of the corridors ending in a dead end. Mazes
+  that "flow" like a river have few, long dead ends and score high; mazes full
+  of short dead ends score low.
+diameter - the length of the longest path in the maze
+solution_length - the length of the path from the start to the end cell, or
+  None if there is none
+"""
+MazeMetrics = collections.namedtuple("MazeMetrics", ["cells", "dead_ends", "junctions",
+  "straights", "turns", "corridor_lengths", "river_factor", "diameter", "solution_length"])
+
+def _path_length(parents, depths, start, end):
+    if parents[start] == -1 or parents[end] == -1:
+        return None
+
+    length = 0
+
+    while depths[start] > depths[end]:
+        start = parents[start]
+        length += 1
+
+    while depths[end] > depths[start]:
+        end = parents[end]
+        length += 1
+
+    while start != end:
+        start = parents[start]
+        end = parents[end]
+        length += 2
+
+    return length
+
+def walk_tree(cells, degrees, width, root, start, end):
+    """
+    Walks the maze with the given cells and cell degrees from the flat index
+    root and returns a tuple of its diameter, the length of the path between
+    the flat indices start and end (None if there is none), a dict of corridor
+    lengths to how many corridors are that long, and the number and total
+    length of the corridors ending in a dead end.
+
+    The compiled engine has the same function, which has to give the same
+    results.
+    """
+    cell_count = len(cells)
+    moves = get_moves(width)
+    parents = array("i", [-1]) * cell_count
+    depths = array("i", [0]) * cell_count
+    parents[root] = root
+    order = [root]
+    append = order.append
+
+    for current in order:
+        depth = depths[current] + 1
+
+        for offset in moves[cells[current]]:
+            neighbor = current + offset
+
+            if parents[neighbor] == -1:
+                parents[neighbor] = current
+                depths[neighbor] = depth
+                append(neighbor)
+
+    # Children come before their parents from the end of the walk on. heights
+    # holds how far below each cell the deepest cell under it is, below how
+    # far the next cell under it that is not a corridor cell is and dead_below
+    # whether that cell is a dead end.
+    heights = array("i", [0]) * cell_count
+    below = array("i", [0]) * cell_count
+    dead_below = bytearray(cells.translate(DEAD_ENDS))
+    corridor_lengths = {}
+    dead_end_corridors = 0
+    dead_end_length = 0
+    diameter = 0
+
+    for cell in reversed(order):
+        if cell == root:
+            break
+
+        parent = parents[cell]
+        height = heights[cell] + 1
+        parent_height = heights[parent]
+
+        if parent_height + height > diameter:
+            diameter = parent_height + height
+        if height > parent_height:
+            heights[parent] = height
+
+        length = below[cell] + 1
+        is_dead_end = dead_below[cell]
+
+        if degrees[parent] == 2 and parent != root:
+            below[parent] = length
+            dead_below[parent] = is_dead_end
+            continue
+
+        corridor_lengths[length] = corridor_lengths.get(length, 0) + 1
+
+        if is_dead_end or degrees[parent] == 1:
+            dead_end_corridors += 1
+            dead_end_length += length
+
+    return (diameter, _path_length(parents, depths, start, end), corridor_lengths,
+      dead_end_corridors, dead_end_length)
+
+def measure(maze, start=(0, 0), end=None):
+    """
+    Returns the MazeMetrics of maze. The solution runs from start to end,
+    given as (row, col); end defaults to the south-eastern corner.
+    """
+    cells = bytes(maze.cells)
+    cell_count = len(cells)
+    width = maze.width
+
+    if end is None:
+        end = (maze.height - 1, width - 1)
+
+    if not cell_count:
+        return MazeMetrics(0, 0, 0, 0, 0, collections.Counter(), 0.0, 0, None)
+
+    degrees = cells.translate(DEGREES)
+    corridor_cells = degrees.count(2)
+    straights = cells.translate(STRAIGHTS).count(1)
+    root = degrees.find(1)
+
+    if root == -1:
+        root = next((cell for cell, degree in enumerate(degrees) if degree), 0)
+
+    walk = walk_tree if maze.speedups is None else maze.speedups.walk_tree
+    diameter, solution_length, corridor_lengths, dead_end_corridors, dead_end_length = walk(
+      cells, degrees, width, root, start[0] * width + start[1], end[0] * width + end[1])
+
+    return MazeMetrics(
+        cells=cell_count - degrees.count(0) if cell_count > 1 else cell_count,
+        dead_ends=degrees.count(1),
+        junctions=degrees.count(3) + degrees.count(4),
+        straights=straights,
+        turns=corridor_cells - straights,
+        corridor_lengths=collections.Counter(corridor_lengths),
+        river_factor=dead_end_length / dead_end_corridors if dead_end_corridors else 0.0,
+        diameter=diameter,
+        solution_length=solution_length,
+    )
+
+def measure_many(mazes, workers=None, chunksize=None):
+    """
+    Returns the MazeMetrics of every maze in mazes, in order, measured in
+    workers processes as in ariadne.batch.generate_many.
+    """
+    mazes = list(mazes)
+
+    if workers is not None and workers <= 1:
+        return [measure(maze) for maze in mazes]
+
+    executor, _, chunksize = process_pool(workers, len(mazes), chunksize)
+
+    with executor:
+        return list(executor.map(measure, mazes, chunksize=chunksize))
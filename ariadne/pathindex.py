@@ -0,0 +1,330 @@
+import struct
+import sys
+import zlib
+
+from array import array
+
+from .errors import InvalidMazeFileException
+from .mazes import get_moves
+
+"""
+Answers repeated distance and path queries on a perfect maze without searching.
+
+A perfect maze is a spanning tree of its cells. Rooting that tree once gives
+every cell a parent and a depth, and the distance between two cells is then
+depth[a] + depth[b] - 2 * depth[lca(a, b)]. The lowest common ancestor is found
+by binary lifting: ancestors[k][cell] is the ancestor 2 ** k levels above cell.
+"""
+
+MAGIC = b"ARDI"
+VERSION = 1
+
+# magic, version, levels, width, height, crc32 of the maze cells
+HEADER = struct.Struct("<4sBBIII")
+
+
+class PathIndex(object):
+
+    def __init__(self, maze, root=0):
+        """
+        Builds the index for maze, which has to be a perfect maze. Raises
+        ValueError if it is disconnected or has a loop.
+        """
+        self.width = maze.width
+        self.height = maze.height
+        self.checksum = zlib.crc32(maze.cells)
+        cells = maze.cells
+        cell_count = len(cells)
+        moves = get_moves(maze.width)
+        parents = array("i", [-1]) * cell_count
+        depths = array("i", [-1]) * cell_count
+        parents[root] = root
+        depths[root] = 0
+        order = [root]
+        append = order.append
+
+        for current in order:
+            parent = parents[current]
+            depth = depths[current] + 1
+
+            for offset in moves[cells[current]]:
+                neighbor = current + offset
+
+                if depths[neighbor] == -1:
+                    depths[neighbor] = depth
+                    parents[neighbor] = current
+                    append(neighbor)
+                elif neighbor != parent:
+                    raise ValueError("Maze has a loop through %s" % (divmod(current, self.width),))
+
+        if len(order) != cell_count:
+            raise ValueError("Maze is not connected")
+
+        self.depths = depths
+        self.ancestors = [parents]
+        max_depth = depths[order[-1]]
+
+        while (1 << len(self.ancestors)) <= max_depth:
+            previous = self.ancestors[-1]
+            self.ancestors.append(array("i", map(previous.__getitem__, previous)))
+
+    def update(self, maze, changed):
+        """
+        Brings the index up to date with maze after the cells at the flat
+        indices in changed were edited, as given by e.g.
+        ariadne.edits.EditJournal.changed_indices. Only the parts of the tree
+        hanging below passages that were closed are rebuilt.
+
+        Raises ValueError, leaving the index as it was, if the maze is no
+        longer perfect.
+        """
+        if (maze.width, maze.height) != (self.width, self.height):
+            raise ValueError("Maze is %sx%s, not %sx%s" % (maze.width, maze.height,
+              self.width, self.height))
+
+        cells = maze.cells
+        border_walls = maze.border_walls
+        moves = get_moves(self.width)
+        parents = self.ancestors[0]
+        depths = self.depths
+        detached = bytearray(len(cells))
+        stack = []
+        opened = []
+
+        # Closing a passage of the tree detaches everything below it. Opening
+        # any other passage makes a loop unless it leads into a detached part.
+        for cell in set(changed):
+            open_offsets = moves[cells[cell]]
+
+            for offset in moves[~border_walls[cell] & 0xf]:
+                neighbor = cell + offset
+
+                if parents[neighbor] == cell:
+                    below = neighbor
+                elif parents[cell] == neighbor:
+                    below = cell
+                else:
+                    if offset in open_offsets:
+                        opened.append((cell, neighbor))
+                    continue
+
+                if offset not in open_offsets and not detached[below]:
+                    detached[below] = 1
+                    stack.append(below)
+
+        members = []
+
+        while stack:
+            cell = stack.pop()
+            members.append(cell)
+
+            for offset in moves[~border_walls[cell] & 0xf]:
+                child = cell + offset
+
+                if parents[child] == cell and not detached[child]:
+                    detached[child] = 1
+                    stack.append(child)
+
+        for cell, neighbor in opened:
+            if not (detached[cell] or detached[neighbor]):
+                raise ValueError("Maze has a loop through %s" % (divmod(cell, self.width),))
+
+        # Hang the detached cells back from wherever they now open into the
+        # rest of the tree.
+        new_parents = {}
+        order = []
+
+        for cell in members:
+            for offset in moves[cells[cell]]:
+                if not detached[cell + offset]:
+                    if cell in new_parents:
+                        raise ValueError("Maze has a loop through %s" % (divmod(cell, self.width),))
+                    new_parents[cell] = cell + offset
+                    order.append(cell)
+
+        for cell in order:
+            parent = new_parents[cell]
+
+            for offset in moves[cells[cell]]:
+                child = cell + offset
+
+                if child == parent or not detached[child]:
+                    continue
+
+                if child in new_parents:
+                    raise ValueError("Maze has a loop through %s" % (divmod(child, self.width),))
+
+                new_parents[child] = cell
+                order.append(child)
+
+        if len(order) != len(members):
+            raise ValueError("Maze is not connected")
+
+        for cell in order:
+            parent = new_parents[cell]
+            parents[cell] = parent
+            depths[cell] = depths[parent] + 1
+
+        for level in range(1, len(self.ancestors)):
+            previous = self.ancestors[level - 1]
+            current = self.ancestors[level]
+
+            for cell in order:
+                current[cell] = previous[previous[cell]]
+
+        max_depth = max(depths) if depths else 0
+
+        while (1 << len(self.ancestors)) <= max_depth:
+            previous = self.ancestors[-1]
+            self.ancestors.append(array("i", map(previous.__getitem__, previous)))
+
+        self.checksum = zlib.crc32(cells)
+
+    def __index(self, cell):
+        return cell[0] * self.width + cell[1]
+
+    def lca_indices(self, a, b):
+        """
+        Returns the flat index of the lowest common ancestor of the cells at
+        flat indices a and b.
+        """
+        depths = self.depths
+        ancestors = self.ancestors
+
+        if depths[a] < depths[b]:
+            a, b = b, a
+
+        difference = depths[a] - depths[b]
+        level = 0
+
+        while difference:
+            if difference & 1:
+                a = ancestors[level][a]
+            difference >>= 1
+            level += 1
+
+        if a == b:
+            return a
+
+        for level in range(len(ancestors) - 1, -1, -1):
+            up = ancestors[level]
+
+            if up[a] != up[b]:
+                a = up[a]
+                b = up[b]
+
+        return ancestors[0][a]
+
+    def distance_indices(self, a, b):
+        depths = self.depths
+        return depths[a] + depths[b] - 2 * depths[self.lca_indices(a, b)]
+
+    def distance(self, start, end):
+        """
+        Returns the number of steps between two cells given as (row, col).
+        """
+        return self.distance_indices(self.__index(start), self.__index(end))
+
+    def path_indices(self, a, b):
+        """
+        Returns the path from a to b as an array of flat cell indices, as the
+        solvers in ariadne.solvers do.
+        """
+        parents = self.ancestors[0]
+        lca = self.lca_indices(a, b)
+        path = array("i", [a])
+
+        while a != lca:
+            a = parents[a]
+            path.append(a)
+
+        tail = array("i")
+
+        while b != lca:
+            tail.append(b)
+            b = parents[b]
+
+        tail.reverse()
+        path.extend(tail)
+        return path
+
+    def path(self, start, end):
+        """
+        Like ariadne.solvers.MazeSolver.solve, without the search.
+        """
+        return self.path_indices(self.__index(start), self.__index(end))
+
+    def matches(self, maze):
+        """
+        Returns True if this index was built from a maze identical to maze.
+        """
+        return (self.width, self.height, self.checksum) == \
+          (maze.width, maze.height, zlib.crc32(maze.cells))
+
+    def dump(self, fileobj):
+        """
+        Writes this index to the binary file object fileobj: a header followed
+        by the depths and every level of ancestors as little-endian int32.
+        """
+        fileobj.write(HEADER.pack(MAGIC, VERSION, len(self.ancestors), self.width,
+          self.height, self.checksum))
+
+        for table in [self.depths] + self.ancestors:
+            if sys.byteorder == "big":
+                table = array("i", table)
+                table.byteswap()
+            fileobj.write(table.tobytes())
+
+    def save(self, path):
+        with open(path, "wb") as fileobj:
+            self.dump(fileobj)
+
+    @classmethod
+    def loads(cls, buf):
+        if len(buf) < HEADER.size:
+            raise InvalidMazeFileException("truncated header")
+
+        magic, version, levels, width, height, checksum = HEADER.unpack_from(buf)
+
+        if magic != MAGIC:
+            raise InvalidMazeFileException("bad magic %r" % magic)
+
+        if version != VERSION:
+            raise InvalidMazeFileException("unsupported version %s" % version)
+
+        table_size = width * height * 4
+
+        if len(buf) != HEADER.size + table_size * (levels + 1):
+            raise InvalidMazeFileException("expected %s tables of %s cells" % (levels + 1,
+              width * height))
+
+        tables = []
+
+        for start in range(HEADER.size, len(buf), table_size):
+            table = array("i")
+            table.frombytes(buf[start:start + table_size])
+            if sys.byteorder == "big":
+                table.byteswap()
+            tables.append(table)
+
+        index = cls.__new__(cls)
+        index.width = width
+        index.height = height
+        index.checksum = checksum
+        index.depths = tables[0]
+        index.ancestors = tables[1:]
+        return index
+
+    @classmethod
+    def load(cls, path, maze=None):
+        """
+        Loads an index saved with `save`. If maze is given, raises
+        InvalidMazeFileException unless the index was built from it.
+        """
+        with open(path, "rb") as fileobj:
+            index = cls.loads(fileobj.read())
+
+        if maze is not None and not index.matches(maze):
+            raise InvalidMazeFileException("index does not belong to this maze")
+
+        return index
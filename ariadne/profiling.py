@@ -0,0 +1,201 @@
+import collections
+import contextlib
+import functools
+import time
+
+from .mazes import get_moves
+from .metrics import DEGREES
+
+"""
+Opt-in instrumentation of the maze generators.
+
+Attach a Profiler to a generator, or to MazeGenerator to profile every
+generator at once, and every generation leaves behind a Profile of where its
+time went and of a few counters:
+
+    profiler = Profiler()
+    generator = RecursiveBacktracker()
+    generator.profiler = profiler
+    generator.generate(1000, 1000, 42)
+    print(profiler.to_json(indent=2))
+
+Time is measured per phase of a generation (drawing random numbers, walking
+the grid, carving the passages into the maze, ...) rather than per step, and
+counters are worked out from what the generator has at hand anyway once a
+phase is over, or from the finished maze once the generation has been timed
+(see `Profile.defer`), so the hot loops are the same whether profiling is on or
+not.
+With no profiler attached, a generation costs one attribute lookup more and a
+few no-op context managers.
+"""
+
+NO_PHASE = contextlib.nullcontext()
+
+
+class Profile(object):
+    """
+    The timings, in seconds, and counters of one generation.
+    """
+
+    def __init__(self, algorithm, width, height, seed=None):
+        self.algorithm = algorithm
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.timings = {}
+        self.counters = {}
+        self.deferred = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Adds the time spent in the with block to the phase called name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def defer(self, function):
+        """
+        Has function called with the finished maze once the generation has
+        been timed, for counters too costly to count while timing.
+        """
+        self.deferred.append(function)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def peak(self, name, value):
+        """
+        Raises the counter called name to value, if it is lower.
+        """
+        self.counters[name] = max(self.counters.get(name, value), value)
+
+    def as_dict(self):
+        return {
+            "algorithm": self.algorithm,
+            "width": self.width,
+            "height": self.height,
+            "seed": self.seed,
+            "timings": dict(self.timings),
+            "counters": dict(self.counters),
+        }
+
+    def to_json(self, **kwargs):
+        # json is only imported for exporting: it pulls in re and enum, which
+        # every process importing the generators would pay for otherwise.
+        import json
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+class Profiler(object):
+    """
+    Collects the Profile of every generation of the generators it is
+    attached to, keeping only the last max_profiles of them if given.
+    """
+
+    def __init__(self, max_profiles=None):
+        self.profiles = collections.deque(maxlen=max_profiles)
+
+    def add(self, profile):
+        self.profiles.append(profile)
+
+    def clear(self):
+        self.profiles.clear()
+
+    def totals(self):
+        """
+        Returns the timings and counters of the profiles summed per algorithm,
+        as a dict of algorithm name to a dict with the number of generations,
+        timings and counters.
+        """
+        totals = {}
+
+        for profile in self.profiles:
+            total = totals.setdefault(profile.algorithm,
+              {"generations": 0, "timings": collections.Counter(), "counters": collections.Counter()})
+            total["generations"] += 1
+            total["timings"].update(profile.timings)
+            total["counters"].update(profile.counters)
+
+        return {algorithm: {"generations": total["generations"], "timings": dict(total["timings"]),
+          "counters": dict(total["counters"])} for algorithm, total in totals.items()}
+
+    def as_dict(self):
+        return {
+            "profiles": [profile.as_dict() for profile in self.profiles],
+            "totals": self.totals(),
+        }
+
+    def to_json(self, **kwargs):
+        import json
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+def phase(profile, name):
+    """
+    Returns a context manager timing the phase called name into profile, or
+    one doing nothing if profile is None.
+    """
+    return NO_PHASE if profile is None else profile.phase(name)
+
+def profiled(generate):
+    """
+    Decorates the generate method of a MazeGenerator so that, whenever the
+    generator has a profiler, its generations are profiled. While a
+    generation runs, its Profile is the `profile` attribute of the generator,
+    for the generator to add its phases and counters to.
+
+    Each profile has a "total" timing for the whole generation and counts the
+    passages of the maze made.
+    """
+    @functools.wraps(generate)
+    def profiled_generate(self, width, height, seed=None, mask=None):
+        profiler = self.profiler
+
+        if profiler is None:
+            return generate(self, width, height, seed, mask)
+
+        profile = Profile(self.__class__.__name__, width, height,
+          seed if isinstance(seed, int) else None)
+        self.profile = profile
+
+        try:
+            with profile.phase("total"):
+                maze = generate(self, width, height, seed, mask)
+        finally:
+            del self.profile
+
+        for function in profile.deferred:
+            function(maze)
+
+        del profile.deferred[:]
+        profile.count("passages", sum(bytes(maze.cells).translate(DEGREES)) // 2)
+        profiler.add(profile)
+        return maze
+
+    return profiled_generate
+
+def tree_depth(maze, root):
+    """
+    Returns the number of steps from root to the cell furthest from it in the
+    perfect maze maze.
+    """
+    cells = maze.cells
+    moves = get_moves(maze.width)
+    depths = {root: 0}
+    order = [root]
+
+    for current in order:
+        depth = depths[current] + 1
+
+        for offset in moves[cells[current]]:
+            neighbor = current + offset
+
+            if neighbor not in depths:
+                depths[neighbor] = depth
+                order.append(neighbor)
+
+    return depths[order[-1]]
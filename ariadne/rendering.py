@@ -0,0 +1,121 @@
+import io
+import struct
+import zlib
+
+from .mazes import MazeCellStates
+
+"""
+Renders Mazes as ASCII art or as monochrome bitmaps.
+
+Whole rows are rendered at a time: every cell state is mapped to its output
+through a 256-entry translation table and the per-cell outputs are woven
+together with extended slice assignments, so no Python code runs per cell.
+Everything is written out one row at a time, so rendering a maze never needs
+much more memory than a couple of rows of output.
+"""
+
+def _flag_table(direction, when_open, when_closed):
+    return bytes(when_open if state & direction else when_closed for state in range(256))
+
+WEST_WALLS = _flag_table(MazeCellStates.OPEN_WEST, ord(" "), ord("|"))
+SOUTH_WALLS = _flag_table(MazeCellStates.OPEN_SOUTH, ord(" "), ord("_"))
+
+# For bitmaps, 1 is a wall and 0 is a passage.
+EAST_PIXELS = _flag_table(MazeCellStates.OPEN_EAST, 0, 1)
+SOUTH_PIXELS = _flag_table(MazeCellStates.OPEN_SOUTH, 0, 1)
+BIT_DIGITS = b"01" + bytes(254)
+# PNG grayscale has 1 for white, so walls have to be flipped to 0 there.
+PNG_PIXELS = b"\1\0" + bytes(254)
+
+def _interleave(first, second):
+    woven = bytearray(len(first) + len(second))
+    woven[0::2] = first
+    woven[1::2] = second
+    return woven
+
+def _rows(maze):
+    cells = maze.cells
+    width = maze.width
+
+    for row in range(maze.height):
+        yield bytes(cells[row * width:(row + 1) * width])
+
+def ascii_lines(maze):
+    """
+    Yields the lines of the ASCII rendering of maze as `bytes`, without line
+    terminators. This is the rendering `str(maze)` gives.
+    """
+    yield b" _" * maze.width
+
+    for row in _rows(maze):
+        line = _interleave(row.translate(WEST_WALLS), row.translate(SOUTH_WALLS))
+        line.append(ord("|"))
+        yield bytes(line)
+
+def write_ascii(maze, fileobj):
+    """
+    Writes the ASCII rendering of maze to fileobj, which may be opened either
+    in text or in binary mode, followed by a newline.
+    """
+    is_text = isinstance(fileobj, io.TextIOBase)
+
+    for line in ascii_lines(maze):
+        line += b"\n"
+        fileobj.write(line.decode("ascii") if is_text else line)
+
+def pixel_rows(maze):
+    """
+    Yields the rows of a (2 * width + 1) by (2 * height + 1) bitmap of maze,
+    one byte per pixel: 1 for walls and 0 for passages. Cell (row, col) is the
+    pixel at (2 * row + 1, 2 * col + 1) and the walls around it are the pixels
+    next to it.
+    """
+    width = maze.width
+    yield b"\1" * (2 * width + 1)
+
+    for row in _rows(maze):
+        yield b"\1" + bytes(_interleave(b"\0" * width, row.translate(EAST_PIXELS)))
+        yield b"\1" + bytes(_interleave(row.translate(SOUTH_PIXELS), b"\1" * width))
+
+def pack_bits(pixels):
+    """
+    Packs a row of 0/1 pixel bytes into bits, most significant bit first, with
+    the last byte padded with zeroes.
+    """
+    byte_count = (len(pixels) + 7) // 8
+    digits = pixels.translate(BIT_DIGITS) + b"0" * (byte_count * 8 - len(pixels))
+    return int(digits, 2).to_bytes(byte_count, "big") if digits else b""
+
+def write_pbm(maze, fileobj):
+    """
+    Writes maze as a binary (P4) portable bitmap to the binary file object
+    fileobj. Walls are black.
+    """
+    fileobj.write(b"P4\n%d %d\n" % (2 * maze.width + 1, 2 * maze.height + 1))
+
+    for pixels in pixel_rows(maze):
+        fileobj.write(pack_bits(pixels))
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + \
+      struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+
+def write_png(maze, fileobj):
+    """
+    Writes maze as a 1-bit grayscale PNG to the binary file object fileobj.
+    Walls are black. The image data is compressed and written as it is
+    rendered.
+    """
+    fileobj.write(b"\x89PNG\r\n\x1a\n")
+    fileobj.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", 2 * maze.width + 1,
+      2 * maze.height + 1, 1, 0, 0, 0, 0)))
+
+    compressor = zlib.compressobj()
+
+    for pixels in pixel_rows(maze):
+        data = compressor.compress(b"\0" + pack_bits(pixels.translate(PNG_PIXELS)))
+        if data:
+            fileobj.write(_png_chunk(b"IDAT", data))
+
+    fileobj.write(_png_chunk(b"IDAT", compressor.flush()))
+    fileobj.write(_png_chunk(b"IEND", b""))
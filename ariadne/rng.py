@@ -0,0 +1,147 @@
+import itertools
+import random
+import sys
+
+from array import array
+
+"""
+Bulk random numbers for the generators.
+
+Drawing decisions one at a time through random.Random costs a Python call, and
+usually a good deal more, per decision. Everything here draws random bits from
+a random.Random in large batches with getrandbits instead, so that a generator
+pays for one call per batch. All of it is deterministic: the same
+random.Random state always gives the same numbers, and thus the same seed
+always gives the same maze.
+"""
+
+def get_random(seed):
+    """
+    Returns the random.Random for seed: seed itself if it already is one (or
+    is the random module), the module-level random if seed is None and
+    random.Random(seed) otherwise.
+    """
+    if seed is None or seed is random:
+        return random
+    elif isinstance(seed, random.Random):
+        return seed
+    else:
+        return random.Random(seed)
+
+def draw_bytes(rng, count):
+    """
+    Returns count random bytes.
+    """
+    return rng.getrandbits(8 * count).to_bytes(count, "little") if count > 0 else b""
+
+def draw_words(rng, count):
+    """
+    Returns count random 16-bit words as little-endian bytes.
+    """
+    return draw_bytes(rng, 2 * count)
+
+def words(draws):
+    """
+    Returns the little-endian 16-bit words in draws as an array("H").
+    """
+    result = array("H")
+    result.frombytes(draws)
+    if sys.byteorder == "big":
+        result.byteswap()
+    return result
+
+def draw_dwords(rng, count):
+    """
+    Returns count random 32-bit words as little-endian bytes.
+    """
+    return draw_bytes(rng, 4 * count)
+
+def dwords(draws):
+    """
+    Returns the little-endian 32-bit words in draws as an array("I").
+    """
+    result = array("I")
+    result.frombytes(draws)
+    if sys.byteorder == "big":
+        result.byteswap()
+    return result
+
+def shuffle(items, draws):
+    """
+    Shuffles the mutable sequence items in place with the Fisher-Yates
+    shuffle, drawing the random numbers from draws, as returned by
+    `draw_dwords` for len(items) words: going down from the end, items[i] is
+    swapped with items[j] where j is the word at i scaled to range(i + 1).
+
+    The compiled engine for KruskalsAlgorithm shuffles the same way, so the
+    two give the same order for the same draws.
+    """
+    values = dwords(draws)
+
+    for i in range(len(items) - 1, 0, -1):
+        j = values[i] * (i + 1) >> 32
+        items[i], items[j] = items[j], items[i]
+
+def draw_digits(rng, count):
+    """
+    Returns count random ASCII digits 0 and 1 as bytes, ready to be turned into
+    cell states with bytes.translate.
+    """
+    if count <= 0:
+        return b""
+    return format(rng.getrandbits(count), "0%db" % count).encode("ascii")
+
+"""
+A random byte b picks uniformly among n options as b % n as long as b is below
+BYTE_LIMITS[n]; larger bytes have to be thrown away and redrawn. For up to four
+options, as when picking a direction, that only happens for n == 3 and b == 255.
+"""
+BYTE_LIMITS = tuple(256 - 256 % n if n else 0 for n in range(257))
+
+
+class BulkRandom(object):
+    """
+    Hands out random numbers drawn from a random.Random in batches of
+    batch_size bytes. `drawn` counts the bytes drawn so far, used or not.
+
+    Hot loops should not call `below` or `choice` but inline them through
+    `next_byte`, a C-level callable that returns the next random byte:
+
+        count = len(options)
+        byte = next_byte()
+        while byte >= BYTE_LIMITS[count]:
+            byte = next_byte()
+        option = options[byte % count]
+    """
+
+    def __init__(self, seed=None, batch_size=4096):
+        """
+        seed is as in ariadne.generators.MazeGenerator.generate.
+        """
+        self.rng = get_random(seed)
+        self.batch_size = batch_size
+        self.drawn = 0
+        self.next_byte = itertools.chain.from_iterable(iter(self.__batch, None)).__next__
+
+    def __batch(self):
+        self.drawn += self.batch_size
+        return draw_bytes(self.rng, self.batch_size)
+
+    def below(self, n):
+        """
+        Returns a random integer in range(n).
+        """
+        if n > 256:
+            return self.rng.randrange(n)
+
+        next_byte = self.next_byte
+        limit = BYTE_LIMITS[n]
+        byte = next_byte()
+
+        while byte >= limit:
+            byte = next_byte()
+
+        return byte % n
+
+    def choice(self, options):
+        return options[self.below(len(options))]
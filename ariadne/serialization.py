@@ -0,0 +1,187 @@
+import mmap
+import os
+import struct
+
+from .errors import InvalidMazeFileException
+from .mazes import Maze
+
+"""
+A versioned binary format for Mazes.
+
+Every file starts with a fixed little-endian header:
+
+    magic        4 bytes, always b"ARDN"
+    version      uint8
+    flags        uint8, see FLAG_*
+    reserved     uint16, always 0
+    width        uint32
+    height       uint32
+    seed         int64, only meaningful if FLAG_HAS_SEED is set
+    name length  uint16, length of the algorithm name that follows
+
+followed by the UTF-8 name of the algorithm that generated the maze (may be
+empty) and then by the cells, row-major. If FLAG_PACKED is set, two cells are
+packed per byte (the earlier cell in the high nibble, the last nibble padded
+with zero for an odd number of cells); otherwise there is one cell per byte,
+exactly like `Maze.cells`, and the file can be memory-mapped.
+"""
+
+MAGIC = b"ARDN"
+VERSION = 1
+
+FLAG_PACKED = 0x1
+FLAG_HAS_SEED = 0x2
+
+HEADER = struct.Struct("<4sBBHIIqH")
+
+HIGH_NIBBLE = bytes((value & 0xf) << 4 for value in range(256))
+UNPACK_HIGH = bytes(value >> 4 for value in range(256))
+UNPACK_LOW = bytes(value & 0xf for value in range(256))
+
+def pack_nibbles(cells):
+    """
+    Packs a buffer of nibbles, one per byte, into half as many bytes.
+    """
+    cell_count = len(cells)
+    high = bytes(cells[0::2]).translate(HIGH_NIBBLE)
+    low = bytes(cells[1::2])
+
+    if len(low) < len(high):
+        low += b"\0"
+
+    # OR the two halves together in one go by treating them as big integers.
+    packed = int.from_bytes(high, "big") | int.from_bytes(low, "big")
+    return packed.to_bytes((cell_count + 1) // 2, "big")
+
+def unpack_nibbles(packed, cell_count):
+    """
+    Inverse of pack_nibbles. Returns a bytearray of cell_count nibbles.
+    """
+    if len(packed) != (cell_count + 1) // 2:
+        raise InvalidMazeFileException("expected %s packed bytes, got %s" %
+          ((cell_count + 1) // 2, len(packed)))
+
+    cells = bytearray(len(packed) * 2)
+    cells[0::2] = packed.translate(UNPACK_HIGH)
+    cells[1::2] = packed.translate(UNPACK_LOW)
+    del cells[cell_count:]
+    return cells
+
+def dump(maze, fileobj, packed=True):
+    """
+    Writes maze to the binary file object fileobj.
+
+    The algorithm name and seed in the header are taken from `maze.algorithm`
+    and `maze.seed`. The seed is only recorded if it is an integer.
+    """
+    flags = 0
+    seed = maze.seed
+    algorithm = (maze.algorithm or "").encode("utf-8")
+
+    if packed:
+        flags |= FLAG_PACKED
+
+    if isinstance(seed, int) and -2 ** 63 <= seed < 2 ** 63:
+        flags |= FLAG_HAS_SEED
+    else:
+        seed = 0
+
+    fileobj.write(HEADER.pack(MAGIC, VERSION, flags, 0, maze.width, maze.height, seed,
+      len(algorithm)))
+    fileobj.write(algorithm)
+    fileobj.write(pack_nibbles(maze.cells) if packed else maze.cells)
+
+def read_header(buf):
+    """
+    Parses the header at the start of buf. Returns a tuple of
+    (flags, width, height, seed, algorithm, cells_offset) where seed and
+    algorithm are None if absent.
+    """
+    if len(buf) < HEADER.size:
+        raise InvalidMazeFileException("truncated header")
+
+    magic, version, flags, _, width, height, seed, name_length = HEADER.unpack_from(buf)
+
+    if magic != MAGIC:
+        raise InvalidMazeFileException("bad magic %r" % magic)
+
+    if version != VERSION:
+        raise InvalidMazeFileException("unsupported version %s" % version)
+
+    cells_offset = HEADER.size + name_length
+    try:
+        algorithm = bytes(buf[HEADER.size:cells_offset]).decode("utf-8") or None
+    except UnicodeDecodeError:
+        raise InvalidMazeFileException("algorithm name is not UTF-8")
+
+    if not flags & FLAG_HAS_SEED:
+        seed = None
+
+    return flags, width, height, seed, algorithm, cells_offset
+
+def loads(buf):
+    """
+    Reads a Maze out of the bytes-like buf. The cells are always copied.
+    """
+    flags, width, height, seed, algorithm, cells_offset = read_header(buf)
+    cell_data = bytes(buf[cells_offset:])
+
+    if flags & FLAG_PACKED:
+        cells = unpack_nibbles(cell_data, width * height)
+    elif len(cell_data) == width * height:
+        cells = bytearray(cell_data)
+    else:
+        raise InvalidMazeFileException("expected %s cells, got %s" % (width * height,
+          len(cell_data)))
+
+    maze = Maze.from_buffer(width, height, cells)
+    maze.algorithm = algorithm
+    maze.seed = seed
+    return maze
+
+def load(path, use_mmap=False):
+    """
+    Reads the Maze saved at path.
+
+    If use_mmap is True the file is memory-mapped and, for files saved with
+    packed=False, the returned Maze reads its cells straight from the mapping
+    without copying them. Such a Maze is read-only and the pages are shared by
+    every process mapping the same file. Packed files are unpacked into memory
+    either way.
+    """
+    with open(path, "rb") as fileobj:
+        if not use_mmap:
+            return loads(fileobj.read())
+
+        # mmap can't map an empty file, which has no header anyway.
+        if os.fstat(fileobj.fileno()).st_size < HEADER.size:
+            raise InvalidMazeFileException("truncated header")
+
+        mapping = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+
+    try:
+        flags, width, height, seed, algorithm, cells_offset = read_header(view)
+        cell_count = max(len(view) - cells_offset, 0)
+
+        if not flags & FLAG_PACKED and cell_count != width * height:
+            raise InvalidMazeFileException("expected %s cells, got %s" % (width * height,
+              cell_count))
+    except InvalidMazeFileException:
+        view.release()
+        mapping.close()
+        raise
+
+    if flags & FLAG_PACKED:
+        view.release()
+
+        try:
+            return loads(mapping)
+        finally:
+            mapping.close()
+
+    maze = Maze.from_buffer(width, height, view[cells_offset:])
+    maze.algorithm = algorithm
+    maze.seed = seed
+    return maze
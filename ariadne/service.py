@@ -0,0 +1,151 @@
+import asyncio
+import collections
+import random
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import generate_packed
+from .errors import InvalidSizeException
+from .generators import GENERATORS
+from .mazes import Maze
+
+"""
+Maze generation as an asyncio service.
+
+A MazeService takes (algorithm, width, height, seed) requests from coroutines,
+generates the mazes in a pool of worker processes so that the event loop keeps
+serving everything else meanwhile, and keeps the results in a cache of bounded
+size. Since the same parameters always give the same maze, a request that is
+already cached is answered without generating anything, and requests for a
+maze that is still being generated wait for that one generation instead of
+starting their own.
+
+A service belongs to the event loop it is first used from.
+"""
+
+# The default size of the cache, in bytes of cells.
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+def _generate(algorithm, width, height, seed):
+    return generate_packed(GENERATORS[algorithm](), width, height, seed)
+
+
+class MazeService(object):
+
+    def __init__(self, workers=None, cache_bytes=DEFAULT_CACHE_BYTES, max_cells=None,
+      executor=None):
+        """
+        workers - the number of worker processes; defaults to the number of
+          CPUs.
+        cache_bytes - how many bytes of cells the cache may hold. The least
+          recently used mazes are dropped first; 0 turns the cache off.
+        max_cells - if given, requests for larger mazes are refused with
+          InvalidSizeException.
+        executor - a concurrent.futures.Executor to generate in instead of a
+          pool of our own, e.g. a ThreadPoolExecutor when the speedups, which
+          release the GIL, do the work. It is not shut down by `close`.
+        """
+        self.cache_bytes = cache_bytes
+        self.max_cells = max_cells
+        self.owns_executor = executor is None
+        self.executor = ProcessPoolExecutor(workers) if executor is None else executor
+        # (algorithm, width, height, seed) to cells, least recently used first
+        self.cache = collections.OrderedDict()
+        self.cached_bytes = 0
+        # (algorithm, width, height, seed) to the future of its generation
+        self.pending = {}
+        self.stats = collections.Counter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # close waits for the generations still running, which must not hold
+        # up the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        """
+        Shuts down the worker processes. Generations still running are waited
+        for, but the service takes no new requests. This blocks; from a
+        coroutine, leave an `async with` block instead.
+        """
+        if self.owns_executor:
+            self.executor.shutdown()
+
+    def __check(self, algorithm, width, height, seed):
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise TypeError("seed must be an int, got %r" % (seed,))
+
+        if algorithm not in GENERATORS:
+            raise ValueError("Unknown algorithm %r, expected one of %s" % (algorithm,
+              ", ".join(sorted(GENERATORS))))
+
+        if width < 0 or height < 0 or (self.max_cells is not None and width * height > self.max_cells):
+            raise InvalidSizeException(width, height)
+
+    async def generate_packed(self, algorithm, width, height, seed):
+        """
+        Returns the cells of the maze generated by the algorithm named
+        algorithm (see ariadne.generators.GENERATORS) from the integer seed as
+        `bytes`, laid out as in `Maze.cells`. The same `bytes` is handed to
+        every request for that maze. seed has to be an int, for the cache to
+        tell mazes apart by it.
+
+        Cancelling a request does not cancel the generation, which still ends
+        up in the cache for whoever asks next.
+        """
+        self.__check(algorithm, width, height, seed)
+        key = (algorithm, width, height, seed)
+        cells = self.cache.get(key)
+
+        if cells is not None:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cells
+
+        future = self.pending.get(key)
+
+        if future is None:
+            self.stats["misses"] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, _generate, algorithm, width, height, seed)
+            future.add_done_callback(lambda done: self.__finish(key, done))
+            self.pending[key] = future
+        else:
+            self.stats["joined"] += 1
+
+        return await asyncio.shield(future)
+
+    async def generate(self, algorithm, width, height, seed=None):
+        """
+        Returns a new Maze as `generate_packed` would, with its `algorithm` and
+        `seed` filled in. A seed of None picks a random one.
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+
+        cells = await self.generate_packed(algorithm, width, height, seed)
+        maze = Maze.from_buffer(width, height, bytearray(cells))
+        maze.algorithm = GENERATORS[algorithm].__name__
+        maze.seed = seed
+        return maze
+
+    def __finish(self, key, future):
+        del self.pending[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        cells = future.result()
+
+        if len(cells) > self.cache_bytes:
+            return
+
+        self.cache[key] = cells
+        self.cached_bytes += len(cells)
+
+        while self.cached_bytes > self.cache_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= len(evicted)
+            self.stats["evictions"] += 1
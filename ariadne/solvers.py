@@ -0,0 +1,246 @@
+import functools
+import itertools
+
+from array import array
+
+from .mazes import MazeCellStates, get_moves, get_offsets
+
+"""
+Path finding over generated Mazes.
+
+The solvers work on flat cell indices (`row * width + col`, as in `Maze.cells`)
+and look the moves out of each cell up by its state in `get_moves`, trusting
+openings to stay within the maze (as they do for any Maze carved through
+`tear_down_wall` or `carve`). Paths are returned as an `array` of flat
+cell indices from start to end, both included; use `divmod(index, maze.width)`
+to get back (row, col).
+
+Breadth-first search and dead-end filling have compiled engines too, used
+through `Maze.speedups` when it is built; those check the openings.
+"""
+
+def trace_path(parents, start, end):
+    """
+    Follows parents back from end to start and returns the path from start to
+    end.
+    """
+    path = array("i", [end])
+
+    while end != start:
+        end = parents[end]
+        path.append(end)
+
+    path.reverse()
+    return path
+
+def bfs_path(cells, width, start, end, path):
+    """
+    Searches the maze with the given cells breadth first from the flat index
+    start, writes the path to end into path, an array("i") with an item per
+    cell, and returns its length, or -1 if end can't be reached.
+
+    The compiled engine has the same function, which has to give the same
+    results.
+    """
+    return _search(cells, width, start, end, path, array("i", [-1]) * len(cells))
+
+def _search(cells, width, start, end, path, parents):
+    # The search of bfs_path. Cells whose parent is not -1 are taken as
+    # reached already and never entered.
+    moves = get_moves(width)
+    parents[start] = start
+    queue = [start]
+    queue_append = queue.append
+
+    for current in queue:
+        if current == end:
+            found = trace_path(parents, start, end)
+            path[:len(found)] = found
+            return len(found)
+
+        for offset in moves[cells[current]]:
+            neighbor = current + offset
+
+            if parents[neighbor] == -1:
+                parents[neighbor] = current
+                queue_append(neighbor)
+
+    return -1
+
+# Number of openings for each cell state, as a translation table.
+DEGREES = bytes(bin(state & 0xf).count("1") for state in range(256))
+
+def dead_end_path(cells, width, start, end, path):
+    """
+    Fills in every dead end of the maze with the given cells, other than the
+    flat indices start and end, then writes the path left from start to end
+    into path and returns its length as `bfs_path` does.
+
+    The compiled engine has the same function, which has to give the same
+    results.
+    """
+    moves = get_moves(width)
+    degrees = bytearray(bytes(cells).translate(DEGREES))
+    filled = bytearray(len(cells))
+    dead_ends = [
+        index for index, degree in enumerate(degrees)
+        if degree <= 1 and index != start and index != end
+    ]
+
+    for dead_end in dead_ends:
+        filled[dead_end] = 1
+
+        for offset in moves[cells[dead_end]]:
+            neighbor = dead_end + offset
+
+            if filled[neighbor] or neighbor == start or neighbor == end:
+                continue
+
+            degree = degrees[neighbor] - 1
+            degrees[neighbor] = degree
+
+            if degree == 1:
+                dead_ends.append(neighbor)
+
+    # Search what is left, which in a maze with loops still holds them, with
+    # the filled cells marked as reached.
+    parents = array("i", [-1]) * len(cells)
+
+    for index in itertools.compress(range(len(filled)), filled):
+        parents[index] = index
+
+    return _search(cells, width, start, end, path, parents)
+
+def _find_path(engine, maze, start, end):
+    # Runs engine, pure or compiled, and cuts the path it wrote to length.
+    path = array("i", [0]) * len(maze.cells)
+    length = engine(maze.cells, maze.width, start, end, path)
+
+    if length == -1:
+        return None
+
+    del path[length:]
+    return path
+
+@functools.lru_cache(maxsize=64)
+def _astar_steps(width):
+    # Maps a cell state, ORed with the directions leading closer to the end
+    # shifted up a nibble (see _closer_plane), to the (index offset, further)
+    # of each of its openings. Taking a step adds 1 to the distance walked and
+    # takes 1 from the Manhattan distance left or adds 1 to it, so the estimate
+    # through the neighbor is that of the cell, or 2 more if further is set.
+    offsets = get_offsets(width)
+    return tuple(
+        tuple((offsets[direction], not key >> 4 & direction)
+          for direction in MazeCellStates.CARDINAL if key & direction)
+        for key in range(256)
+    )
+
+def _closer_plane(width, height, end):
+    # Returns a byte per cell holding the directions that lead closer to the
+    # flat index end, shifted up a nibble, built a row at a time.
+    end_row, end_col = divmod(end, width)
+    row = (bytes([MazeCellStates.OPEN_EAST << 4]) * end_col + b"\0"
+      + bytes([MazeCellStates.OPEN_WEST << 4]) * (width - end_col - 1))
+    south = bytes(key | MazeCellStates.OPEN_SOUTH << 4 for key in range(256))
+    north = bytes(key | MazeCellStates.OPEN_NORTH << 4 for key in range(256))
+    return row.translate(south) * end_row + row + row.translate(north) * (height - end_row - 1)
+
+
+class MazeSolver(object):
+
+    def solve(self, maze, start, end):
+        """
+        Returns the path from start to end, both given as (row, col) tuples, as
+        an array of flat cell indices. Returns None if end can't be reached.
+        """
+        width = maze.width
+        return self.solve_indices(maze, start[0] * width + start[1], end[0] * width + end[1])
+
+    def solve_indices(self, maze, start, end):
+        """
+        Like `solve` but start and end are flat cell indices.
+        """
+        raise NotImplementedError("Can't solve a Maze :C")
+
+
+class BreadthFirstSearch(MazeSolver):
+    """
+    Plain breadth-first search. Finds a shortest path in any maze, perfect or
+    not.
+    """
+
+    def solve_indices(self, maze, start, end):
+        return _find_path(bfs_path if maze.speedups is None else maze.speedups.bfs_path,
+          maze, start, end)
+
+
+class AStar(MazeSolver):
+    """
+    A* search guided by the Manhattan distance to the end, which never
+    overestimates in a grid maze, so the path found is a shortest one.
+
+    The estimate through a neighbor is either that of its cell or 2 more (see
+    `_astar_steps`), so instead of a heap the open cells are kept in two lists,
+    one for the estimate being expanded and one for the next, which keeps the
+    search as cheap per step as breadth-first search.
+    """
+
+    def solve_indices(self, maze, start, end):
+        cells = maze.cells
+        steps = _astar_steps(maze.width)
+        closer = _closer_plane(maze.width, maze.height, end)
+        parents = array("i", [-1]) * len(cells)
+        distances = array("i", [-1]) * len(cells)
+        expanded = bytearray(len(cells))
+        parents[start] = start
+        distances[start] = 0
+        frontier = [start]
+
+        while frontier:
+            frontier_append = frontier.append
+            later = []
+            later_append = later.append
+
+            for current in frontier:
+                if current == end:
+                    return trace_path(parents, start, end)
+
+                # A cell is added again when a shorter way to it is found; the
+                # first time it comes up is the shortest.
+                if expanded[current]:
+                    continue
+
+                expanded[current] = 1
+                distance = distances[current] + 1
+
+                for offset, further in steps[cells[current] | closer[current]]:
+                    neighbor = current + offset
+                    known = distances[neighbor]
+
+                    if known == -1 or distance < known:
+                        distances[neighbor] = distance
+                        parents[neighbor] = current
+
+                        if further:
+                            later_append(neighbor)
+                        else:
+                            frontier_append(neighbor)
+
+            frontier = later
+
+        return None
+
+
+class DeadEndFilling(MazeSolver):
+    """
+    Fills in every dead end, other than start and end, until none is left;
+    what stays unfilled is the solution. In a perfect maze that is the path
+    itself; in a maze with loops the loops stay too and the path is searched
+    for among what is left, so it need not be a shortest one.
+    """
+
+    def solve_indices(self, maze, start, end):
+        return _find_path(
+          dead_end_path if maze.speedups is None else maze.speedups.dead_end_path,
+          maze, start, end)
@@ -0,0 +1,75 @@
+from ..batch import generate_many, generate_packed, imap_generate_packed, process_pool
+from ..generators import Braided, RecursiveBacktracker, EllersAlgorithm, KruskalsAlgorithm
+from ..masks import ellipse
+from ..mazes import Maze
+
+import unittest
+
+class GenerateManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.seeds = list(range(10))
+        self.sizes = [(5 + seed, 3 + seed % 4) for seed in self.seeds]
+
+    def test_generate_packed(self):
+        generator = RecursiveBacktracker()
+        self.assertEqual(generator.generate(6, 4, 7).cells, generate_packed(generator, 6, 4, 7))
+
+    def test_in_process(self):
+        for generator in (RecursiveBacktracker(), EllersAlgorithm(), KruskalsAlgorithm()):
+            mazes = generate_many(generator, self.sizes, self.seeds, workers=1)
+            self.assertEqual(len(self.seeds), len(mazes))
+
+            for (width, height), seed, maze in zip(self.sizes, self.seeds, mazes):
+                self.assertIsInstance(maze, Maze)
+                self.assertEqual(generator.generate(width, height, seed), maze)
+
+    def test_workers(self):
+        generator = KruskalsAlgorithm()
+        sequential = generate_many(generator, self.sizes, self.seeds, workers=1)
+        parallel = generate_many(generator, self.sizes, self.seeds, workers=2, chunksize=3)
+        self.assertEqual(sequential, parallel)
+
+    def test_process_pool(self):
+        for task_count, chunksize, expected in ((100, None, 12), (3, None, 1), (10000, None, 64),
+          (10000, 5, 5)):
+            executor, worker_count, actual = process_pool(2, task_count, chunksize)
+
+            with executor:
+                self.assertEqual((2, expected), (worker_count, actual))
+
+    def test_single_size(self):
+        packed = list(imap_generate_packed(EllersAlgorithm(), (4, 3), self.seeds, workers=1))
+        self.assertEqual(len(self.seeds), len(packed))
+
+        for width, height, cells in packed:
+            self.assertEqual((4, 3), (width, height))
+            self.assertEqual(12, len(cells))
+
+    def test_masked(self):
+        width, height, mask = ellipse(11, 7)
+        generator = KruskalsAlgorithm()
+        mazes = generate_many(generator, (width, height), self.seeds, workers=2, mask=mask)
+
+        for seed, maze in zip(self.seeds, mazes):
+            self.assertEqual(mask, maze.mask)
+            self.assertEqual(generator.generate(width, height, seed, mask), maze)
+
+    def test_braided(self):
+        # The mazes are tagged as generate() tags them, after the inner generator.
+        generator = Braided(KruskalsAlgorithm(), 0.5)
+
+        for workers in (1, 2):
+            for seed, maze in zip(self.seeds, generate_many(generator, self.sizes, self.seeds,
+              workers=workers)):
+                expected = generator.generate(maze.width, maze.height, seed)
+                self.assertEqual(expected, maze)
+                self.assertEqual(("KruskalsAlgorithm", seed), (maze.algorithm, maze.seed))
+                self.assertEqual(expected.algorithm, maze.algorithm)
+
+    def test_mismatched_sizes(self):
+        self.assertRaises(ValueError, generate_many, EllersAlgorithm(), self.sizes[1:],
+          self.seeds, workers=1)
+
+if __name__ == "__main__":
+    unittest.main()
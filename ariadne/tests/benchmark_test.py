@@ -0,0 +1,67 @@
+from ..benchmark import (DEFAULT_SIZES, GENERATORS, IMPORT_STATEMENT, compare, default_sizes, main,
+  measure, measure_import, parse_size, run)
+from ..generators import EllersAlgorithm
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_measure(self):
+        result = measure(EllersAlgorithm(), 12, 5, repeat=2)
+        self.assertEqual("EllersAlgorithm", result["generator"])
+        self.assertEqual(60, result["cells"])
+        self.assertGreater(result["seconds"], 0)
+        self.assertGreater(result["peak_bytes"], 0)
+
+    def test_run(self):
+        reported = []
+        current = run(sizes=[(4, 4), (8, 3)], repeat=1, report=reported.append)
+        self.assertEqual(2 * len(GENERATORS), len(current["results"]))
+        self.assertEqual(current["results"], reported)
+        json.dumps(current)
+
+    def test_compare(self):
+        baseline = run(["KruskalsAlgorithm"], sizes=[(6, 6)], repeat=1)
+        current = json.loads(json.dumps(baseline))
+        self.assertEqual([], compare(baseline, current))
+
+        current["results"][0]["seconds"] = baseline["results"][0]["seconds"] * 2
+        self.assertEqual([("KruskalsAlgorithm", 6, 6, "seconds", baseline["results"][0]["seconds"],
+          current["results"][0]["seconds"])], compare(baseline, current))
+        self.assertEqual([], compare(baseline, current, threshold=1.5))
+
+    def test_measure_import(self):
+        result = measure_import(repeat=1)
+        self.assertEqual(IMPORT_STATEMENT, result["statement"])
+        self.assertGreater(result["seconds"], 0)
+        self.assertGreater(result["modules"], 0)
+
+        self.assertEqual(0, main(["--import-time", "--repeat", "1", "--import-budget", "1000"]))
+        self.assertEqual(1, main(["--import-time", "--repeat", "1", "--import-budget", "0"]))
+
+    def test_default_sizes(self):
+        self.assertEqual(DEFAULT_SIZES, default_sizes("RecursiveBacktracker"))
+        self.assertTrue(default_sizes("AldousBroder"))
+        self.assertLess(len(default_sizes("AldousBroder")), len(DEFAULT_SIZES))
+
+    def test_parse_size(self):
+        self.assertEqual((30, 20), parse_size("30x20"))
+        self.assertEqual((16, 16), parse_size("16"))
+
+    def test_main(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            output = os.path.join(tempdir, "run.json")
+            self.assertEqual(0, main(["EllersAlgorithm", "--sizes", "5x5", "--repeat", "1",
+              "--output", output]))
+            self.assertEqual(0, main(["EllersAlgorithm", "--sizes", "5x5", "--repeat", "1",
+              "--compare", output, "--threshold", "1000"]))
+        finally:
+            shutil.rmtree(tempdir)
+
+if __name__ == "__main__":
+    unittest.main()
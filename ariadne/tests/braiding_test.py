@@ -0,0 +1,76 @@
+from ..braiding import braid, dead_ends
+from ..generators import KruskalsAlgorithm, RecursiveBacktracker
+from ..masks import ellipse
+from ..mazes import Maze, MazeCellStates
+from ..validation import has_closed_border, has_symmetric_walls, is_connected, opens_into_mask
+
+import unittest
+
+class BraidingTest(unittest.TestCase):
+
+    def assertSound(self, maze):
+        self.assertTrue(has_closed_border(maze))
+        self.assertTrue(has_symmetric_walls(maze))
+        self.assertFalse(opens_into_mask(maze))
+
+    def test_dead_ends(self):
+        maze = Maze(3, 1)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(0, 1, MazeCellStates.OPEN_EAST)
+        self.assertEqual([0, 2], list(dead_ends(maze)))
+        self.assertEqual([], list(dead_ends(Maze(2, 2))))
+
+    def test_braid_all(self):
+        maze = KruskalsAlgorithm().generate(30, 20, 4)
+        before = len(dead_ends(maze))
+        self.assertEqual(before, braid(maze, 1.0, 4))
+        self.assertEqual([], list(dead_ends(maze)))
+        self.assertSound(maze)
+        self.assertTrue(is_connected(maze))
+
+    def test_braid_fraction(self):
+        generator = RecursiveBacktracker()
+        self.assertEqual(0, braid(generator.generate(30, 20, 4), 0.0, 4))
+
+        half = generator.generate(30, 20, 4)
+        before = len(dead_ends(half))
+        removed = braid(half, 0.5, 4)
+        self.assertSound(half)
+        self.assertTrue(0 < removed < before)
+        self.assertEqual(before - removed, len(dead_ends(half)))
+
+        # A higher fraction opens every wall a lower one did.
+        more = generator.generate(30, 20, 4)
+        braid(more, 0.8, 4)
+
+        for half_cell, more_cell in zip(half.cells, more.cells):
+            self.assertEqual(half_cell, half_cell & more_cell)
+
+        self.assertRaises(ValueError, braid, half, 1.5)
+
+    def test_braid_deterministic(self):
+        mazes = [RecursiveBacktracker().generate(15, 15, 2) for _ in range(2)]
+
+        for maze in mazes:
+            braid(maze, 0.5, 9)
+
+        self.assertEqual(mazes[0], mazes[1])
+
+    def test_braid_masked(self):
+        width, height, mask = ellipse(25, 15)
+        maze = RecursiveBacktracker().generate(width, height, 6, mask)
+        braid(maze, 1.0, 6)
+        self.assertSound(maze)
+
+    def test_corridor(self):
+        # Both ends of a corridor only have border walls left to open.
+        corridor = RecursiveBacktracker().generate(5, 1, 1)
+        self.assertEqual(0, braid(corridor, 1.0, 1))
+        self.assertEqual([0, 4], list(dead_ends(corridor)))
+
+    def test_empty(self):
+        for width, height in ((5, 0), (0, 5)):
+            self.assertEqual(0, braid(Maze(width, height)))
+
+if __name__ == "__main__":
+    unittest.main()
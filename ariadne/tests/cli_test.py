@@ -0,0 +1,115 @@
+from ..cli import main, maze_size, parse_seeds, parse_size
+from ..generators import Braided, GrowingTree, KruskalsAlgorithm, Sidewinder
+from ..rendering import write_pbm
+from ..serialization import loads
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, *argv):
+        stdout = io.BytesIO()
+        self.assertEqual(0, main(list(argv) + ["--workers", "1"], stdout))
+        return stdout.getvalue()
+
+    def test_parsing(self):
+        self.assertEqual(((5, 5), (7, 7)), parse_size("5x7"))
+        self.assertEqual(((5, 5), (5, 5)), parse_size("5"))
+        self.assertEqual(((2, 9), (3, 3)), parse_size("2-9x3"))
+        self.assertEqual([1, 4, 5, 6], parse_seeds("1,4-6"))
+        self.assertRaises(ValueError, parse_seeds, "6-4")
+        self.assertEqual([-5, -3, -2, -1, 0, 1], parse_seeds("-5,-3--1,0-1"))
+        self.assertRaises(ValueError, parse_seeds, "1--2")
+
+    def test_maze_size(self):
+        self.assertEqual((5, 7), maze_size(parse_size("5x7"), 3))
+        size = parse_size("2-9x3-4")
+        sizes = [maze_size(size, seed) for seed in range(50)]
+        self.assertEqual(sizes, [maze_size(size, seed) for seed in range(50)])
+
+        for width, height in sizes:
+            self.assertTrue(2 <= width <= 9 and 3 <= height <= 4)
+
+    def test_ascii(self):
+        output = self.run_main("KruskalsAlgorithm", "--size", "4x3", "--seed", "7")
+        self.assertEqual(str(KruskalsAlgorithm().generate(4, 3, 7)) + "\n", output.decode("ascii"))
+
+        output = self.run_main("KruskalsAlgorithm", "--size", "4x3", "--seed", "7", "--count", "3")
+        self.assertEqual(3, output.count(b"\n\n") + 1)
+
+        output = self.run_main("KruskalsAlgorithm", "--size", "4x3", "--seed", "-5")
+        self.assertEqual(str(KruskalsAlgorithm().generate(4, 3, -5)) + "\n", output.decode("ascii"))
+
+    def test_negative_seeds(self):
+        expected = "\n\n".join(str(KruskalsAlgorithm().generate(4, 3, seed)) for seed in (-3, -2, -1))
+
+        for seeds in (["--seed", "-3--1"], ["--seed=-3--1"], ["--seed", "-3,-2,-1"]):
+            output = self.run_main("KruskalsAlgorithm", "--size", "4x3", *seeds)
+            self.assertEqual(expected + "\n", output.decode("ascii"))
+
+    def test_binary(self):
+        output = self.run_main("Sidewinder", "--size", "6x5", "--seed", "2", "--format", "binary")
+        maze = loads(output)
+        self.assertEqual(Sidewinder().generate(6, 5, 2), maze)
+        self.assertEqual(("Sidewinder", 2), (maze.algorithm, maze.seed))
+
+    def test_selector(self):
+        output = self.run_main("GrowingTree", "--selector", "oldest", "--size", "5", "--seed", "1",
+          "--format", "pbm")
+        expected = io.BytesIO()
+        write_pbm(GrowingTree("oldest").generate(5, 5, 1), expected)
+        self.assertEqual(expected.getvalue(), output)
+
+    def test_mask(self):
+        path = os.path.join(self.directory, "mask.pbm")
+
+        with open(path, "wb") as fileobj:
+            fileobj.write(b"P1\n4 3\n1 1 0 1\n1 1 1 1\n0 1 1 1\n")
+
+        output = self.run_main("Sidewinder", "--mask", path, "--seed", "3", "--format", "binary")
+        maze = Sidewinder().generate(4, 3, 3, b"\1\1\0\1\1\1\1\1\0\1\1\1")
+        self.assertEqual(maze, loads(output))
+
+    def test_braid(self):
+        output = self.run_main("Sidewinder", "--braid", "0.5", "--size", "6x5", "--seed", "4",
+          "--format", "binary")
+        self.assertEqual(Braided(Sidewinder(), 0.5).generate(6, 5, 4), loads(output))
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, main, ["Sidewinder", "--braid", "2"], io.BytesIO())
+
+    def test_output(self):
+        self.run_main("EllersAlgorithm", "--size", "3-5x4", "--seed", "1-4", "--format", "binary",
+          "--output", self.directory)
+        names = sorted(os.listdir(self.directory))
+        self.assertEqual(4, len(names))
+
+        for name in names:
+            with open(os.path.join(self.directory, name), "rb") as fileobj:
+                maze = loads(fileobj.read())
+            self.assertEqual("%s_%dx%d_%d.maze" % (maze.algorithm, maze.width, maze.height, maze.seed),
+              name)
+
+    def test_png(self):
+        self.run_main("BinaryTree", "--count", "2", "--seed", "5", "--format", "png",
+          "--output", self.directory)
+        self.assertEqual(["BinaryTree_20x20_5.png", "BinaryTree_20x20_6.png"],
+          sorted(os.listdir(self.directory)))
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, main, ["BinaryTree", "--count", "2", "--format", "png"],
+              io.BytesIO())
+            self.assertRaises(SystemExit, main, ["BinaryTree", "--count", "2", "--seed", "1,2"],
+              io.BytesIO())
+            self.assertRaises(SystemExit, main, ["Nope"], io.BytesIO())
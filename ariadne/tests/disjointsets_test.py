@@ -0,0 +1,48 @@
+from ..disjointsets import DisjointSets
+
+import unittest
+
+class DisjointSetsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sets = DisjointSets(8)
+
+    def test_initial(self):
+        self.assertEqual(8, len(self.sets))
+        self.assertEqual(8, self.sets.count)
+
+        for element in range(8):
+            self.assertEqual(element, self.sets.find(element))
+
+    def test_union(self):
+        self.assertTrue(self.sets.union(0, 1))
+        self.assertTrue(self.sets.union(2, 3))
+        self.assertFalse(self.sets.union(1, 0))
+        self.assertEqual(6, self.sets.count)
+
+        self.assertTrue(self.sets.connected(0, 1))
+        self.assertTrue(self.sets.connected(3, 2))
+        self.assertFalse(self.sets.connected(0, 2))
+
+        self.assertTrue(self.sets.union(1, 3))
+        self.assertTrue(self.sets.connected(0, 2))
+        self.assertFalse(self.sets.union(0, 3))
+        self.assertEqual(5, self.sets.count)
+
+        for element in range(4, 8):
+            self.assertFalse(self.sets.connected(0, element))
+
+    def test_path_compression(self):
+        for element in range(1, 8):
+            self.sets.union(element - 1, element)
+
+        root = self.sets.find(7)
+
+        for element in range(8):
+            self.assertEqual(root, self.sets.find(element))
+            self.assertEqual(root, self.sets.parents[element])
+
+        self.assertEqual(1, self.sets.count)
+
+if __name__ == "__main__":
+    unittest.main()
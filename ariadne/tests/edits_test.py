@@ -0,0 +1,76 @@
+from ..edits import MazePatch, diff
+from ..errors import InvalidMazeFileException, InvalidSizeException
+from ..generators import KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates
+
+import pickle
+import unittest
+
+class EditsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.maze = KruskalsAlgorithm().generate(40, 30, 7)
+        self.copy = pickle.loads(pickle.dumps(self.maze))
+
+    def edit(self, maze):
+        maze.build_wall(3, 4, MazeCellStates.OPEN_NORTH_EAST_SOUTH_WEST)
+        maze.tear_down_wall(3, 4, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(29, 39, MazeCellStates.OPEN_NORTH_WEST)
+        maze.build_wall(15, 0, MazeCellStates.OPEN_SOUTH)
+
+    def test_diff(self):
+        self.assertEqual([], diff(self.copy, self.maze).runs)
+
+        self.edit(self.maze)
+        patch = diff(self.copy, self.maze)
+        self.assertLess(len(patch), 10)
+        changed = [index for index in range(len(self.maze.cells))
+          if self.maze.cells[index] != self.copy.cells[index]]
+        self.assertTrue(set(changed) <= set(patch.changed_indices()))
+
+        patch.apply(self.copy)
+        self.assertEqual(self.maze, self.copy)
+        self.assertRaises(InvalidSizeException, patch.apply, Maze(3, 3))
+        self.assertRaises(InvalidSizeException, diff, self.maze, Maze(3, 3))
+
+    def test_journal(self):
+        journal = self.maze.start_journal()
+        self.edit(self.maze)
+        self.maze.stop_journal()
+
+        self.assertEqual(diff(self.copy, self.maze), journal.patch())
+        journal.patch().apply(self.copy)
+        self.assertEqual(self.maze, self.copy)
+
+        edited = bytes(self.maze.cells)
+        journal.undo()
+        self.assertEqual(0, len(journal))
+        self.assertEqual(KruskalsAlgorithm().generate(40, 30, 7), self.maze)
+
+        MazePatch.from_indices(self.copy, range(len(edited))).apply(self.maze)
+        self.assertEqual(edited, bytes(self.maze.cells))
+
+    def test_patch_journal(self):
+        self.edit(self.maze)
+        patch = diff(self.copy, self.maze)
+        journal = self.copy.start_journal()
+        patch.apply(self.copy)
+        self.assertEqual(patch, journal.patch())
+
+    def test_serialization(self):
+        self.edit(self.maze)
+        patch = diff(self.copy, self.maze)
+        data = patch.dumps()
+        self.assertEqual(patch, MazePatch.loads(data))
+        self.assertLess(len(data), 100)
+
+        self.assertRaises(InvalidMazeFileException, MazePatch.loads, b"ARDP")
+        self.assertRaises(InvalidMazeFileException, MazePatch.loads, b"XXXX" + data[4:])
+        self.assertRaises(InvalidMazeFileException, MazePatch.loads, data[:-1])
+        self.assertRaises(InvalidMazeFileException, MazePatch.loads, data + b"\0")
+
+    def test_regions(self):
+        patch = MazePatch(5, 4, [(3, b"\1\2\3\4\5\6\7\1"), (19, b"\2")])
+        self.assertEqual([(0, 3, b"\1\2"), (1, 0, b"\3\4\5\6\7"), (2, 0, b"\1"), (3, 4, b"\2")],
+          list(patch.regions()))
+        self.assertEqual(9, len(patch))
@@ -1,14 +1,21 @@
 from ..mazes import Maze, MazeCellStates
-from ..generators import RecursiveBacktracker, EllersAlgorithm, KruskalsAlgorithm
-
+from ..generators import (RecursiveBacktracker, EllersAlgorithm, KruskalsAlgorithm, BinaryTree,
+  Sidewinder, AldousBroder, WilsonsAlgorithm, GrowingTree, Braided)
+from ..braiding import dead_ends
+from ..masks import ellipse, from_lines
+from ..validation import is_connected, is_perfect, validate
+
+import itertools
+import random
 import unittest
+import zlib
 
 class RecursiveBacktrackerTest(unittest.TestCase):
     """
     Some shallow tests for the generator.
 
-    Just makes sure that all cells have been carved and that the generated maze
-    is up to spec.
+    Just makes sure that the generated maze is up to spec, i.e. a perfect maze
+    as checked by ariadne.validation.
 
     # Using this as master class for testing other generators.
 
@@ -24,73 +31,184 @@ class RecursiveBacktrackerTest(unittest.TestCase):
         print(gen_maze)
 
         self.assertEqual(100, len(gen_maze.maze))
-
-        for row in gen_maze.maze:
-            self.assertEqual(100, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+        self.assertEqual(100, len(gen_maze.maze[0]))
+        validate(gen_maze)
 
         gen_maze = self.generator.generate(2, 3)
 
         self.assertEqual(3, len(gen_maze.maze))
+        self.assertEqual(2, len(gen_maze.maze[0]))
+        validate(gen_maze)
+
+        for width, height in ((37, 13), (5, 41), (64, 64)):
+            validate(self.generator.generate(width, height))
+
+    def test_deterministic(self):
+        maze = self.generator.generate(23, 19, 1234)
+        self.assertEqual(1234, maze.seed)
+        self.assertEqual(maze, self.generator.generate(23, 19, 1234))
+        self.assertEqual(maze, self.generator.generate(23, 19, random.Random(1234)))
+        self.assertNotEqual(maze, self.generator.generate(23, 19, 4321))
+
+        random.seed(1234)
+        maze = self.generator.generate(23, 19)
+        random.seed(1234)
+        self.assertEqual(maze, self.generator.generate(23, 19))
+
+    def test_generate_thin(self):
+        self.assertEqual(Maze(1, 1), self.generator.generate(1, 1))
 
-        for row in gen_maze.maze:
-            self.assertEqual(2, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+        corridor = self.generator.generate(1, 4)
+        self.assertEqual([MazeCellStates.OPEN_SOUTH, MazeCellStates.OPEN_NORTH_SOUTH,
+          MazeCellStates.OPEN_NORTH_SOUTH, MazeCellStates.OPEN_NORTH], list(corridor.cells))
 
-        self.assertEqual(len(gen_maze.maze), 3)
+        corridor = self.generator.generate(4, 1)
+        self.assertEqual([MazeCellStates.OPEN_EAST, MazeCellStates.OPEN_EAST_WEST,
+          MazeCellStates.OPEN_EAST_WEST, MazeCellStates.OPEN_WEST], list(corridor.cells))
 
+    def test_generate_masked(self):
+        # Two regions, one of them a single cell, and a hole.
+        masks = [ellipse(31, 17), from_lines(["xx.xxx", "xx.x.x", "...xxx", "x....x"])]
 
-class EllersAlgorithmTest(unittest.TestCase):
+        for width, height, mask in masks:
+            for seed in range(5):
+                maze = self.generator.generate(width, height, seed, mask)
+                self.assertEqual(mask, maze.mask)
+                validate(maze)
+
+            self.assertEqual(maze, self.generator.generate(width, height, 4, mask))
+
+
+class EllersAlgorithmTest(RecursiveBacktrackerTest):
 
     def setUp(self):
         self.generator = EllersAlgorithm()
-    
-    def test_generate(self):
-        gen_maze = self.generator.generate(100, 100)
 
-        self.assertEqual(100, len(gen_maze.maze))
+    def test_generate_rows(self):
+        rows = list(self.generator.generate_rows(7, 5))
+        self.assertEqual(5, len(rows))
 
-        for row in gen_maze.maze:
-            self.assertEqual(100, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+        for row in rows:
+            self.assertEqual(7, len(row))
 
-        gen_maze = self.generator.generate(2, 3)
+        # Nothing opens to the north on the first row nor to the south on the
+        # last one.
+        for cell in rows[0]:
+            self.assertFalse(cell & MazeCellStates.OPEN_NORTH)
+        for cell in rows[-1]:
+            self.assertFalse(cell & MazeCellStates.OPEN_SOUTH)
 
-        self.assertEqual(3, len(gen_maze.maze))
+        random.seed(42)
+        rows = b"".join(self.generator.generate_rows(7, 5))
+        random.seed(42)
+        self.assertEqual(rows, self.generator.generate(7, 5).cells)
 
-        for row in gen_maze.maze:
-            self.assertEqual(2, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+    def test_generate_rows_unbounded(self):
+        rows = list(itertools.islice(self.generator.generate_rows(6), 200))
+        self.assertEqual(200, len(rows))
 
-        self.assertEqual(len(gen_maze.maze), 3)
+        for above, below in zip(rows, rows[1:]):
+            for north_cell, south_cell in zip(above, below):
+                self.assertEqual(bool(north_cell & MazeCellStates.OPEN_SOUTH),
+                  bool(south_cell & MazeCellStates.OPEN_NORTH))
 
 
-class KruskalsAlgorithmTest(unittest.TestCase):
+class KruskalsAlgorithmTest(RecursiveBacktrackerTest):
 
     def setUp(self):
         self.generator = KruskalsAlgorithm()
-    
-    def test_generate(self):
-        gen_maze = self.generator.generate(100, 100)
 
-        self.assertEqual(100, len(gen_maze.maze))
 
-        for row in gen_maze.maze:
-            self.assertEqual(100, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+class BinaryTreeTest(EllersAlgorithmTest):
 
-        gen_maze = self.generator.generate(2, 3)
+    def setUp(self):
+        self.generator = BinaryTree()
+
+    def test_bias(self):
+        maze = self.generator.generate(9, 6, 3)
+
+        for cell in maze.maze[0][1:]:
+            self.assertTrue(cell & MazeCellStates.OPEN_WEST)
+        for row in maze.maze[1:]:
+            self.assertTrue(row[0] & MazeCellStates.OPEN_NORTH)
 
-        self.assertEqual(3, len(gen_maze.maze))
 
-        for row in gen_maze.maze:
-            self.assertEqual(2, len(row))
-            for cell in row:
-                self.assertNotEqual(cell, MazeCellStates.NO_OPEN)
+class SidewinderTest(EllersAlgorithmTest):
+
+    def setUp(self):
+        self.generator = Sidewinder()
+
+    def test_first_row(self):
+        maze = self.generator.generate(9, 6, 3)
+        self.assertEqual([MazeCellStates.OPEN_EAST_WEST] * 7,
+          [cell & MazeCellStates.OPEN_EAST_WEST for cell in maze.maze[0][1:-1]])
+
+
+class AldousBroderTest(RecursiveBacktrackerTest):
+
+    def setUp(self):
+        self.generator = AldousBroder()
+
+
+class WilsonsAlgorithmTest(RecursiveBacktrackerTest):
+
+    def setUp(self):
+        self.generator = WilsonsAlgorithm()
+
+
+class GrowingTreeTest(RecursiveBacktrackerTest):
+
+    def setUp(self):
+        self.generator = GrowingTree()
+
+    def test_selectors(self):
+        for selector in sorted(GrowingTree.SELECTORS):
+            validate(GrowingTree(selector).generate(23, 17, 5))
+
+        # Newest half the time, random otherwise.
+        def mixed(count, rng):
+            return count - 1 if rng.getrandbits(1) else rng.randrange(count)
+
+        validate(GrowingTree(mixed).generate(23, 17, 5))
+        self.assertRaises(ValueError, GrowingTree, "fastest")
+
+
+class BraidedTest(unittest.TestCase):
+
+    def test_generate(self):
+        generator = Braided(KruskalsAlgorithm(), 0.5)
+        maze = generator.generate(20, 15, 8)
+        self.assertEqual(("KruskalsAlgorithm", 8), (maze.algorithm, maze.seed))
+        self.assertEqual("KruskalsAlgorithm", generator.algorithm)
+        self.assertEqual(maze, generator.generate(20, 15, 8))
+        self.assertTrue(is_connected(maze))
+        self.assertFalse(is_perfect(maze))
+
+        perfect = KruskalsAlgorithm().generate(20, 15, 8)
+        self.assertEqual(perfect, Braided(KruskalsAlgorithm(), 0.0).generate(20, 15, 8))
+        self.assertLess(len(dead_ends(maze)), len(dead_ends(perfect)))
+        self.assertEqual([], list(dead_ends(Braided(EllersAlgorithm()).generate(20, 15, 8))))
+        self.assertRaises(ValueError, Braided, KruskalsAlgorithm(), -0.5)
+
+
+class SeedTest(unittest.TestCase):
+    """
+    A seed has to give the same maze from one run, machine or engine to the
+    next. Changing any of these checksums changes the mazes every seed gives.
+    """
 
-        self.assertEqual(len(gen_maze.maze), 3)
+    CHECKSUMS = {
+        RecursiveBacktracker: 0xafd1116b,
+        EllersAlgorithm: 0xaa4902b5,
+        KruskalsAlgorithm: 0x81d837aa,
+        BinaryTree: 0xb6dabb07,
+        Sidewinder: 0x32c14fe6,
+        AldousBroder: 0x1fbcba51,
+        WilsonsAlgorithm: 0x9bbadd1b,
+        GrowingTree: 0xa8eb4ddb,
+    }
+
+    def test_checksums(self):
+        for generator_class, checksum in self.CHECKSUMS.items():
+            maze = generator_class().generate(31, 17, 2014)
+            self.assertEqual(checksum, zlib.crc32(maze.cells), generator_class.__name__)
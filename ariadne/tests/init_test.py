@@ -0,0 +1,44 @@
+import ariadne
+import ariadne.generators
+
+import os
+import subprocess
+import sys
+import unittest
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def loaded_modules(statement):
+    """
+    Returns the names of the modules loaded by statement in a fresh
+    interpreter.
+    """
+    script = "import sys\nbefore = set(sys.modules)\n%s\nprint(' '.join(set(sys.modules) - before))"
+    return set(subprocess.run([sys.executable, "-c", script % statement], cwd=PACKAGE_ROOT,
+      stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.split())
+
+class InitTest(unittest.TestCase):
+
+    def test_api(self):
+        for name in ariadne.__all__:
+            module = getattr(ariadne, ariadne._API[name])
+            self.assertIs(getattr(module, name), getattr(ariadne, name))
+
+        self.assertIs(ariadne.generators.RecursiveBacktracker, ariadne.RecursiveBacktracker)
+        self.assertIn("Maze", dir(ariadne))
+        self.assertIn("solvers", dir(ariadne))
+        self.assertRaises(AttributeError, getattr, ariadne, "Minotaur")
+
+    def test_lazy(self):
+        self.assertEqual(set(), {name for name in loaded_modules("import ariadne")
+          if name.startswith("ariadne.")})
+
+        loaded = loaded_modules("from ariadne import Maze, RecursiveBacktracker")
+        self.assertIn("ariadne.generators", loaded)
+
+        for heavy in ("ariadne.solvers", "ariadne.rendering", "ariadne.service", "asyncio",
+          "concurrent.futures", "json"):
+            self.assertNotIn(heavy, loaded)
+
+if __name__ == "__main__":
+    unittest.main()
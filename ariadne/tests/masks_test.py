@@ -0,0 +1,62 @@
+from ..errors import InvalidMazeFileException
+from ..generators import EllersAlgorithm, RecursiveBacktracker
+from ..masks import connect_regions, ellipse, from_lines, from_pbm, mask_regions
+from ..mazes import Maze
+from ..validation import validate
+
+import random
+import unittest
+
+class MasksTest(unittest.TestCase):
+
+    def test_from_lines(self):
+        self.assertEqual((3, 2, b"\1\0\1\0\1\0"), from_lines(["x.x", " x"]))
+        self.assertEqual((2, 1, b"\0\1"), from_lines(["-#"], masked="-"))
+        self.assertEqual((0, 0, b""), from_lines([]))
+
+    def test_ellipse(self):
+        width, height, mask = ellipse(5, 5)
+        self.assertEqual((5, 5), (width, height))
+        self.assertEqual(b"\0\1\1\1\0" b"\1\1\1\1\1" b"\1\1\1\1\1" b"\1\1\1\1\1" b"\0\1\1\1\0", mask)
+
+        # Symmetric both ways.
+        width, height, mask = ellipse(12, 7)
+        rows = [mask[row * width:(row + 1) * width] for row in range(height)]
+        self.assertEqual(rows, rows[::-1])
+        self.assertEqual(rows, [row[::-1] for row in rows])
+
+    def test_from_pbm(self):
+        expected = (3, 2, b"\1\0\1\0\1\1")
+        self.assertEqual(expected, from_pbm(b"P1\n# a comment\n3 2\n1 0 1\n0 1 1\n"))
+        self.assertEqual(expected, from_pbm(b"P1 3 2 101011"))
+        self.assertEqual(expected, from_pbm(b"P4\n3 2\n\xa0\x60"))
+
+        self.assertRaises(InvalidMazeFileException, from_pbm, b"P2\n3 2\n")
+        self.assertRaises(InvalidMazeFileException, from_pbm, b"P1\n3 x\n")
+        self.assertRaises(InvalidMazeFileException, from_pbm, b"P1\n3 2\n1 0 1\n")
+        self.assertRaises(InvalidMazeFileException, from_pbm, b"P4\n3 2\n\xa0")
+
+    def test_mask_regions(self):
+        width, height, mask = from_lines(["xx.x", "...x", "x.xx"])
+        regions = mask_regions(Maze(width, height, mask=mask))
+        self.assertEqual([[0, 1], [3, 7, 10, 11], [8]], [sorted(region) for region in regions])
+        self.assertEqual([list(range(6))], [sorted(region) for region in mask_regions(Maze(3, 2))])
+        self.assertEqual([], mask_regions(Maze(5, 0)))
+
+    def test_connect_regions(self):
+        width, height, mask = from_lines(["xxxx.xxx", "x..x.x.x", "xxxx.xxx", "...xxx.."])
+
+        for seed in range(10):
+            maze = RecursiveBacktracker().generate(width, height, seed)
+            maze.mask = mask
+            connect_regions(maze, random.Random(seed))
+            validate(maze)
+
+    def test_generate_rows_masked(self):
+        width, height, mask = ellipse(15, 9)
+        maze = EllersAlgorithm().generate(width, height, 3, mask)
+        self.assertEqual(mask, maze.mask)
+        validate(maze)
+
+if __name__ == "__main__":
+    unittest.main()
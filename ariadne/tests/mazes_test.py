@@ -1,6 +1,8 @@
 from ..errors import CantTearWallException, InvalidSizeException
-from ..mazes import Maze, MazeCellStates
+from ..generators import KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates, get_moves, get_offsets, get_openings
 
+import pickle
 import unittest
 
 class MazeTest(unittest.TestCase):
@@ -37,6 +39,102 @@ class MazeTest(unittest.TestCase):
         self.assertRaises(CantTearWallException, self.test_maze4.tear_down_wall, 1, 0,
           MazeCellStates.OPEN_WEST)
 
+    def test_border_walls(self):
+        self.assertEqual(bytes([
+            MazeCellStates.OPEN_NORTH_WEST, MazeCellStates.OPEN_NORTH, MazeCellStates.OPEN_NORTH,
+              MazeCellStates.OPEN_NORTH_EAST,
+            MazeCellStates.OPEN_WEST, MazeCellStates.NO_OPEN, MazeCellStates.NO_OPEN,
+              MazeCellStates.OPEN_EAST,
+            MazeCellStates.OPEN_SOUTH_WEST, MazeCellStates.OPEN_SOUTH, MazeCellStates.OPEN_SOUTH,
+              MazeCellStates.OPEN_SOUTH_EAST,
+        ]), self.rect_maze.border_walls)
+        self.assertEqual(bytes([MazeCellStates.OPEN_NORTH_EAST_SOUTH_WEST]), Maze(1, 1).border_walls)
+        self.assertEqual(b"", Maze(5, 0).border_walls)
+        self.assertEqual(b"", Maze(0, 5).border_walls)
+
+    def test_mask(self):
+        maze = Maze(3, 3, mask=b"\1\1\1\1\0\1\1\1\7")
+        self.assertEqual(b"\1\1\1\1\0\1\1\1\1", maze.mask)
+        self.assertEqual(MazeCellStates.OPEN_NORTH_EAST_SOUTH_WEST, maze.border_walls[4])
+        self.assertEqual(MazeCellStates.OPEN_NORTH_SOUTH, maze.border_walls[1])
+        self.assertEqual(MazeCellStates.OPEN_EAST_WEST, maze.border_walls[3])
+        self.assertEqual({(0, 0), (2, 0)}, maze.get_adjacent(1, 0))
+        self.assertRaises(CantTearWallException, maze.tear_down_wall, 0, 1, MazeCellStates.OPEN_SOUTH)
+
+        unpickled = pickle.loads(pickle.dumps(maze))
+        self.assertEqual(maze.mask, unpickled.mask)
+
+        maze.mask = None
+        self.assertEqual(MazeCellStates.NO_OPEN, maze.border_walls[4])
+        self.assertEqual({(0, 0), (1, 1), (2, 0)}, maze.get_adjacent(1, 0))
+        self.assertIsNone(pickle.loads(pickle.dumps(maze)).mask)
+        self.assertRaises(InvalidSizeException, Maze, 3, 3, mask=b"\1")
+
+    def test_carve(self):
+        self.test_maze4.tear_down_wall(2, 2, MazeCellStates.OPEN_WEST)
+        self.test_maze4.tear_down_wall(2, 2, MazeCellStates.OPEN_SOUTH)
+        self.test_maze4.tear_down_wall(0, 0, MazeCellStates.OPEN_SOUTH_EAST)
+
+        carved = Maze(4, 4)
+        carved.carve([10, 0], bytearray([MazeCellStates.OPEN_SOUTH_WEST,
+          MazeCellStates.OPEN_SOUTH_EAST]))
+        self.assertEqual(self.test_maze4, carved)
+
+        edges = Maze(4, 4)
+        edges.tear_down_walls([(2, 2, MazeCellStates.OPEN_WEST), (0, 0, MazeCellStates.OPEN_EAST),
+          (2, 2, MazeCellStates.OPEN_SOUTH), (1, 0, MazeCellStates.OPEN_NORTH)])
+        self.assertEqual(self.test_maze4, edges)
+
+    def test_build_wall(self):
+        self.test_maze4.tear_down_wall(2, 2, MazeCellStates.OPEN_NORTH_EAST_SOUTH_WEST)
+        self.test_maze4.build_wall(2, 2, MazeCellStates.OPEN_NORTH_WEST)
+        self.assertEqual(MazeCellStates.OPEN_SOUTH_EAST, self.test_maze4.maze[2][2])
+        self.assertEqual(MazeCellStates.NO_OPEN, self.test_maze4.maze[1][2])
+        self.assertEqual(MazeCellStates.NO_OPEN, self.test_maze4.maze[2][1])
+        self.assertEqual(MazeCellStates.OPEN_WEST, self.test_maze4.maze[2][3])
+
+        # The border is always closed already.
+        self.test_maze4.build_wall(2, 3, MazeCellStates.OPEN_EAST)
+        self.assertEqual(MazeCellStates.OPEN_WEST, self.test_maze4.maze[2][3])
+
+        self.test_maze4.close([10, 14], [MazeCellStates.OPEN_EAST, MazeCellStates.OPEN_NORTH])
+        self.assertEqual(Maze(4, 4), self.test_maze4)
+        self.assertRaises(ValueError, self.test_maze4.close, [1], [])
+
+    def test_journal(self):
+        journal = self.test_maze4.start_journal()
+        self.assertIs(journal, self.test_maze4.journal)
+
+        self.test_maze4.tear_down_wall(1, 1, MazeCellStates.OPEN_EAST)
+        self.test_maze4.carve([0], [MazeCellStates.OPEN_SOUTH])
+        self.test_maze4.build_wall(1, 1, MazeCellStates.OPEN_EAST)
+        self.assertEqual([0, 4], list(journal.changed_indices()))
+
+        self.assertIs(journal, self.test_maze4.stop_journal())
+        self.assertIsNone(self.test_maze4.journal)
+        self.test_maze4.tear_down_wall(3, 3, MazeCellStates.OPEN_WEST)
+        self.assertEqual([0, 4], list(journal.changed_indices()))
+
+    def test_carve_validations(self):
+        self.assertRaises(CantTearWallException, self.test_maze4.carve, [5, 1, 6],
+          [MazeCellStates.OPEN_EAST, MazeCellStates.OPEN_NORTH, MazeCellStates.OPEN_SOUTH])
+        # Nothing is carved if anything fails.
+        self.assertEqual(Maze(4, 4), self.test_maze4)
+
+        self.assertRaises(CantTearWallException, self.test_maze4.tear_down_walls,
+          [(1, 3, MazeCellStates.OPEN_EAST)])
+        self.assertRaises(CantTearWallException, self.test_maze4.tear_down_walls,
+          [(1, 1, MazeCellStates.OPEN_EAST), (3, 0, MazeCellStates.OPEN_SOUTH)])
+        self.assertRaises(ValueError, self.test_maze4.carve, [1, 2], [MazeCellStates.OPEN_SOUTH])
+        self.assertEqual(Maze(4, 4), self.test_maze4)
+
+        try:
+            self.test_maze4.carve([5, 4], [MazeCellStates.OPEN_NORTH, MazeCellStates.OPEN_WEST])
+        except CantTearWallException as exception:
+            self.assertEqual((1, 0), (exception.row, exception.col))
+        else:
+            self.fail("Carved past the western border")
+
     def test_str(self):
         raw_target = """ _ _ _
 |_|_|_|
@@ -88,6 +186,42 @@ class MazeTest(unittest.TestCase):
         three.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
         self.assertNotEqual(three, self.test_maze3)
 
+    def test_cell_buffer(self):
+        self.assertEqual(12, len(self.rect_maze.cells))
+        self.rect_maze.tear_down_wall(1, 2, MazeCellStates.OPEN_EAST)
+        self.assertEqual(MazeCellStates.OPEN_EAST, self.rect_maze.cells[6])
+        self.assertEqual(MazeCellStates.OPEN_WEST, self.rect_maze.cells[7])
+        self.assertEqual(MazeCellStates.OPEN_WEST, self.rect_maze.maze[1][3])
+
+        self.rect_maze.maze[2][0] = MazeCellStates.OPEN_NORTH
+        self.assertEqual(MazeCellStates.OPEN_NORTH, self.rect_maze.cells[8])
+
+    def test_from_buffer(self):
+        self.test_maze3.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH_WEST)
+        copied = Maze.from_buffer(3, 3, bytearray(self.test_maze3.cells))
+        self.assertEqual(self.test_maze3, copied)
+        self.assertEqual(str(self.test_maze3), str(copied))
+
+        self.assertRaises(InvalidSizeException, Maze.from_buffer, 3, 2, bytearray(9))
+
+        read_only = Maze.from_buffer(3, 3, bytes(9))
+        self.assertRaises(TypeError, read_only.tear_down_wall, 1, 1,
+          MazeCellStates.OPEN_SOUTH)
+
+    def test_pickle(self):
+        self.rect_maze.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH_EAST)
+        unpickled = pickle.loads(pickle.dumps(self.rect_maze))
+        self.assertEqual(self.rect_maze, unpickled)
+        unpickled.tear_down_wall(2, 2, MazeCellStates.OPEN_WEST)
+        self.assertEqual(MazeCellStates.OPEN_EAST, unpickled.maze[2][1])
+        self.assertIsNone(unpickled.algorithm)
+        self.assertIsNone(unpickled.seed)
+
+        generated = KruskalsAlgorithm().generate(4, 3, 3)
+        unpickled = pickle.loads(pickle.dumps(generated))
+        self.assertEqual(generated, unpickled)
+        self.assertEqual(("KruskalsAlgorithm", 3), (unpickled.algorithm, unpickled.seed))
+
     def test_get_adjacent(self):
         # Use rect_maze
         rect_maze_height = len(self.rect_maze.maze)
@@ -120,5 +254,44 @@ class MazeTest(unittest.TestCase):
 
         self.assertEqual(adj_1_1, self.rect_maze.get_adjacent(1, 1))
 
+    def test_navigation_tables(self):
+        offsets = get_offsets(4)
+        self.assertEqual(-4, offsets[MazeCellStates.OPEN_NORTH])
+        self.assertEqual(1, offsets[MazeCellStates.OPEN_EAST])
+        self.assertEqual(4, offsets[MazeCellStates.OPEN_SOUTH])
+        self.assertEqual(-1, offsets[MazeCellStates.OPEN_WEST])
+
+        moves = get_moves(4)
+        self.assertEqual(16, len(moves))
+        self.assertEqual((), moves[MazeCellStates.NO_OPEN])
+        self.assertEqual((-4, -1), moves[MazeCellStates.OPEN_NORTH_WEST])
+        self.assertEqual(((1, MazeCellStates.OPEN_WEST), (4, MazeCellStates.OPEN_NORTH)),
+          get_openings(4)[MazeCellStates.OPEN_SOUTH_EAST])
+        self.assertIs(moves, get_moves(4))
+
+    def test_index(self):
+        self.assertEqual(6, self.rect_maze.index(1, 2))
+        self.assertEqual((1, 2), self.rect_maze.coordinates(6))
+        self.assertEqual((2, 3), self.rect_maze.coordinates(self.rect_maze.index(2, 3)))
+
+    def test_adjacent_offsets(self):
+        self.assertEqual(set([1, 4]), set(self.rect_maze.adjacent_offsets(0)))
+        self.assertEqual(set([-4, 1, 4, -1]), set(self.rect_maze.adjacent_offsets(5)))
+        self.assertEqual(set([-4, -1]), set(self.rect_maze.adjacent_offsets(11)))
+
+        for row in range(3):
+            for col in range(4):
+                index = self.rect_maze.index(row, col)
+                self.assertEqual(self.rect_maze.get_adjacent(row, col),
+                  set(self.rect_maze.coordinates(index + offset)
+                    for offset in self.rect_maze.adjacent_offsets(index)))
+
+    def test_open_neighbors(self):
+        self.assertEqual([], self.rect_maze.open_neighbors(5))
+        self.rect_maze.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH_WEST)
+        self.assertEqual(set([1, 4]), set(self.rect_maze.open_neighbors(5)))
+        self.assertEqual((4,), self.rect_maze.open_offsets(1))
+        self.assertEqual([5], self.rect_maze.open_neighbors(4))
+
 if __name__ == "__main__":
     unittest.main()
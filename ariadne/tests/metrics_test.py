@@ -0,0 +1,91 @@
+from ..generators import GENERATORS, KruskalsAlgorithm, RecursiveBacktracker
+from ..metrics import MazeMetrics, measure, measure_many
+from ..mazes import Maze, MazeCellStates
+from ..pathindex import PathIndex
+
+import collections
+import unittest
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        # _ _ _ _
+        #|_      |
+        #|_ _|_|_|
+        #
+        # A corridor along the top row with three branches hanging off it.
+        self.maze = Maze(4, 2)
+        self.maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        self.maze.tear_down_wall(0, 1, MazeCellStates.OPEN_EAST)
+        self.maze.tear_down_wall(0, 2, MazeCellStates.OPEN_EAST)
+        self.maze.tear_down_wall(0, 3, MazeCellStates.OPEN_SOUTH)
+        self.maze.tear_down_wall(0, 2, MazeCellStates.OPEN_SOUTH)
+        self.maze.tear_down_wall(1, 0, MazeCellStates.OPEN_EAST)
+        self.maze.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH)
+
+    def test_measure(self):
+        self.assertEqual(MazeMetrics(
+            cells=8,
+            dead_ends=4,
+            junctions=2,
+            straights=0,
+            turns=2,
+            corridor_lengths=collections.Counter({1: 3, 2: 2}),
+            river_factor=1.5,
+            diameter=5,
+            solution_length=4,
+        ), measure(self.maze))
+
+        self.assertEqual(3, measure(self.maze, (1, 0), (0, 0)).solution_length)
+
+    def test_engines(self):
+        for generator_class in GENERATORS.values():
+            maze = generator_class().generate(23, 17, 5)
+            pure = Maze.from_buffer(23, 17, maze.cells)
+            pure.speedups = None
+            self.assertEqual(measure(pure), measure(maze))
+
+    def test_generated(self):
+        for generator_class in GENERATORS.values():
+            maze = generator_class().generate(12, 9, 1)
+            metrics = measure(maze)
+            index = PathIndex(maze)
+            cell_count = len(maze.cells)
+
+            self.assertEqual(cell_count, metrics.cells)
+            self.assertEqual(cell_count, metrics.dead_ends + metrics.junctions + metrics.straights +
+              metrics.turns)
+            # Every passage is in exactly one corridor.
+            self.assertEqual(cell_count - 1, sum(length * count
+              for length, count in metrics.corridor_lengths.items()))
+            self.assertEqual(index.distance_indices(0, cell_count - 1), metrics.solution_length)
+
+            farthest = max(range(cell_count), key=lambda cell: index.distance_indices(0, cell))
+            self.assertEqual(max(index.distance_indices(farthest, cell) for cell in range(cell_count)),
+              metrics.diameter)
+
+    def test_edge_cases(self):
+        self.assertEqual(MazeMetrics(0, 0, 0, 0, 0, collections.Counter(), 0.0, 0, None),
+          measure(Maze(0, 0)))
+        self.assertEqual(MazeMetrics(1, 0, 0, 0, 0, collections.Counter(), 0.0, 0, 0),
+          measure(Maze(1, 1)))
+
+        metrics = measure(RecursiveBacktracker().generate(1, 6, 0))
+        self.assertEqual(collections.Counter({5: 1}), metrics.corridor_lengths)
+        self.assertEqual((5, 5, 5.0), (metrics.diameter, metrics.solution_length, metrics.river_factor))
+
+        # Closed-off cells are left out, and can't be reached.
+        maze = Maze(3, 1)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+
+        for engine in (maze.speedups, None):
+            maze.speedups = engine
+            metrics = measure(maze)
+            self.assertEqual((2, 2, 1, None), (metrics.cells, metrics.dead_ends, metrics.diameter,
+              metrics.solution_length))
+
+    def test_measure_many(self):
+        mazes = [KruskalsAlgorithm().generate(8, 6, seed) for seed in range(6)]
+        expected = [measure(maze) for maze in mazes]
+        self.assertEqual(expected, measure_many(mazes, workers=1))
+        self.assertEqual(expected, measure_many(mazes, workers=2))
@@ -0,0 +1,118 @@
+from ..errors import InvalidMazeFileException
+from ..generators import EllersAlgorithm, KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates, get_offsets
+from ..pathindex import PathIndex
+from ..solvers import BreadthFirstSearch
+
+from array import array
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+class PathIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.maze = KruskalsAlgorithm().generate(23, 17, 99)
+        self.index = PathIndex(self.maze)
+
+    def test_matches_search(self):
+        solver = BreadthFirstSearch()
+        pairs = [((0, 0), (16, 22)), ((8, 11), (0, 22)), ((16, 0), (16, 0)),
+          ((3, 4), (3, 5)), ((12, 1), (2, 19))]
+
+        for start, end in pairs:
+            solved = solver.solve(self.maze, start, end)
+            self.assertEqual(list(solved), list(self.index.path(start, end)))
+            self.assertEqual(len(solved) - 1, self.index.distance(start, end))
+            self.assertEqual(self.index.distance(start, end), self.index.distance(end, start))
+
+    def test_other_root(self):
+        maze = EllersAlgorithm().generate(9, 31, 5)
+        index = PathIndex(maze, root=140)
+        solved = BreadthFirstSearch().solve(maze, (0, 8), (30, 0))
+        self.assertEqual(list(solved), list(index.path((0, 8), (30, 0))))
+
+    def test_imperfect(self):
+        self.assertRaises(ValueError, PathIndex, Maze(3, 3))
+
+        looped = Maze(2, 2)
+        looped.tear_down_wall(0, 0, MazeCellStates.OPEN_SOUTH_EAST)
+        looped.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH_WEST)
+        self.assertRaises(ValueError, PathIndex, looped)
+
+    def test_update(self):
+        maze = self.maze
+        journal = maze.start_journal()
+        # Cut the passage out of (8, 11) that leads towards the root and make
+        # another one out of the part that got cut off.
+        index = maze.index(8, 11)
+        parent = self.index.ancestors[0][index]
+        direction = [direction for direction, offset in get_offsets(maze.width).items()
+          if index + offset == parent][0]
+        maze.build_wall(8, 11, direction)
+
+        for cell in range(len(maze.cells)):
+            row, col = maze.coordinates(cell)
+            for state in (MazeCellStates.OPEN_EAST, MazeCellStates.OPEN_SOUTH):
+                if maze.cells[cell] & state or state & maze.border_walls[cell]:
+                    continue
+                maze.tear_down_wall(row, col, state)
+                try:
+                    fresh = PathIndex(maze)
+                    break
+                except ValueError:
+                    maze.build_wall(row, col, state)
+            else:
+                continue
+            break
+
+        self.index.update(maze, journal.changed_indices())
+        self.assertTrue(self.index.matches(maze))
+
+        for start, end in [((0, 0), (16, 22)), ((8, 11), (0, 22)), ((12, 1), (2, 19))]:
+            self.assertEqual(fresh.distance(start, end), self.index.distance(start, end))
+            self.assertEqual(list(fresh.path(start, end)), list(self.index.path(start, end)))
+
+    def test_update_imperfect(self):
+        maze = self.maze
+        ancestors = [array("i", level) for level in self.index.ancestors]
+
+        closed = Maze.from_buffer(maze.width, maze.height, bytearray(maze.cells))
+        closed.build_wall(8, 11, MazeCellStates.OPEN_NORTH_EAST_SOUTH_WEST)
+        self.assertRaises(ValueError, self.index.update, closed,
+          [cell for cell in range(len(maze.cells)) if closed.cells[cell] != maze.cells[cell]])
+
+        looped = Maze.from_buffer(maze.width, maze.height, bytearray(maze.cells))
+        state = MazeCellStates.OPEN_EAST if not maze.maze[4][4] & MazeCellStates.OPEN_EAST \
+          else MazeCellStates.OPEN_SOUTH
+        looped.tear_down_wall(4, 4, state)
+        self.assertRaises(ValueError, self.index.update, looped, [maze.index(4, 4)])
+
+        self.assertEqual(ancestors, self.index.ancestors)
+        self.assertTrue(self.index.matches(maze))
+
+    def test_serialization(self):
+        buf = io.BytesIO()
+        self.index.dump(buf)
+        loaded = PathIndex.loads(buf.getvalue())
+
+        self.assertTrue(loaded.matches(self.maze))
+        self.assertEqual(self.index.distance((0, 0), (16, 22)), loaded.distance((0, 0), (16, 22)))
+        self.assertRaises(InvalidMazeFileException, PathIndex.loads, buf.getvalue()[:-4])
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, "maze.idx")
+            self.index.save(path)
+            self.assertEqual(list(self.index.path((5, 5), (9, 0))),
+              list(PathIndex.load(path, self.maze).path((5, 5), (9, 0))))
+            self.assertRaises(InvalidMazeFileException, PathIndex.load, path,
+              KruskalsAlgorithm().generate(23, 17, 100))
+        finally:
+            shutil.rmtree(tempdir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from ..generators import GENERATORS, MazeGenerator, RecursiveBacktracker, WilsonsAlgorithm
+from ..profiling import Profile, Profiler, phase, tree_depth
+from ..mazes import Maze, MazeCellStates
+
+import json
+import unittest
+
+class ProfilingTest(unittest.TestCase):
+
+    def test_disabled(self):
+        generator = RecursiveBacktracker()
+        generator.generate(5, 5, 1)
+        self.assertIsNone(generator.profiler)
+        self.assertIsNone(generator.profile)
+
+    def test_generators(self):
+        profiler = Profiler()
+
+        for name, generator_class in GENERATORS.items():
+            generator = generator_class()
+            generator.profiler = profiler
+            maze = generator.generate(9, 6, 4)
+            self.assertIsNone(generator.profile)
+
+            profile = profiler.profiles[-1]
+            self.assertEqual(name, profile.algorithm)
+            self.assertEqual((9, 6, 4), (profile.width, profile.height, profile.seed))
+            self.assertEqual(53, profile.counters["passages"])
+            self.assertIn("total", profile.timings)
+
+            for phase_name, seconds in profile.timings.items():
+                self.assertLessEqual(seconds, profile.timings["total"])
+
+            # Profiling does not change the maze.
+            self.assertEqual(generator_class().generate(9, 6, 4), maze)
+
+        self.assertEqual(len(GENERATORS), len(profiler.profiles))
+
+    def test_counters(self):
+        generator = RecursiveBacktracker()
+        generator.profiler = Profiler()
+
+        for speedups in (generator.speedups, None):
+            generator.speedups = speedups
+            generator.generate(1, 7, 0)
+            counters = generator.profiler.profiles[-1].counters
+            self.assertEqual(14, counters["random_bytes"])
+            self.assertGreaterEqual(counters["max_stack"], 4)
+
+        generator = WilsonsAlgorithm()
+        generator.profiler = Profiler()
+        generator.generate(12, 12, 0)
+        counters = generator.profiler.profiles[-1].counters
+        self.assertTrue(1 <= counters["walks"] < 144)
+        self.assertGreater(counters["random_bytes"], 0)
+
+    def test_class_profiler(self):
+        profiler = Profiler(max_profiles=2)
+        MazeGenerator.profiler = profiler
+
+        try:
+            for seed in range(3):
+                RecursiveBacktracker().generate(4, 4, seed)
+        finally:
+            MazeGenerator.profiler = None
+
+        self.assertEqual([1, 2], [profile.seed for profile in profiler.profiles])
+
+    def test_export(self):
+        profiler = Profiler()
+        generator = RecursiveBacktracker()
+        generator.profiler = profiler
+        generator.generate(6, 6, 1)
+        generator.generate(6, 6, 2)
+
+        exported = json.loads(profiler.to_json())
+        self.assertEqual(2, len(exported["profiles"]))
+        self.assertEqual(profiler.profiles[0].as_dict(), exported["profiles"][0])
+        totals = exported["totals"]["RecursiveBacktracker"]
+        self.assertEqual(2, totals["generations"])
+        self.assertEqual(70, totals["counters"]["passages"])
+        self.assertEqual(profiler.profiles[1].as_dict(), json.loads(profiler.profiles[1].to_json()))
+
+    def test_profile(self):
+        profile = Profile("Test", 1, 1)
+
+        with phase(profile, "work"):
+            pass
+        with phase(profile, "work"):
+            pass
+        with phase(None, "ignored"):
+            pass
+
+        self.assertEqual(["work"], list(profile.timings))
+        profile.count("steps")
+        profile.count("steps", 2)
+        profile.peak("stack", 3)
+        profile.peak("stack", 1)
+        self.assertEqual({"steps": 3, "stack": 3}, profile.counters)
+
+    def test_tree_depth(self):
+        maze = Maze(4, 1)
+        maze.carve([0, 1, 2], [MazeCellStates.OPEN_EAST] * 3)
+        self.assertEqual(3, tree_depth(maze, 0))
+        self.assertEqual(2, tree_depth(maze, 1))
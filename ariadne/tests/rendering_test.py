@@ -0,0 +1,82 @@
+from ..generators import RecursiveBacktracker
+from ..mazes import Maze, MazeCellStates
+from ..rendering import ascii_lines, pack_bits, pixel_rows, write_ascii, write_pbm, write_png
+
+import io
+import struct
+import zlib
+import unittest
+
+class RenderingTest(unittest.TestCase):
+
+    def setUp(self):
+        # Same maze as in MazeTest.test_str
+        self.maze = Maze(3, 2)
+        self.maze.tear_down_wall(0, 2, MazeCellStates.OPEN_WEST)
+        self.maze.tear_down_wall(0, 1, MazeCellStates.OPEN_WEST)
+        self.maze.tear_down_wall(0, 0, MazeCellStates.OPEN_SOUTH)
+        self.maze.tear_down_wall(1, 0, MazeCellStates.OPEN_EAST)
+        self.maze.tear_down_wall(1, 1, MazeCellStates.OPEN_EAST)
+        self.pixels = [
+            b"1111111",
+            b"1000001",
+            b"1011111",
+            b"1000001",
+            b"1111111",
+        ]
+
+    def test_ascii(self):
+        self.assertEqual([b" _ _ _", b"|  _ _|", b"|_ _ _|"], list(ascii_lines(self.maze)))
+
+        text = io.StringIO()
+        write_ascii(self.maze, text)
+        self.assertEqual(" _ _ _\n|  _ _|\n|_ _ _|\n", text.getvalue())
+
+        binary = io.BytesIO()
+        generated = RecursiveBacktracker().generate(30, 20, 3)
+        write_ascii(generated, binary)
+        self.assertEqual(str(generated) + "\n", binary.getvalue().decode("ascii"))
+
+    def test_pixel_rows(self):
+        self.assertEqual([bytes(int(pixel) for pixel in row.decode()) for row in self.pixels],
+          list(pixel_rows(self.maze)))
+
+    def test_pack_bits(self):
+        self.assertEqual(b"\xa0", pack_bits(b"\1\0\1"))
+        self.assertEqual(b"\xff\x80", pack_bits(b"\1" * 9))
+        self.assertEqual(b"", pack_bits(b""))
+
+    def test_pbm(self):
+        pbm = io.BytesIO()
+        write_pbm(self.maze, pbm)
+        rows = [pack_bits(bytes(int(pixel) for pixel in row.decode())) for row in self.pixels]
+        self.assertEqual(b"P4\n7 5\n" + b"".join(rows), pbm.getvalue())
+
+    def test_png(self):
+        png = io.BytesIO()
+        write_png(self.maze, png)
+        data = png.getvalue()
+        self.assertEqual(b"\x89PNG\r\n\x1a\n", data[:8])
+
+        chunks = {}
+        position = 8
+
+        while position < len(data):
+            length, = struct.unpack(">I", data[position:position + 4])
+            kind = data[position + 4:position + 8]
+            body = data[position + 8:position + 8 + length]
+            crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+            self.assertEqual(zlib.crc32(kind + body), crc)
+            chunks[kind] = chunks.get(kind, b"") + body
+            position += 12 + length
+
+        self.assertEqual((7, 5, 1, 0), struct.unpack(">IIBB", chunks[b"IHDR"][:10]))
+        self.assertIn(b"IEND", chunks)
+
+        flipped = [row.decode().translate(str.maketrans("01", "10")) for row in self.pixels]
+        expected = b"".join(b"\0" + pack_bits(bytes(int(pixel) for pixel in row))
+          for row in flipped)
+        self.assertEqual(expected, zlib.decompress(chunks[b"IDAT"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from ..rng import (BYTE_LIMITS, BulkRandom, draw_bytes, draw_digits, draw_dwords, draw_words, dwords,
+  get_random, shuffle, words)
+
+import collections
+import random
+import unittest
+
+class RngTest(unittest.TestCase):
+
+    def test_get_random(self):
+        rng = random.Random(5)
+        self.assertIs(rng, get_random(rng))
+        self.assertIs(random, get_random(None))
+        self.assertIs(random, get_random(random))
+        self.assertEqual(random.Random(5).random(), get_random(5).random())
+
+    def test_draws(self):
+        self.assertEqual(draw_bytes(random.Random(3), 10), draw_bytes(random.Random(3), 10))
+        self.assertEqual(10, len(draw_bytes(random.Random(3), 10)))
+        self.assertEqual(b"", draw_bytes(random.Random(3), 0))
+
+        digits = draw_digits(random.Random(3), 100)
+        self.assertEqual(100, len(digits))
+        self.assertEqual(b"", digits.strip(b"01"))
+        self.assertEqual(b"", draw_digits(random.Random(3), 0))
+
+        draws = draw_words(random.Random(3), 6)
+        self.assertEqual(12, len(draws))
+        self.assertEqual([draws[2 * i] | draws[2 * i + 1] << 8 for i in range(6)],
+          list(words(draws)))
+
+    def test_shuffle(self):
+        draws = draw_dwords(random.Random(3), 5)
+        self.assertEqual([int.from_bytes(draws[4 * i:4 * i + 4], "little") for i in range(5)],
+          list(dwords(draws)))
+
+        items = list(range(50))
+        shuffle(items, draw_dwords(random.Random(3), 50))
+        self.assertEqual(list(range(50)), sorted(items))
+        self.assertNotEqual(list(range(50)), items)
+
+        again = list(range(50))
+        shuffle(again, draw_dwords(random.Random(3), 50))
+        self.assertEqual(items, again)
+
+        # Every order of three items comes up about as often.
+        rng = random.Random(8)
+        orders = collections.Counter()
+
+        for _ in range(6000):
+            items = [0, 1, 2]
+            shuffle(items, draw_dwords(rng, 3))
+            orders[tuple(items)] += 1
+
+        self.assertEqual(6, len(orders))
+        for count in orders.values():
+            self.assertTrue(800 < count < 1200, orders)
+
+    def test_byte_limits(self):
+        for count in range(1, 257):
+            self.assertEqual(0, BYTE_LIMITS[count] % count)
+            self.assertGreater(BYTE_LIMITS[count] + count, 256)
+
+    def test_below(self):
+        bulk = BulkRandom(11, batch_size=16)
+        counts = collections.Counter(bulk.below(3) for _ in range(3000))
+        self.assertEqual([0, 1, 2], sorted(counts))
+        for count in counts.values():
+            self.assertGreater(count, 850)
+
+        self.assertTrue(0 <= bulk.below(10 ** 6) < 10 ** 6)
+        self.assertEqual(0, bulk.below(1))
+
+    def test_deterministic(self):
+        first = BulkRandom(11)
+        second = BulkRandom(random.Random(11))
+        options = "abcde"
+        self.assertEqual([first.choice(options) for _ in range(5000)],
+          [second.choice(options) for _ in range(5000)])
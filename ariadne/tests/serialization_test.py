@@ -0,0 +1,96 @@
+from ..errors import InvalidMazeFileException
+from ..generators import KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates
+from ..serialization import HEADER, dump, loads, load, pack_nibbles, unpack_nibbles
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+class SerializationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.maze = KruskalsAlgorithm().generate(7, 5, 1234)
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_pack_nibbles(self):
+        self.assertEqual(b"\x12\x30", pack_nibbles(bytearray(b"\x01\x02\x03")))
+        self.assertEqual(b"\xfa", pack_nibbles(b"\x0f\x0a"))
+        self.assertEqual(b"", pack_nibbles(b""))
+
+        self.assertEqual(bytearray(b"\x01\x02\x03"), unpack_nibbles(b"\x12\x30", 3))
+        self.assertEqual(self.maze.cells, unpack_nibbles(pack_nibbles(self.maze.cells), 35))
+        self.assertRaises(InvalidMazeFileException, unpack_nibbles, b"\x12", 3)
+
+    def test_roundtrip(self):
+        for packed in (True, False):
+            buf = io.BytesIO()
+            dump(self.maze, buf, packed)
+            data = buf.getvalue()
+            expected_cells = 18 if packed else 35
+            self.assertEqual(HEADER.size + len("KruskalsAlgorithm") + expected_cells, len(data))
+
+            loaded = loads(data)
+            self.assertEqual(self.maze, loaded)
+            self.assertEqual("KruskalsAlgorithm", loaded.algorithm)
+            self.assertEqual(1234, loaded.seed)
+
+    def test_no_metadata(self):
+        maze = Maze(3, 2)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        buf = io.BytesIO()
+        dump(maze, buf)
+        loaded = loads(buf.getvalue())
+        self.assertEqual(maze, loaded)
+        self.assertIsNone(loaded.algorithm)
+        self.assertIsNone(loaded.seed)
+
+    def test_save_load(self):
+        path = os.path.join(self.tempdir, "maze.bin")
+        self.maze.save(path)
+        self.assertEqual(self.maze, Maze.load(path))
+        self.assertEqual(self.maze, Maze.load(path, use_mmap=True))
+
+    def test_mmap(self):
+        path = os.path.join(self.tempdir, "maze.bin")
+        self.maze.save(path, packed=False)
+        mapped = Maze.load(path, use_mmap=True)
+
+        self.assertEqual(self.maze, mapped)
+        self.assertEqual(str(self.maze), str(mapped))
+        self.assertEqual(1234, mapped.seed)
+        self.assertIsInstance(mapped.cells, memoryview)
+        self.assertRaises(TypeError, mapped.tear_down_wall, 0, 0, MazeCellStates.OPEN_SOUTH)
+
+    def test_invalid(self):
+        buf = io.BytesIO()
+        dump(self.maze, buf)
+        data = buf.getvalue()
+
+        self.assertRaises(InvalidMazeFileException, loads, data[:10])
+        self.assertRaises(InvalidMazeFileException, loads, b"XXXX" + data[4:])
+        self.assertRaises(InvalidMazeFileException, loads, data[:4] + b"\x63" + data[5:])
+        self.assertRaises(InvalidMazeFileException, loads, data[:-1])
+        self.assertRaises(InvalidMazeFileException, loads,
+          data[:HEADER.size] + b"\xff" + data[HEADER.size + 1:])
+
+    def test_invalid_file(self):
+        buf = io.BytesIO()
+        dump(self.maze, buf, packed=False)
+        data = buf.getvalue()
+        path = os.path.join(self.tempdir, "maze.bin")
+
+        for invalid in (b"", data[:10], data[:-1], data + b"\0"):
+            with open(path, "wb") as fileobj:
+                fileobj.write(invalid)
+
+            for use_mmap in (False, True):
+                self.assertRaises(InvalidMazeFileException, load, path, use_mmap)
+
+if __name__ == "__main__":
+    unittest.main()
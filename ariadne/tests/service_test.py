@@ -0,0 +1,187 @@
+from ..errors import InvalidSizeException
+from ..generators import EllersAlgorithm, KruskalsAlgorithm, RecursiveBacktracker
+from ..service import MazeService
+
+import asyncio
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+class GatedExecutor(ThreadPoolExecutor):
+    """
+    Holds every generation until `gate` is set, then fails it with `error`
+    if there is one.
+    """
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.gate = threading.Event()
+        self.submitted = 0
+        self.error = None
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return super().submit(self.__run, fn, *args)
+
+    def __run(self, fn, *args):
+        self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return fn(*args)
+
+class MazeServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = GatedExecutor()
+        self.executor.gate.set()
+        self.service = MazeService(executor=self.executor)
+
+    def tearDown(self):
+        self.service.close()
+        self.executor.shutdown()
+
+    def test_generate(self):
+        maze = asyncio.run(self.service.generate("RecursiveBacktracker", 9, 7, 3))
+        self.assertEqual(RecursiveBacktracker().generate(9, 7, 3), maze)
+        self.assertEqual("RecursiveBacktracker", maze.algorithm)
+        self.assertEqual(3, maze.seed)
+
+        maze = asyncio.run(self.service.generate("EllersAlgorithm", 4, 5))
+        self.assertEqual(EllersAlgorithm().generate(4, 5, maze.seed), maze)
+
+    def test_cache(self):
+        async def run():
+            first = await self.service.generate_packed("KruskalsAlgorithm", 8, 8, 1)
+            second = await self.service.generate_packed("KruskalsAlgorithm", 8, 8, 1)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertIs(first, second)
+        self.assertEqual(KruskalsAlgorithm().generate(8, 8, 1).cells, first)
+        self.assertEqual(1, self.executor.submitted)
+        self.assertEqual(1, self.service.stats["hits"])
+        self.assertEqual(1, self.service.stats["misses"])
+
+        # Mazes are copied out of the cache.
+        async def edit():
+            maze = await self.service.generate("KruskalsAlgorithm", 8, 8, 1)
+            maze.cells[0] = 0
+            return await self.service.generate_packed("KruskalsAlgorithm", 8, 8, 1)
+
+        self.assertEqual(first, asyncio.run(edit()))
+
+    def test_pending(self):
+        self.executor.gate.clear()
+
+        async def run():
+            requests = [asyncio.ensure_future(self.service.generate_packed("EllersAlgorithm", 6, 6, 2))
+              for _ in range(5)]
+            await asyncio.sleep(0)
+            self.assertEqual(1, len(self.service.pending))
+            self.executor.gate.set()
+            return await asyncio.gather(*requests)
+
+        results = asyncio.run(run())
+        self.assertEqual(1, self.executor.submitted)
+        self.assertEqual(4, self.service.stats["joined"])
+        self.assertEqual({bytes(EllersAlgorithm().generate(6, 6, 2).cells)}, set(results))
+        self.assertEqual({}, self.service.pending)
+
+    def test_cancel(self):
+        self.executor.gate.clear()
+
+        async def run():
+            request = asyncio.ensure_future(self.service.generate_packed("EllersAlgorithm", 6, 6, 2))
+            await asyncio.sleep(0)
+            request.cancel()
+            self.executor.gate.set()
+            return await self.service.generate_packed("EllersAlgorithm", 6, 6, 2)
+
+        asyncio.run(run())
+        self.assertEqual(1, self.executor.submitted)
+
+    def test_eviction(self):
+        service = MazeService(cache_bytes=100, executor=self.executor)
+
+        async def run():
+            for seed in range(3):
+                await service.generate_packed("RecursiveBacktracker", 7, 7, seed)
+            await service.generate_packed("RecursiveBacktracker", 7, 7, 1)
+
+        asyncio.run(run())
+        self.assertEqual([("RecursiveBacktracker", 7, 7, 2), ("RecursiveBacktracker", 7, 7, 1)],
+          list(service.cache))
+        self.assertEqual(98, service.cached_bytes)
+        self.assertEqual(1, service.stats["evictions"])
+
+        asyncio.run(service.generate_packed("RecursiveBacktracker", 11, 11, 0))
+        self.assertNotIn(("RecursiveBacktracker", 11, 11, 0), service.cache)
+
+    def test_invalid(self):
+        service = MazeService(max_cells=100, executor=self.executor)
+        self.assertRaises(ValueError, asyncio.run, service.generate_packed("Nope", 5, 5, 0))
+        self.assertRaises(InvalidSizeException, asyncio.run,
+          service.generate_packed("BinaryTree", 20, 20, 0))
+
+        # A seed of None would cache one random maze for every later request.
+        for seed in (None, 1.5, "3", True):
+            self.assertRaises(TypeError, asyncio.run, service.generate_packed("BinaryTree", 5, 5, seed))
+
+        self.assertEqual(0, self.executor.submitted)
+
+    def test_failure(self):
+        self.executor.error = RuntimeError()
+        self.assertRaises(RuntimeError, asyncio.run,
+          self.service.generate_packed("RecursiveBacktracker", 5, 4, 0))
+        self.assertEqual({}, self.service.pending)
+        self.assertEqual({}, dict(self.service.cache))
+
+        # Failures are not cached.
+        self.executor.error = None
+        asyncio.run(self.service.generate_packed("RecursiveBacktracker", 5, 4, 0))
+        self.assertEqual(2, self.executor.submitted)
+
+    def test_exit(self):
+        # Leaving the block waits for the generation in flight without
+        # blocking the loop, which is what lets the gate open.
+        self.executor.gate.clear()
+        opened = []
+
+        def open_gate_late():
+            opened.append("timer")
+            self.executor.gate.set()
+
+        timeout = threading.Timer(5, open_gate_late)
+        timeout.start()
+
+        async def open_gate():
+            await asyncio.sleep(0.05)
+            opened.append("loop")
+            self.executor.gate.set()
+
+        async def run():
+            async with MazeService(executor=self.executor) as service:
+                service.owns_executor = True
+                request = asyncio.ensure_future(service.generate_packed("EllersAlgorithm", 6, 6, 2))
+                await asyncio.sleep(0)
+                gate = asyncio.ensure_future(open_gate())
+            await gate
+            return await request
+
+        try:
+            self.assertEqual(bytes(EllersAlgorithm().generate(6, 6, 2).cells), asyncio.run(run()))
+        finally:
+            timeout.cancel()
+
+        self.assertEqual(["loop"], opened)
+
+    def test_processes(self):
+        async def run():
+            async with MazeService(workers=2) as service:
+                return await asyncio.gather(*(service.generate("WilsonsAlgorithm", 10, 6, seed)
+                  for seed in range(4)))
+
+        for seed, maze in enumerate(asyncio.run(run())):
+            self.assertEqual(seed, maze.seed)
+            self.assertEqual(maze, asyncio.run(self.service.generate("WilsonsAlgorithm", 10, 6, seed)))
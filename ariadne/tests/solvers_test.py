@@ -0,0 +1,94 @@
+from ..braiding import braid
+from ..generators import RecursiveBacktracker, KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates
+from ..solvers import BreadthFirstSearch, AStar, DeadEndFilling
+
+import unittest
+
+class BreadthFirstSearchTest(unittest.TestCase):
+    """
+    Master class for testing solvers, see RecursiveBacktrackerTest.
+    """
+
+    def setUp(self):
+        self.solver = BreadthFirstSearch()
+
+    def assertValidPath(self, maze, path, start, end):
+        self.assertEqual(start, divmod(path[0], maze.width))
+        self.assertEqual(end, divmod(path[-1], maze.width))
+
+        for current, following in zip(path, path[1:]):
+            row, col = divmod(current, maze.width)
+            openings = set()
+
+            for direction in MazeCellStates.CARDINAL:
+                if maze.cells[current] & direction:
+                    openings |= maze.move_to_opening(row, col, direction)
+
+            self.assertIn(divmod(following, maze.width), openings)
+
+    def test_solve(self):
+        # A corridor that snakes down a 3x3 maze.
+        maze = Maze(3, 3)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(0, 1, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(0, 2, MazeCellStates.OPEN_SOUTH)
+        maze.tear_down_wall(1, 2, MazeCellStates.OPEN_WEST)
+        maze.tear_down_wall(1, 1, MazeCellStates.OPEN_WEST)
+        maze.tear_down_wall(1, 0, MazeCellStates.OPEN_SOUTH)
+        maze.tear_down_wall(2, 0, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(2, 1, MazeCellStates.OPEN_EAST)
+
+        self.assertEqual([0, 1, 2, 5, 4, 3, 6, 7, 8], list(self.solver.solve(maze, (0, 0), (2, 2))))
+        self.assertEqual([4, 3, 6], list(self.solver.solve(maze, (1, 1), (2, 0))))
+        self.assertEqual([7], list(self.solver.solve(maze, (2, 1), (2, 1))))
+
+    def test_unreachable(self):
+        maze = Maze(3, 2)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        self.assertIsNone(self.solver.solve(maze, (0, 0), (1, 2)))
+
+    def test_generated(self):
+        for generator in (RecursiveBacktracker(), KruskalsAlgorithm()):
+            maze = generator.generate(40, 30, 7)
+            path = self.solver.solve(maze, (0, 0), (29, 39))
+            self.assertValidPath(maze, path, (0, 0), (29, 39))
+            self.assertEqual(list(BreadthFirstSearch().solve(maze, (0, 0), (29, 39))), list(path))
+
+            path = self.solver.solve(maze, (15, 20), (3, 2))
+            self.assertValidPath(maze, path, (15, 20), (3, 2))
+
+
+class AStarTest(BreadthFirstSearchTest):
+
+    def setUp(self):
+        self.solver = AStar()
+
+    def test_braided(self):
+        # With loops there are many paths; A* has to find one of the shortest.
+        maze = KruskalsAlgorithm().generate(40, 30, 7)
+        braid(maze, 0.8, 7)
+
+        for start, end in (((0, 0), (29, 39)), ((15, 20), (3, 2)), ((29, 0), (0, 39))):
+            path = self.solver.solve(maze, start, end)
+            self.assertValidPath(maze, path, start, end)
+            self.assertEqual(len(BreadthFirstSearch().solve(maze, start, end)), len(path))
+
+
+class DeadEndFillingTest(BreadthFirstSearchTest):
+
+    def setUp(self):
+        self.solver = DeadEndFilling()
+
+    def test_braided(self):
+        # The loops are left after filling, the path has to be found through
+        # them; it need not be a shortest one.
+        for seed in range(50):
+            maze = KruskalsAlgorithm().generate(12, 12, seed)
+            braid(maze, 0.8, seed)
+
+            for start, end in (((0, 0), (11, 11)), ((6, 5), (0, 11))):
+                self.assertValidPath(maze, self.solver.solve(maze, start, end), start, end)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+from ..braiding import braid
+from ..generators import RecursiveBacktracker, EllersAlgorithm, KruskalsAlgorithm, ellers_row
+from ..masks import ellipse
+from ..mazes import Maze, MazeCellStates, SPEEDUPS_AVAILABLE
+from ..metrics import DEGREES, walk_tree
+from ..solvers import bfs_path, dead_end_path
+from ..validation import validate
+
+import random
+import unittest
+
+from array import array
+
+SIZES = ((1, 1), (1, 6), (6, 1), (2, 2), (13, 9), (40, 25))
+
+@unittest.skipUnless(SPEEDUPS_AVAILABLE, "ariadne._speedups is not built")
+class SpeedupsTest(unittest.TestCase):
+    """
+    The compiled engines have to give exactly what the pure-Python ones give.
+    """
+
+    def assertSameMazes(self, generator_class):
+        compiled = generator_class()
+        pure = generator_class()
+        pure.speedups = None
+
+        for width, height in SIZES:
+            for seed in range(4):
+                maze = compiled.generate(width, height, seed)
+                validate(maze)
+                self.assertEqual(pure.generate(width, height, seed), maze)
+
+    def test_recursive_backtracker(self):
+        self.assertSameMazes(RecursiveBacktracker)
+
+    def test_recursive_backtracker_masked(self):
+        compiled = RecursiveBacktracker()
+        pure = RecursiveBacktracker()
+        pure.speedups = None
+        width, height, mask = ellipse(40, 25)
+
+        for seed in range(4):
+            self.assertEqual(pure.generate(width, height, seed, mask),
+              compiled.generate(width, height, seed, mask))
+
+        # Walls without the border bits still keep the walk on the grid.
+        cells = bytearray(4)
+        Maze.speedups.backtrack(cells, 2, 2, 0, bytes(8), bytes(4))
+        validate(Maze.from_buffer(2, 2, cells))
+
+    def test_ellers_algorithm(self):
+        self.assertSameMazes(EllersAlgorithm)
+
+    def test_ellers_row(self):
+        rng = random.Random(7)
+        compiled_labels = array("i", [-1]) * 30
+        pure_labels = array("i", compiled_labels)
+
+        for row_index in range(50):
+            noise = bytes(rng.getrandbits(8) for _ in range(4 * 30))
+            is_last_row = row_index == 49
+            self.assertEqual(ellers_row(pure_labels, noise, is_last_row),
+              Maze.speedups.ellers_row(compiled_labels, noise, is_last_row))
+            self.assertEqual(pure_labels, compiled_labels)
+
+    def test_kruskals_algorithm(self):
+        self.assertSameMazes(KruskalsAlgorithm)
+
+        for wall in (2000000, 2000001, 40, -1):
+            self.assertRaises(ValueError, Maze.speedups.kruskal, bytearray(20), 5, 4,
+              array("i", [wall]), bytes(4))
+
+        self.assertRaises(ValueError, Maze.speedups.kruskal, bytearray(20), 5, 4,
+          array("i", [0, 1]), bytes(4))
+
+    def test_carve(self):
+        compiled = Maze(5, 4)
+        pure = Maze(5, 4)
+        pure.speedups = None
+        indices = array("i", [0, 6, 12, 19])
+        states = bytearray([MazeCellStates.OPEN_EAST, MazeCellStates.OPEN_NORTH_SOUTH,
+          MazeCellStates.OPEN_EAST_WEST, MazeCellStates.OPEN_NORTH])
+
+        compiled.carve(indices, states)
+        pure.carve(indices, states)
+        self.assertEqual(pure, compiled)
+        self.assertRaises(IndexError, Maze.speedups.carve, compiled.cells, 5, array("i", [20]),
+          b"\0")
+
+    def test_walk_tree(self):
+        for width, height in SIZES:
+            maze = KruskalsAlgorithm().generate(width, height, 3)
+            cells = bytes(maze.cells)
+            degrees = cells.translate(DEGREES)
+            root = max(degrees.find(1), 0)
+            args = (cells, degrees, width, root, 0, len(cells) - 1)
+            self.assertEqual(walk_tree(*args), Maze.speedups.walk_tree(*args))
+
+        self.assertRaises(ValueError, Maze.speedups.walk_tree, b"\x08", b"\x01", 1, 0, 0, 0)
+
+    def test_braid(self):
+        for width, height in SIZES:
+            for fraction in (0.0, 0.4, 1.0):
+                compiled = KruskalsAlgorithm().generate(width, height, 5)
+                pure = Maze.from_buffer(width, height, bytearray(compiled.cells))
+                pure.speedups = None
+                self.assertEqual(braid(pure, fraction, 5), braid(compiled, fraction, 5))
+                self.assertEqual(pure, compiled)
+
+        self.assertRaises(IndexError, Maze.speedups.braid_ends, bytearray(2), 2, bytes(2),
+          array("i", [2]), bytes(4), 0x10000, bytearray(1))
+
+    def test_solvers(self):
+        for width, height in SIZES:
+            maze = KruskalsAlgorithm().generate(width, height, 3)
+            braided = Maze.from_buffer(width, height, bytearray(maze.cells))
+            braid(braided, 0.5, 3)
+
+            for cells in (bytes(maze.cells), bytes(braided.cells)):
+                for start, end in ((0, len(cells) - 1), (len(cells) // 2, 0)):
+                    for engine in (bfs_path, dead_end_path):
+                        pure_path = array("i", [0]) * len(cells)
+                        compiled_path = array("i", pure_path)
+                        length = engine(cells, width, start, end, pure_path)
+                        self.assertEqual(length, getattr(Maze.speedups, engine.__name__)(
+                          cells, width, start, end, compiled_path))
+                        # Past the path, the buffer is scratch space.
+                        self.assertEqual(pure_path[:length], compiled_path[:length])
+
+        # Unreachable, then past the border.
+        for name in ("bfs_path", "dead_end_path"):
+            engine = getattr(Maze.speedups, name)
+            self.assertEqual(-1, engine(bytes(2), 2, 0, 1, array("i", [0, 0])))
+            self.assertRaises(ValueError, engine, b"\x08\0", 2, 0, 1, array("i", [0, 0]))
+            self.assertRaises(ValueError, engine, bytes(2), 2, 0, 2, array("i", [0, 0]))
@@ -0,0 +1,80 @@
+from ..errors import InvalidSizeException
+from ..generators import KruskalsAlgorithm
+from ..mazes import MazeCellStates
+from ..tiles import TiledMaze, derive_seed
+from ..validation import is_perfect
+
+import shutil
+import tempfile
+import unittest
+
+class TiledMazeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = TiledMaze(7, 5, 4, 3, seed=42)
+
+    def test_perfect(self):
+        whole = self.world.region(0, 0, self.world.width, self.world.height)
+        self.assertTrue(is_perfect(whole))
+
+        for seed in range(5):
+            world = TiledMaze(3, 4, 5, 5, seed, KruskalsAlgorithm())
+            self.assertTrue(is_perfect(world.region(0, 0, world.width, world.height)))
+
+    def test_deterministic(self):
+        other = TiledMaze(7, 5, 4, 3, seed=42, memory_budget=0)
+        self.assertEqual(self.world.region(0, 0, 28, 15), other.region(0, 0, 28, 15))
+        self.assertNotEqual(self.world.region(0, 0, 28, 15),
+          TiledMaze(7, 5, 4, 3, seed=43).region(0, 0, 28, 15))
+
+    def test_seams_match(self):
+        world = self.world
+
+        for row in range(world.height):
+            for col in range(world.width - 1):
+                self.assertEqual(bool(world.cell(row, col) & MazeCellStates.OPEN_EAST),
+                  bool(world.cell(row, col + 1) & MazeCellStates.OPEN_WEST))
+
+        for row in range(world.height - 1):
+            for col in range(world.width):
+                self.assertEqual(bool(world.cell(row, col) & MazeCellStates.OPEN_SOUTH),
+                  bool(world.cell(row + 1, col) & MazeCellStates.OPEN_NORTH))
+
+    def test_unbounded(self):
+        world = TiledMaze(8, 8, seed=1)
+        self.assertEqual(None, world.width)
+        far = world.region(8000, 12000, 24, 16)
+        self.assertEqual(far, world.region(8000, 12000, 24, 16))
+        self.assertRaises(IndexError, world.tile, -1, 0)
+
+    def test_budget(self):
+        world = TiledMaze(10, 10, 6, 6)
+        world.memory_budget = 3 * world.tile_bytes
+        world.region(0, 0, 60, 60)
+        self.assertEqual([(3, 5), (4, 5), (5, 5)], list(world.tiles))
+        world.tile(4, 5)
+        self.assertEqual([(3, 5), (5, 5), (4, 5)], list(world.tiles))
+
+    def test_spill(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            world = TiledMaze(7, 5, 4, 3, seed=42, memory_budget=0, spill_directory=directory)
+            self.assertEqual(self.world.region(0, 0, 28, 15), world.region(0, 0, 28, 15))
+            # Now every tile but the last comes back from disk.
+            self.assertEqual(self.world.region(0, 0, 28, 15), world.region(0, 0, 28, 15))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_region_edges(self):
+        window = self.world.region(2, 3, 10, 6)
+        self.assertFalse(any(wall & cell for wall, cell in zip(window.border_walls, window.cells)))
+        self.assertEqual(self.world.cell(4, 6), window.maze[2][3])
+
+    def test_invalid(self):
+        self.assertRaises(InvalidSizeException, TiledMaze, 0, 5)
+
+    def test_derive_seed(self):
+        self.assertEqual(derive_seed(1, 2, 3), derive_seed(1, 2, 3))
+        self.assertNotEqual(derive_seed(1, 2, 3), derive_seed(1, 3, 2))
+        self.assertTrue(0 <= derive_seed(-1, 2 ** 70) < 2 ** 63)
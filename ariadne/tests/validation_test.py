@@ -0,0 +1,81 @@
+from ..errors import InvalidMazeException
+from ..generators import KruskalsAlgorithm
+from ..mazes import Maze, MazeCellStates
+from ..validation import count_passages, count_reachable, has_closed_border, \
+  has_symmetric_walls, is_connected, is_perfect, validate
+
+import unittest
+
+class ValidationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.maze = KruskalsAlgorithm().generate(9, 6, 11)
+
+    def test_perfect(self):
+        validate(self.maze)
+        self.assertTrue(is_perfect(self.maze))
+        self.assertTrue(has_closed_border(self.maze))
+        self.assertTrue(has_symmetric_walls(self.maze))
+        self.assertTrue(is_connected(self.maze))
+        self.assertEqual(53, count_passages(self.maze))
+
+        self.assertTrue(is_perfect(Maze(1, 1)))
+        self.assertTrue(is_perfect(Maze(0, 0)))
+
+    def test_border(self):
+        for index, direction in ((3, MazeCellStates.OPEN_NORTH), (17, MazeCellStates.OPEN_EAST),
+          (50, MazeCellStates.OPEN_SOUTH), (27, MazeCellStates.OPEN_WEST)):
+            maze = Maze.from_buffer(9, 6, bytearray(self.maze.cells))
+            maze.cells[index] |= direction
+            self.assertFalse(has_closed_border(maze))
+            self.assertTrue(has_symmetric_walls(maze))
+            self.assertRaises(InvalidMazeException, validate, maze)
+
+    def test_asymmetric(self):
+        maze = Maze(3, 3)
+        maze.maze[1][1] = MazeCellStates.OPEN_EAST
+        self.assertFalse(has_symmetric_walls(maze))
+        self.assertTrue(has_closed_border(maze))
+
+        maze.maze[1][2] = MazeCellStates.OPEN_WEST
+        self.assertTrue(has_symmetric_walls(maze))
+
+        maze.maze[0][1] = MazeCellStates.OPEN_SOUTH
+        self.assertFalse(has_symmetric_walls(maze))
+        self.assertRaises(InvalidMazeException, validate, maze)
+
+    def test_disconnected(self):
+        maze = Maze(3, 1)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        self.assertEqual(2, count_reachable(maze))
+        self.assertEqual(1, count_reachable(maze, 2))
+        self.assertFalse(is_connected(maze))
+        self.assertRaises(InvalidMazeException, validate, maze)
+
+    def test_loop(self):
+        maze = Maze(2, 3)
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_SOUTH_EAST)
+        maze.tear_down_wall(1, 1, MazeCellStates.OPEN_NORTH_WEST)
+        maze.tear_down_wall(1, 0, MazeCellStates.OPEN_SOUTH)
+        # Right number of passages but a loop and an unreachable cell.
+        self.assertEqual(5, count_passages(maze))
+        self.assertFalse(is_connected(maze))
+        self.assertFalse(is_perfect(maze))
+
+    def test_masked(self):
+        # Two cells on either side of a masked one.
+        maze = Maze(3, 1, mask=b"\1\0\1")
+        validate(maze)
+
+        maze.mask = None
+        self.assertFalse(is_perfect(maze))
+
+        maze.tear_down_wall(0, 0, MazeCellStates.OPEN_EAST)
+        maze.tear_down_wall(0, 1, MazeCellStates.OPEN_EAST)
+        validate(maze)
+
+        maze.mask = b"\1\0\1"
+        self.assertRaises(InvalidMazeException, validate, maze)
+
+if __name__ == "__main__":
+    unittest.main()
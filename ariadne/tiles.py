@@ -0,0 +1,210 @@
+import collections
+import hashlib
+import os
+import random
+import struct
+import sys
+
+from .errors import InvalidSizeException
+from .generators import RecursiveBacktracker
+from .mazes import Maze, MazeCellStates
+
+"""
+Mazes too big to hold in memory, split into tiles that are generated on demand.
+
+Every tile is a perfect maze of its own, generated from a seed derived from the
+world seed and the tile coordinates, so any tile can be (re)generated at any
+time without looking at the others. Tiles are then joined into one perfect maze
+by running the Binary Tree algorithm on the grid of tiles: every tile but the
+top-left one opens exactly one seam, either to the tile to its west or to the
+one to its north, at a position also derived from the seed. A tile can work out
+which seams its east and south neighbors open into it from their coordinates
+alone.
+"""
+
+def _closing_table(direction):
+    return bytes(state & ~direction & 0xff for state in range(256))
+
+CLOSE_NORTH = _closing_table(MazeCellStates.OPEN_NORTH)
+CLOSE_EAST = _closing_table(MazeCellStates.OPEN_EAST)
+CLOSE_SOUTH = _closing_table(MazeCellStates.OPEN_SOUTH)
+CLOSE_WEST = _closing_table(MazeCellStates.OPEN_WEST)
+
+def derive_seed(*values):
+    """
+    Returns a seed that depends only on the given integers. It is below
+    2 ** 63 so that it is kept when the maze is saved.
+    """
+    values = [value & 0xffffffffffffffff for value in values]
+    digest = hashlib.blake2b(struct.pack("<%dQ" % len(values), *values), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+
+class TiledMaze(object):
+
+    # Salts keeping the seeds of tiles apart from the seeds of their seams.
+    TILE_SALT = 0
+    SEAM_SALT = 1
+
+    def __init__(self, tile_width, tile_height, tiles_across=None, tiles_down=None, seed=0,
+      generator=None, memory_budget=64 * 1024 * 1024, spill_directory=None):
+        """
+        tile_width, tile_height - the size of each tile in cells.
+        tiles_across, tiles_down - the size of the world in tiles. None means
+          the world goes on forever in that direction.
+        seed - the world seed, an integer.
+        generator - the MazeGenerator for the tiles; RecursiveBacktracker by
+          default.
+        memory_budget - roughly how many bytes the cached tiles may take.
+        spill_directory - if given, tiles evicted from the cache are saved
+          there and loaded back instead of being generated again.
+        """
+        if tile_width < 1 or tile_height < 1:
+            raise InvalidSizeException(tile_width, tile_height)
+
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.tiles_across = tiles_across
+        self.tiles_down = tiles_down
+        self.seed = seed
+        self.generator = generator or RecursiveBacktracker()
+        self.memory_budget = memory_budget
+        self.spill_directory = spill_directory
+        # The cells plus the per-row views of a tile.
+        self.tile_bytes = tile_width * tile_height + \
+          tile_height * sys.getsizeof(memoryview(b""))
+        self.tiles = collections.OrderedDict()
+
+    @property
+    def width(self):
+        return None if self.tiles_across is None else self.tiles_across * self.tile_width
+
+    @property
+    def height(self):
+        return None if self.tiles_down is None else self.tiles_down * self.tile_height
+
+    def __has_tile(self, tile_col, tile_row):
+        return tile_col >= 0 and tile_row >= 0 and \
+          (self.tiles_across is None or tile_col < self.tiles_across) and \
+          (self.tiles_down is None or tile_row < self.tiles_down)
+
+    def seam(self, tile_col, tile_row):
+        """
+        Returns the seam the given tile opens as (direction, position): either
+        (MazeCellStates.OPEN_WEST, row) or (MazeCellStates.OPEN_NORTH, col),
+        row and col being within the tile. The top-left tile opens no seam
+        and gives None.
+        """
+        if tile_col == 0 and tile_row == 0:
+            return None
+
+        rng = random.Random(derive_seed(self.seed, self.SEAM_SALT, tile_col, tile_row))
+
+        if tile_row == 0 or (tile_col != 0 and rng.getrandbits(1)):
+            return MazeCellStates.OPEN_WEST, rng.randrange(self.tile_height)
+        else:
+            return MazeCellStates.OPEN_NORTH, rng.randrange(self.tile_width)
+
+    def __spill_path(self, tile_col, tile_row):
+        return os.path.join(self.spill_directory, "tile_%d_%d.maze" % (tile_col, tile_row))
+
+    def __make_tile(self, tile_col, tile_row):
+        if self.spill_directory is not None:
+            path = self.__spill_path(tile_col, tile_row)
+
+            if os.path.exists(path):
+                return Maze.load(path)
+
+        tile = self.generator.generate(self.tile_width, self.tile_height,
+          derive_seed(self.seed, self.TILE_SALT, tile_col, tile_row))
+        cells = tile.cells
+        width = self.tile_width
+        seam = self.seam(tile_col, tile_row)
+
+        # Seams are openings on the border of the tile, so they are set on the
+        # cells directly rather than through tear_down_wall.
+        if seam is not None:
+            direction, position = seam
+            cells[position * width if direction == MazeCellStates.OPEN_WEST else position] |= direction
+
+        if self.__has_tile(tile_col + 1, tile_row):
+            direction, position = self.seam(tile_col + 1, tile_row)
+
+            if direction == MazeCellStates.OPEN_WEST:
+                cells[position * width + width - 1] |= MazeCellStates.OPEN_EAST
+
+        if self.__has_tile(tile_col, tile_row + 1):
+            direction, position = self.seam(tile_col, tile_row + 1)
+
+            if direction == MazeCellStates.OPEN_NORTH:
+                cells[(self.tile_height - 1) * width + position] |= MazeCellStates.OPEN_SOUTH
+
+        return tile
+
+    def tile(self, tile_col, tile_row):
+        """
+        Returns the Maze of the given tile, seams included, generating or
+        loading it if it is not cached. Tiles must not be modified.
+        """
+        key = (tile_col, tile_row)
+        tiles = self.tiles
+
+        if key in tiles:
+            tiles.move_to_end(key)
+            return tiles[key]
+
+        if not self.__has_tile(tile_col, tile_row):
+            raise IndexError("No tile at %s" % (key,))
+
+        tile = tiles[key] = self.__make_tile(tile_col, tile_row)
+
+        while len(tiles) > 1 and len(tiles) * self.tile_bytes > self.memory_budget:
+            self.__evict()
+
+        return tile
+
+    def __evict(self):
+        (tile_col, tile_row), tile = self.tiles.popitem(last=False)
+
+        if self.spill_directory is not None:
+            path = self.__spill_path(tile_col, tile_row)
+
+            if not os.path.exists(path):
+                tile.save(path)
+
+    def cell(self, row, col):
+        """
+        Returns the state of the cell at (row, col) of the whole world.
+        """
+        tile_row, inner_row = divmod(row, self.tile_height)
+        tile_col, inner_col = divmod(col, self.tile_width)
+        return self.tile(tile_col, tile_row).cells[inner_row * self.tile_width + inner_col]
+
+    def region(self, top, left, width, height):
+        """
+        Copies a window of the world into a Maze of its own. Openings leading
+        out of the window are closed so that the result is a proper Maze,
+        though not necessarily a connected one.
+        """
+        region = Maze(width, height)
+        cells = region.cells
+
+        for row in range(height):
+            tile_row, inner_row = divmod(top + row, self.tile_height)
+            col = 0
+
+            while col < width:
+                tile_col, inner_col = divmod(left + col, self.tile_width)
+                span = min(self.tile_width - inner_col, width - col)
+                start = inner_row * self.tile_width + inner_col
+                cells[row * width + col:row * width + col + span] = \
+                  self.tile(tile_col, tile_row).cells[start:start + span]
+                col += span
+
+        if width and height:
+            cells[:width] = cells[:width].translate(CLOSE_NORTH)
+            cells[-width:] = cells[-width:].translate(CLOSE_SOUTH)
+            cells[::width] = cells[::width].translate(CLOSE_WEST)
+            cells[width - 1::width] = cells[width - 1::width].translate(CLOSE_EAST)
+
+        return region
@@ -0,0 +1,158 @@
+from .errors import InvalidMazeException
+from .masks import mask_regions
+from .mazes import MazeCellStates, get_moves
+
+"""
+Whole-maze sanity checks.
+
+The wall checks work on the cell buffer in bulk: every cell state is mapped to
+a 0/1 byte per direction with a translation table, and two such planes are
+compared with a single slice comparison, e.g. the east bits of every cell but
+the last against the west bits of every cell but the first.
+"""
+
+PLANE_TABLES = dict(
+    (direction, bytes(1 if state & direction else 0 for state in range(256)))
+    for direction in MazeCellStates.CARDINAL
+)
+
+def _planes(maze):
+    cells = bytes(maze.cells)
+    return dict((direction, cells.translate(table)) for direction, table in PLANE_TABLES.items())
+
+def _clear(plane, start, step):
+    plane = bytearray(plane)
+    plane[start::step] = bytes(len(range(start, len(plane), step)))
+    return plane
+
+def has_closed_border(maze, planes=None):
+    """
+    Returns True if no cell opens past the edges of the maze.
+    """
+    width = maze.width
+    cell_count = len(maze.cells)
+    planes = planes or _planes(maze)
+
+    if not cell_count:
+        return True
+
+    return not (
+        planes[MazeCellStates.OPEN_NORTH][:width].count(1) or
+        planes[MazeCellStates.OPEN_SOUTH][cell_count - width:].count(1) or
+        planes[MazeCellStates.OPEN_WEST][0::width].count(1) or
+        planes[MazeCellStates.OPEN_EAST][width - 1::width].count(1)
+    )
+
+def has_symmetric_walls(maze, planes=None):
+    """
+    Returns True if every opening between two cells is open from both sides,
+    which is what `Maze.tear_down_wall` maintains through
+    MazeCellStates.INVERSES. Openings past the border are not looked at.
+    """
+    width = maze.width
+    planes = planes or _planes(maze)
+
+    if not len(maze.cells):
+        return True
+
+    east = _clear(planes[MazeCellStates.OPEN_EAST], width - 1, width)
+    west = _clear(planes[MazeCellStates.OPEN_WEST], 0, width)
+
+    return east[:-1] == west[1:] and \
+      planes[MazeCellStates.OPEN_SOUTH][:-width] == planes[MazeCellStates.OPEN_NORTH][width:]
+
+def count_passages(maze, planes=None):
+    """
+    Returns the number of openings between pairs of cells, assuming walls are
+    symmetric.
+    """
+    planes = planes or _planes(maze)
+    return planes[MazeCellStates.OPEN_EAST].count(1) + planes[MazeCellStates.OPEN_SOUTH].count(1)
+
+def count_reachable(maze, start=0):
+    """
+    Returns the number of cells reachable from the cell at flat index start,
+    itself included. Assumes a closed border and symmetric walls.
+    """
+    cells = maze.cells
+
+    if not len(cells):
+        return 0
+
+    moves = get_moves(maze.width)
+    seen = bytearray(len(cells))
+    seen[start] = 1
+    frontier = [start]
+    append = frontier.append
+
+    for current in frontier:
+        for offset in moves[cells[current]]:
+            neighbor = current + offset
+
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                append(neighbor)
+
+    return len(frontier)
+
+def is_connected(maze):
+    return count_reachable(maze) == len(maze.cells)
+
+def opens_into_mask(maze):
+    """
+    Returns True if any cell opens into a masked cell (or is one and has
+    openings at all). Always False for mazes without a mask.
+    """
+    if maze.mask is None:
+        return False
+
+    return bool(int.from_bytes(maze.cells, "big") & int.from_bytes(maze.border_walls, "big"))
+
+def validate(maze):
+    """
+    Raises InvalidMazeException unless maze is a perfect maze: its border is
+    closed, its walls are symmetric, every cell can be reached and there is
+    exactly one path between any two cells (i.e. it has cells - 1 passages).
+
+    A masked maze must be a perfect maze in every region of its mask (see
+    `ariadne.masks.mask_regions`) instead, with its masked cells closed off.
+    """
+    cell_count = len(maze.cells)
+    planes = _planes(maze)
+
+    if not has_closed_border(maze, planes):
+        raise InvalidMazeException("opening on the border")
+
+    if not has_symmetric_walls(maze, planes):
+        raise InvalidMazeException("asymmetric walls")
+
+    if opens_into_mask(maze):
+        raise InvalidMazeException("opening into a masked cell")
+
+    passages = count_passages(maze, planes)
+
+    if maze.mask is None:
+        regions = [range(cell_count)] if cell_count else []
+    else:
+        regions = mask_regions(maze)
+
+    region_cells = sum(len(region) for region in regions)
+
+    if passages != region_cells - len(regions):
+        raise InvalidMazeException("%s passages for %s cells in %s regions" % (
+          passages, region_cells, len(regions)))
+
+    # With cells - regions passages, every region being connected also rules
+    # out loops.
+    for region in regions:
+        reachable = count_reachable(maze, region[0])
+
+        if reachable != len(region):
+            raise InvalidMazeException("only %s of %s cells reachable" % (reachable, len(region)))
+
+def is_perfect(maze):
+    try:
+        validate(maze)
+        return True
+    except InvalidMazeException:
+        return False